@@ -3,8 +3,13 @@ Script para comparar los datos de altura del sensor barométrico y el sensor ToF
 """
 from datetime import datetime
 import os 
+import sys
 import time
 
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from telemetria import TelemetryReader, tiempo_registro
+
 # Generar el nombre del archivo con la fecha actual
 current_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")  # Formato: Año-Mes-Día_Hora-Minuto-Segundo
 filename_ALT = f"ruta_{current_date}_ALT.txt"
@@ -28,35 +33,37 @@ file_path_SONAR = os.path.join(current_dir, "..\\Rutas",filename_SONAR)
 with open(file_path_ALT, 'w') as file, open(file_path_SONAR, 'w') as file_sonar:
 
     #Almacenar los datos del barometro en en archivo ALT y los datos del sensor ToF en el archivo SONAR
-    file.write('opt_m_x, opt_m_y, opt_qua, yaw, alt\n') 
-    file_sonar.write('opt_m_x, opt_m_y, opt_qua, yaw, sonarrange\n')
+    # La última columna (t) es el tiempo de cada lectura desde la primera, para alinear los dos archivos
+    file.write('opt_m_x, opt_m_y, opt_qua, yaw, alt, t\n') 
+    file_sonar.write('opt_m_x, opt_m_y, opt_qua, yaw, sonarrange, t\n')
     
     # Si se quiere realizar una ruta competa con el dron volando, descomentar la siguiente línea:
     #while cs.armed:
     
+    # Lectura de la telemetría: todos los campos se leen de 'cs' una sola vez por muestra
+    reader = TelemetryReader(cs, campos=("opt_m_x", "opt_m_y", "opt_qua", "yaw", "alt", "sonarrange"),
+                             reloj=time.monotonic)
+
     # Y comentar las dos siguientes líneas:
     i = 30 # Número de lecturas a realizar (30 segundos de datos)
     while i > 0: 
         
-        # Obtener la variable 'opt_m_x' del estado
-        opt_m_x = cs.opt_m_x
-        # Obtener la variable 'opt_m_y' del estado
-        opt_m_y = cs.opt_m_y
-        # Obtener la variable 'opt_qua' del estado
-        opt_qua = cs.opt_qua
-        # Obtener la variable 'yaw' del estado
-        yaw = cs.yaw
-        # Obtener la variable 'alt' del estado
-        alt = cs.alt
-        #Obtener la variable 'sonarrange' del estado
-        sonarrange = cs.sonarrange
+        # Obtener las variables opt_m_x, opt_m_y, opt_qua, yaw, alt y sonarrange del estado en una misma lectura
+        snap = reader.read()
+        opt_m_x = snap.opt_m_x
+        opt_m_y = snap.opt_m_y
+        opt_qua = snap.opt_qua
+        yaw = snap.yaw
+        alt = snap.alt
+        sonarrange = snap.sonarrange
+        t = tiempo_registro(snap.t - reader.t_inicio)
 
         # Debug
         print(f' ALT: {alt}, SONAR: {sonarrange}')
         
         # Escribir los datos en el archivo
-        file.write(f'{opt_m_x}, {opt_m_y}, {opt_qua}, {yaw}, {alt}\n')
-        file_sonar.write(f'{opt_m_x}, {opt_m_y}, {opt_qua}, {yaw}, {sonarrange}\n')
+        file.write(f'{opt_m_x}, {opt_m_y}, {opt_qua}, {yaw}, {alt}, {t}\n')
+        file_sonar.write(f'{opt_m_x}, {opt_m_y}, {opt_qua}, {yaw}, {sonarrange}, {t}\n')
         
         # Esperar un segundo para tomar la siguiente lectura
         time.sleep(1)
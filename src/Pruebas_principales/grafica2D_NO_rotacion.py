@@ -1,26 +1,39 @@
 """
 Programa para graficar la trayectoria de un dron en 2D sin aplicar rotación.
 """
-import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.cm as cm
+import matplotlib.colors as mcolors
+import numpy as np
 import sys
 import os
 
-def main(file_name):
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from trayectoria import reconstruct_trajectory
+from dibujo import dibujar_flechas, MODO_LOTE
+from formato_binario import cargar_ruta
+from lector_rutas import separar_tiempo
+from grafica import colores_puntos
+from lod import PuntosLOD, forzados_trayectoria, MAX_PUNTOS_LOD
+
+def main(file_name, modo_flechas=MODO_LOTE, lod=True, max_puntos=MAX_PUNTOS_LOD):
     """
     Función principal que grafica la trayectoria del dron en 2D sin aplicar rotación.
     Args:
         file_name: Nombre del archivo que contiene los datos de la trayectoria del dron.
+        modo_flechas: Modo de dibujo de las flechas de dirección (ver dibujo.MODOS_FLECHAS).
+        lod: Si es True y hay más de max_puntos muestras, se dibuja una versión diezmada (ver lod.py).
+        max_puntos: Número máximo aproximado de puntos dibujados en modo LOD.
     """
     
     # Obtener la ruta del archivo de datos
     current_dir = os.path.dirname(os.path.abspath(__file__))
     file_path = os.path.join(current_dir, "..\\..\\Rutas", file_name) 
     
+    # Leer la cabecera y los datos (archivo de texto o binario .rutb)
+    header, datos, _ = separar_tiempo(*cargar_ruta(file_path))
+
     # Comprobar cabecera del archivo
-    with open(file_path, "r") as f:
-        header = f.readline().strip().split(",")
     if len(header) < 3:
         print("Error: El archivo debe tener al menos 3 columnas.")
         sys.exit(1)
@@ -30,51 +43,35 @@ def main(file_name):
             print(f"Error: Fallo en el tipo de columnas.")
             sys.exit(1)
             
-    # Leer el archivo de datos
-    datos = np.genfromtxt(file_path, delimiter=',', skip_header=1)
-
-    # Inicializar las listas para almacenar las coordenadas y los colores
-    x_coords = [0]
-    y_coords = [0]
-    colors = ['red']  # Inicializar con un color para el punto de inicio
-
-    # Normalizar la calidad para que esté entre 0 y 1
-    max_quality = max(datos[:, 2])
-    min_quality = min(datos[:, 2])
-    norm_quality = (datos[:, 2] - min_quality) / (max_quality - min_quality)
-
-    # Recorrer las filas del archivo de datos
-    for i in range(len(datos)):
-        opt_m_x = -datos[i, 0]
-        opt_m_y = datos[i, 1]
-        qua = norm_quality[i]  # Usar la calidad normalizada
-        
-        # Calcular las nuevas coordenadas sumando los deltas calculados a las coordenadas anteriores
-        x_coords.append(x_coords[-1] + opt_m_x)
-        y_coords.append(y_coords[-1] + opt_m_y)
+    # Reconstruir la trayectoria sin aplicar rotación
+    x_coords, y_coords, _ = reconstruct_trajectory(datos, rotacion=False)
 
-        # Asignar color basado en la calidad normalizada utilizando un mapa de colores
-        colors.append(cm.coolwarm(1.0-qua))
+    # Asignar color basado en la calidad normalizada utilizando un mapa de colores (rojo para el punto de inicio)
+    colors = np.vstack((mcolors.to_rgba('red'), colores_puntos(datos[:, 2])))
 
     # Crear la figura 2D
     fig, ax = plt.subplots()
 
     # Plotear las coordenadas con colores
-    sc = ax.scatter(x_coords, y_coords, c=colors, marker='o')
+    if lod:
+        # Se conservan siempre el inicio, el final, los objetivos alcanzados y las calidades atípicas
+        puntos = PuntosLOD(ax, (x_coords, y_coords), colors, forzados_trayectoria(datos), max_puntos, marker='o')
+        sc = puntos.dibujar()
+        visibles = puntos.indices
+    else:
+        sc = ax.scatter(x_coords, y_coords, c=colors, marker='o')
+        visibles = slice(None)
 
-    # Etiquetar los puntos con su índice
-    for i in range(len(x_coords)):
-        if i == 0 or i == len(x_coords)-1:
-            ax.text(x_coords[i], y_coords[i], str(i), fontsize=12, ha='center', va='bottom')
+    # Etiquetar el punto de inicio y el final con su índice
+    for i in (0, len(x_coords) - 1):
+        ax.text(x_coords[i], y_coords[i], str(i), fontsize=12, ha='center', va='bottom')
 
-    # Añadir flechas para mostrar la dirección del recorrido
-    for i in range(len(x_coords) - 1):
-        ax.annotate('', xy=(x_coords[i + 1], y_coords[i + 1]), xytext=(x_coords[i], y_coords[i]),
-                    arrowprops=dict(facecolor='black', arrowstyle='->'))
+    # Añadir flechas para mostrar la dirección del recorrido (sobre los puntos dibujados)
+    dibujar_flechas(ax, x_coords[visibles], y_coords[visibles], modo=modo_flechas)
 
     # Configurar el punto (0,0) en el centro de la gráfica
-    ax.set_xlim([min(x_coords)-1, max(x_coords)+1])
-    ax.set_ylim([min(y_coords)-1, max(y_coords)+1])
+    ax.set_xlim([np.nanmin(x_coords)-1, np.nanmax(x_coords)+1])
+    ax.set_ylim([np.nanmin(y_coords)-1, np.nanmax(y_coords)+1])
 
     # Etiquetas y título
     ax.set_xlabel('opt_m_x (m)')
@@ -0,0 +1,144 @@
+"""
+Prueba del compilador de rutas (compilador_rutas.py).
+    - Compila todas las rutas del corpus en un directorio temporal y comprueba que cada plan cubre todas las
+      filas de su ruta, que su último punto es el final de la trayectoria reconstruida y que cada punto omitido
+      queda a menos de la tolerancia del segmento que lo salta, con el mismo yaw y altura que su extremo. Cada
+      plan guardado debe estar al día con sus tolerancias y dejar de estarlo si cambia alguna.
+    - Mide el tiempo de unir_colineales en rutas rectas sintéticas de 1000 a 8000 puntos, que deben unirse en un
+      solo segmento, y comprueba que crece de forma lineal.
+    - Compara el número de segmentos y el tiempo de vuelo simulado al recorrer el corpus con las filas en ejes
+      del cuerpo (comportamiento original), con las filas como puntos de paso en ejes del mundo y con los planes.
+    - Mide el tiempo de carga del plan frente a leer la ruta y convertirla en puntos de paso.
+Uso: python prueba_compilador.py [directorio] [procesos]
+"""
+import sys
+import os
+import time
+import shutil
+import tempfile
+import random
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import ordenes
+from compilador_rutas import (compilar_ruta, guardar_plan, cargar_plan, plan_vigente, descartar_pequenos,
+                              unir_colineales, _distancia_segmento, _mismo_objetivo, EXTENSION_PLAN)
+from marco_mundo import MARCO_CUERPO, MARCO_MUNDO, waypoints_mundo
+from replay_rutas import listar_rutas, replay_corpus, RUTAS_DIR
+
+TOLERANCIAS = {k: ordenes.PARAMETROS_RUTA[k] for k in ("tolerance", "yaw_tolerance", "alt_tolerance")}
+PUNTOS_ESCALADO = (1000, 2000, 4000, 8000)
+
+
+def puntos_de_paso(filas):
+    """Puntos de paso [x, y, qua, yaw, alt, filas] de las filas de una ruta, como en compilar_ruta."""
+    objetivos = waypoints_mundo(filas, TOLERANCIAS["tolerance"])
+    return [[x, y, fila[2], fila[3], fila[4], 1] for (x, y), fila in zip(objetivos, filas)]
+
+
+def uniones_validas(puntos, plan, tolerance, yaw_tolerance, alt_tolerance, origen=(0.0, 0.0)):
+    """True si cada punto omitido por el plan queda a menos de la tolerancia del segmento que lo salta."""
+    i = 0
+    ax, ay = origen
+    for extremo in plan:
+        grupo, filas = [], 0
+        while filas < extremo[5]:
+            grupo.append(puntos[i])
+            filas += puntos[i][5]
+            i += 1
+        for p in grupo[:-1]:
+            if not (_distancia_segmento(p[0], p[1], ax, ay, extremo[0], extremo[1]) < tolerance
+                    and _mismo_objetivo(p, extremo, yaw_tolerance, alt_tolerance)):
+                return False
+        ax, ay = extremo[0], extremo[1]
+    return i == len(puntos)
+
+
+def compilar_corpus(rutas, directorio):
+    """Compila las rutas en 'directorio'; devuelve las parejas (ruta, plan) de las rutas válidas."""
+    parejas = []
+    for i, ruta in enumerate(rutas):
+        filas = [f for f in ordenes.read_variations(ruta) if len(f) >= 5]
+        if not filas:
+            continue
+        plan = compilar_ruta(filas, **TOLERANCIAS)
+        assert sum(p[5] for p in plan) == len(filas), ruta
+        assert np.allclose(plan[-1][:2], waypoints_mundo(filas, TOLERANCIAS["tolerance"])[-1]), ruta
+        assert uniones_validas(descartar_pequenos(puntos_de_paso(filas), **TOLERANCIAS), plan, **TOLERANCIAS), ruta
+        plan_path = os.path.join(directorio, f"{i:03d}_{os.path.splitext(os.path.basename(ruta))[0]}{EXTENSION_PLAN}")
+        guardar_plan(plan_path, plan, os.path.basename(ruta), TOLERANCIAS)
+        assert plan_vigente(ruta, TOLERANCIAS, plan_path), ruta
+        assert not plan_vigente(ruta, dict(TOLERANCIAS, tolerance=TOLERANCIAS["tolerance"] / 2), plan_path), ruta
+        parejas.append((ruta, plan_path))
+    return parejas
+
+
+def escalado():
+    """
+    Tiempo de unir_colineales en rutas rectas con ruido lateral menor que la tolerancia; devuelve True si se unen
+    en un solo segmento y el tiempo por punto no crece más del doble entre la ruta más corta y la más larga.
+    """
+    rng = random.Random(0)
+    por_punto = []
+    for n in PUNTOS_ESCALADO:
+        paso = TOLERANCIAS["tolerance"] / 10
+        puntos = [[i * paso, rng.uniform(-paso, paso) / 10, 0.0, 10.0, 1.0, 1] for i in range(1, n + 1)]
+        inicio = time.perf_counter()
+        plan = unir_colineales(puntos, **TOLERANCIAS)
+        t = time.perf_counter() - inicio
+        assert len(plan) == 1 and plan[0][5] == n
+        por_punto.append(t / n)
+        print(f"  {n:>5} puntos: {t * 1000:7.1f} ms ({t / n * 1e6:.1f} us/punto)")
+    return por_punto[-1] <= 2 * por_punto[0]
+
+
+def tiempo_carga(parejas, repeticiones=5):
+    """Tiempo medio (s) de cargar todos los planes y de leer todas las rutas y calcular sus puntos de paso."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for _, plan_path in parejas:
+            cargar_plan(plan_path)
+    t_plan = (time.perf_counter() - inicio) / repeticiones
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for ruta, _ in parejas:
+            waypoints_mundo(ordenes.read_variations(ruta))
+    return t_plan, (time.perf_counter() - inicio) / repeticiones
+
+
+def resumir(resultados):
+    """Segmentos, tasa de éxito, tiempo total simulado y mediana del error final de posición."""
+    validos = [r for r in resultados if "error" not in r]
+    segmentos = sum(r["segmentos"] for r in validos)
+    return (len(validos), segmentos, sum(r["exito"] * r["segmentos"] for r in validos) / segmentos,
+            sum(r["t_total"] for r in validos), np.median([r["error_xy"] for r in validos]))
+
+
+if __name__ == "__main__":
+    directorio = sys.argv[1] if len(sys.argv) > 1 else RUTAS_DIR
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    temporal = tempfile.mkdtemp(prefix="planes_")
+    try:
+        inicio = time.perf_counter()
+        parejas = compilar_corpus(listar_rutas(directorio), temporal)
+        print(f"Compiladas {len(parejas)} rutas en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        t_plan, t_ruta = tiempo_carga(parejas)
+        print(f"Carga: planes {t_plan * 1000:.1f} ms, rutas + puntos de paso {t_ruta * 1000:.1f} ms")
+        print("Escalado de unir_colineales:")
+        lineal = escalado()
+        print(f"  {'OK' if lineal else 'FALLO: crece más que linealmente'}")
+        assert lineal
+
+        rutas = [ruta for ruta, _ in parejas]
+        modos = [("filas, cuerpo", rutas, MARCO_CUERPO), ("filas, mundo", rutas, MARCO_MUNDO),
+                 ("plan", [plan for _, plan in parejas], MARCO_MUNDO)]
+        print(f"{'modo':<14} {'rutas':>5} {'seg':>6} {'éxito':>6} {'t_tot(s)':>10} {'err_xy med':>10}")
+        base = None
+        for nombre, archivos, marco in modos:
+            n, segmentos, exito, t_total, error_xy = resumir(replay_corpus(archivos, procesos=procesos, marco=marco))
+            base = base or (segmentos, t_total)
+            print(f"{nombre:<14} {n:>5} {segmentos:>6} {exito:>6.0%} {t_total:>10.1f} {error_xy:>10.3f}  "
+                  f"(segmentos {segmentos / base[0]:.1%}, tiempo {t_total / base[1]:.1%} del original)")
+    finally:
+        shutil.rmtree(temporal)
@@ -0,0 +1,206 @@
+"""
+Prueba de rendimiento y de precisión del estimador de posición (estimador.py).
+    - Coste de update(snapshot) por ciclo (medio, p99 y máximo) frente al presupuesto del bucle de control
+      (1 / FRECUENCIA_CONTROL), con y sin la lectura de 'cs' del simulador.
+    - Equivalencia entre update() ciclo a ciclo y estimar_lote, y velocidad de estimar_lote.
+    - Con calidad del flujo buena en todas las filas, estimar_ruta da la misma trayectoria que
+      trayectoria.reconstruct_trajectory (mismos ejes del mundo que grafica.py y marco_mundo).
+    - Vuelo simulado con ruido en el ToF, el barómetro y el flujo: error de la altura y de la posición en el
+      mundo estimadas frente a la posición real del vehículo (el desplazamiento real en ejes del cuerpo, sin ruido,
+      pasado al mundo con marco_mundo.cuerpo_a_mundo), comparado con usar las lecturas sin filtrar.
+    - Rutas de Rutas reproducidas en el simulador con ruido con move_drone con y sin el estimador en el control.
+Uso: python prueba_estimador.py [ciclos]
+"""
+import sys
+import os
+import math
+import time
+import tempfile
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from estimador import EstimadorPosicion, estimar_lote, estimar_ruta, CAMPOS_ESTIMADOR, CALIDAD_MAX
+from telemetria import TelemetryReader, TelemetrySnapshot
+import ordenes
+from ordenes import FRECUENCIA_CONTROL
+from marco_mundo import cuerpo_a_mundo
+from lector_rutas import ESQUEMAS, leer_esquema
+from trayectoria import reconstruct_trajectory
+from replay_rutas import replay_ruta, listar_rutas
+from simulador import Simulador
+from prueba_reconstruccion import generar_registro
+
+# Ruido de los sensores del simulador en los vuelos
+RUIDO = {"flujo": 0.05, "sonar": 0.05, "baro": 0.3, "calidad": 30}
+# Rutas de Rutas que se reproducen con y sin el estimador
+RUTAS_REPRODUCIDAS = 4
+
+
+def snapshots_sinteticos(ciclos, semilla=0):
+    """Lecturas sintéticas con flujo acumulado, calidades bajas a ratos, yaw girando y alcance del ToF superado."""
+    rng = np.random.default_rng(semilla)
+    flujo_x = np.cumsum(rng.normal(0.01, 0.005, ciclos))
+    flujo_y = np.cumsum(rng.normal(0.0, 0.005, ciclos))
+    calidad = rng.integers(0, 256, ciclos).astype(float)
+    yaw = np.mod(np.cumsum(rng.normal(0, 2, ciclos)), 360)
+    altura = 2.5 + 2 * np.sin(np.arange(ciclos) / 200)
+    sonar = np.clip(altura + rng.normal(0, 0.02, ciclos), 0.0, 4.0)
+    baro = altura + 0.7 + rng.normal(0, 0.3, ciclos)
+
+    snapshots = []
+    for i, valores in enumerate(zip(flujo_x.tolist(), flujo_y.tolist(), calidad.tolist(), yaw.tolist(),
+                                    sonar.tolist(), baro.tolist())):
+        snap = TelemetrySnapshot(i + 1, i / FRECUENCIA_CONTROL)
+        snap.opt_m_x, snap.opt_m_y, snap.opt_qua, snap.yaw, snap.sonarrange, snap.alt = valores
+        snapshots.append(snap)
+    return snapshots, (flujo_x, flujo_y, calidad, yaw, sonar, baro)
+
+
+def coste_por_ciclo(snapshots):
+    """Tiempo de cada update() en segundos."""
+    estimador = EstimadorPosicion()
+    tiempos = np.empty(len(snapshots))
+    reloj = time.perf_counter
+    for i, snap in enumerate(snapshots):
+        inicio = reloj()
+        estimador.update(snap)
+        tiempos[i] = reloj() - inicio
+    return tiempos, estimador
+
+
+def ruta_calidad_buena(carpeta, filas=2000):
+    """
+    Escribe un registro sintético con el formato de ruta.py y calidad CALIDAD_MAX en todas las filas; comprueba que
+    estimar_ruta coincide con reconstruct_trajectory. Devuelve la diferencia máxima.
+    """
+    datos = generar_registro(filas)
+    datos[:, 2] = CALIDAD_MAX
+    file_path = os.path.join(carpeta, "ruta_calidad_buena.txt")
+    with open(file_path, "w") as f:
+        f.write(", ".join(ESQUEMAS["bateria"]) + "\n")
+        f.writelines(", ".join(repr(v) for v in fila) + "\n" for fila in datos.tolist())
+    x, y, _ = estimar_ruta(file_path)
+    ref_x, ref_y, _ = reconstruct_trajectory(datos)
+    return max(np.abs(x - ref_x[1:]).max(), np.abs(y - ref_y[1:]).max())
+
+
+def vuelo_simulado(ruido, segundos=60.0, semilla=3):
+    """
+    Vuela en el simulador una trayectoria con giros y cambios de altura leyendo 'cs' a FRECUENCIA_CONTROL.
+    La posición real en el mundo es el desplazamiento real en ejes del cuerpo de cada paso del modelo (sin el ruido
+    del flujo), pasado al mundo con cuerpo_a_mundo y el yaw real.
+    Returns:
+        Arrays de la posición real (x, y, z), la estimada y las lecturas sin filtrar (sonar y flujo sin rotar).
+    """
+    sim = Simulador(semilla=semilla, ruido=ruido)
+    vehiculo = sim.vehiculo
+    vehiculo.armed = True
+    lector = TelemetryReader(sim.cs, campos=CAMPOS_ESTIMADOR, reloj=sim.reloj.monotonic)
+    estimador = EstimadorPosicion()
+    periodo = 1.0 / FRECUENCIA_CONTROL
+    pasos = round(periodo / sim.reloj.dt)
+    real_x = real_y = 0.0
+
+    filas = []
+    for ciclo in range(int(segundos * FRECUENCIA_CONTROL)):
+        t = ciclo * periodo
+        # Avance, giro lento, y subidas y bajadas que salen del alcance del ToF
+        vehiculo.set_rc(2, 1650)
+        vehiculo.set_rc(1, 1500 + int(100 * math.sin(t / 5)))
+        vehiculo.set_rc(4, 1560)
+        vehiculo.set_rc(3, 1500 + int(250 * math.sin(t / 8)) if t > 1 else 1800)
+        for _ in range(pasos):
+            sim.reloj.sleep(sim.reloj.dt)
+            dx, dy = cuerpo_a_mundo(vehiculo.v_cuerpo_x * sim.reloj.dt, vehiculo.v_cuerpo_y * sim.reloj.dt,
+                                    math.radians(vehiculo.yaw))
+            real_x += dx
+            real_y += dy
+
+        snap = lector.read()
+        estimador.update(snap)
+        filas.append((real_x, real_y, vehiculo.z, estimador.x, estimador.y, estimador.z, snap.sonarrange,
+                      snap.opt_m_x, snap.opt_m_y))
+    return np.array(filas)
+
+
+def control_con_estimador(n_rutas, ruido):
+    """
+    Reproduce en el simulador las primeras rutas con yaw y altura con move_drone sin y con un EstimadorPosicion
+    (uno por ruta) en el control. Devuelve el porcentaje de segmentos alcanzados de cada caso.
+    """
+    rutas = [r for r in listar_rutas() if len(leer_esquema(r).columnas) >= 5][:n_rutas]
+    resultados = {}
+    for nombre, con_estimador in (("lecturas sin filtrar", False), ("estimador", True)):
+        alcanzados = segmentos = 0
+        tiempo = 0.0
+        for file_path in rutas:
+            estimador = EstimadorPosicion() if con_estimador else None
+            move = lambda *args, **kwargs: ordenes.move_drone(*args, estimador=estimador, **kwargs)
+            resultado = replay_ruta(file_path, ruido=ruido, move=move)
+            if "error" in resultado:
+                continue
+            alcanzados += round(resultado["exito"] * resultado["segmentos"])
+            segmentos += resultado["segmentos"]
+            tiempo += resultado["t_total"]
+        resultados[nombre] = alcanzados / segmentos
+        print(f"  {nombre:<21} {alcanzados}/{segmentos} segmentos alcanzados ({alcanzados / segmentos:.0%}), "
+              f"{tiempo:.0f} s simulados")
+    return resultados
+
+
+if __name__ == "__main__":
+    ciclos = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    presupuesto = 1.0 / FRECUENCIA_CONTROL
+
+    # Coste por ciclo
+    snapshots, columnas = snapshots_sinteticos(ciclos)
+    coste_por_ciclo(snapshots[:1000])  # Calentamiento
+    tiempos, estimador = coste_por_ciclo(snapshots)
+    print(f"update(): {ciclos} ciclos, medio {tiempos.mean() * 1e6:.1f} us, "
+          f"p99 {np.percentile(tiempos, 99) * 1e6:.1f} us, máx {tiempos.max() * 1e6:.1f} us "
+          f"({tiempos.mean() / presupuesto:.4%} del presupuesto de {presupuesto * 1000:.0f} ms)")
+
+    sim = Simulador(semilla=0)
+    lector = TelemetryReader(sim.cs, campos=CAMPOS_ESTIMADOR)
+    otro = EstimadorPosicion()
+    inicio = time.perf_counter()
+    for _ in range(10000):
+        otro.update(lector.read())
+    medio = (time.perf_counter() - inicio) / 10000
+    print(f"Lectura de cs + update(): medio {medio * 1e6:.1f} us ({medio / presupuesto:.4%} del presupuesto)")
+
+    # Equivalencia y velocidad del modo por lotes
+    inicio = time.perf_counter()
+    x, y, z = estimar_lote(*columnas[:4], sonar=columnas[4], baro=columnas[5], flujo_acumulado=True)
+    t_lote = time.perf_counter() - inicio
+    ciclo_a_ciclo = EstimadorPosicion()
+    estimados = np.empty((ciclos, 3))
+    for i, snap in enumerate(snapshots):
+        ciclo_a_ciclo.update(snap)
+        estimados[i] = ciclo_a_ciclo.x, ciclo_a_ciclo.y, ciclo_a_ciclo.z
+    diferencia = np.abs(estimados - np.column_stack((x, y, z))).max()
+    assert diferencia < 1e-6, f"estimar_lote no coincide con update(): {diferencia}"
+    print(f"estimar_lote: {t_lote * 1000:.1f} ms para {ciclos} ciclos ({t_lote / ciclos * 1e9:.0f} ns/ciclo), "
+          f"diferencia máxima con update() {diferencia:.1e}")
+
+    # Mismos ejes del mundo que reconstruct_trajectory con calidad buena
+    with tempfile.TemporaryDirectory() as carpeta:
+        diferencia = ruta_calidad_buena(carpeta)
+    assert diferencia < 1e-9, f"estimar_ruta no coincide con reconstruct_trajectory: {diferencia}"
+    print(f"estimar_ruta con calidad buena: diferencia máxima con reconstruct_trajectory {diferencia:.1e}")
+
+    # Precisión en un vuelo simulado con ruido
+    ruido = RUIDO
+    f = vuelo_simulado(ruido)
+    error_z_sonar = np.sqrt(np.mean((f[:, 6] - f[:, 2]) ** 2))
+    error_z = np.sqrt(np.mean((f[:, 5] - f[:, 2]) ** 2))
+    error_xy_cuerpo = np.hypot(f[-1, 7] - f[-1, 0], f[-1, 8] - f[-1, 1])
+    error_xy = np.hypot(f[-1, 3] - f[-1, 0], f[-1, 4] - f[-1, 1])
+    print(f"Vuelo simulado ({len(f)} ciclos, ruido {ruido}):")
+    print(f"  altura RMS: ToF sin filtrar {error_z_sonar:.3f} m, estimada {error_z:.3f} m")
+    print(f"  posición final: flujo sin rotar {error_xy_cuerpo:.3f} m, estimada en el mundo {error_xy:.3f} m")
+
+    # El estimador en el bucle de control de move_drone
+    print(f"Rutas reproducidas con move_drone (ruido {ruido}):")
+    control_con_estimador(RUTAS_REPRODUCIDAS, ruido)
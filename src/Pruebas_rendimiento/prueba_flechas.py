@@ -0,0 +1,62 @@
+"""
+Prueba de rendimiento del dibujo de las flechas de dirección.
+Compara el tiempo de construcción y de dibujado de la figura entre el modo original (una flecha por segmento)
+y el modo en lote de dibujo.py para trayectorias de 1k, 10k y 100k puntos.
+Uso: python prueba_flechas.py [n_puntos ...]
+"""
+import sys
+import os
+import time
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dibujo import dibujar_flechas, MODO_LOTE, MODO_INDIVIDUAL
+
+
+def trayectoria_sintetica(n_puntos, semilla=0):
+    """Genera una trayectoria aleatoria de n_puntos en 3D."""
+    rng = np.random.default_rng(semilla)
+    pasos = rng.normal(0, 0.05, (n_puntos, 3))
+    return np.cumsum(pasos, axis=0).T
+
+
+def medir_figura(x, y, z, modo, en_3d):
+    """
+    Construye una figura con las flechas en el modo indicado y la dibuja.
+    Returns:
+        t_construccion, t_dibujado: Tiempos en segundos.
+        n_artistas: Número de artistas creados para las flechas.
+    """
+    inicio = time.perf_counter()
+    fig = plt.figure()
+    if en_3d:
+        ax = fig.add_subplot(111, projection='3d')
+        artistas = dibujar_flechas(ax, x, y, z, modo=modo)
+    else:
+        ax = fig.add_subplot(111)
+        artistas = dibujar_flechas(ax, x, y, modo=modo)
+    t_construccion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    fig.canvas.draw()
+    t_dibujado = time.perf_counter() - inicio
+
+    plt.close(fig)
+    return t_construccion, t_dibujado, len(artistas)
+
+
+if __name__ == "__main__":
+    tamanos = [int(a) for a in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print(f"{'puntos':>8} {'vista':>5} {'modo':>10} {'artistas':>9} {'construir (s)':>14} {'dibujar (s)':>12}")
+    for n_puntos in tamanos:
+        x, y, z = trayectoria_sintetica(n_puntos)
+        for en_3d in (False, True):
+            for modo in (MODO_INDIVIDUAL, MODO_LOTE):
+                t_c, t_d, n_art = medir_figura(x, y, z, modo, en_3d)
+                vista = "3D" if en_3d else "2D"
+                print(f"{n_puntos:>8} {vista:>5} {modo:>10} {n_art:>9} {t_c:>14.3f} {t_d:>12.3f}")
@@ -0,0 +1,86 @@
+"""
+Prueba de rendimiento del formato binario de rutas.
+Compara el tiempo de carga y el tamaño en disco de np.genfromtxt sobre el formato de texto
+con leer_binario (np.memmap) sobre el formato .rutb, para un registro sintético y para el corpus de Rutas/.
+Uso: python prueba_formato_binario.py [n_filas]
+"""
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from formato_binario import txt_a_binario, binario_a_txt, leer_binario, cargar_ruta
+
+COLUMNAS = ["opt_m_x", "opt_m_y", "opt_qua", "yaw", "alt", "battery_V", "objetivo_alcanzado"]
+
+
+def escribir_registro_texto(file_path, filas, semilla=0):
+    """Escribe un registro sintético en el formato de texto de move_drone."""
+    rng = np.random.default_rng(semilla)
+    datos = np.column_stack([
+        rng.normal(0, 0.05, filas), rng.normal(0, 0.05, filas), rng.integers(0, 256, filas),
+        rng.uniform(0, 360, filas), rng.uniform(0, 2, filas), np.linspace(16.8, 14.8, filas),
+    ])
+    exito = rng.random(filas) < 0.1
+    with open(file_path, "w") as f:
+        f.write(", ".join(COLUMNAS) + "\n")
+        for fila, ok in zip(datos.tolist(), exito.tolist()):
+            f.write(", ".join(repr(v) for v in fila) + f", {ok}\n")
+
+
+def medir_carga(txt_path, bin_path, repeticiones=3):
+    """Devuelve el mejor tiempo de carga (s) con genfromtxt y con leer_binario, recorriendo todos los datos."""
+    t_txt = t_bin = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        np.genfromtxt(txt_path, delimiter=',', skip_header=1).sum(axis=0)
+        t_txt = min(t_txt, time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        leer_binario(bin_path)[0].sum(axis=0)
+        t_bin = min(t_bin, time.perf_counter() - inicio)
+    return t_txt, t_bin
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        txt_path = os.path.join(tmp, "sintetico.txt")
+        escribir_registro_texto(txt_path, filas)
+        bin_path = txt_a_binario(txt_path)
+
+        # Comprobar la conversión de ida y vuelta
+        vuelta = binario_a_txt(bin_path, os.path.join(tmp, "vuelta.txt"))
+        assert np.array_equal(cargar_ruta(vuelta)[1][:, :6], leer_binario(bin_path)[0][:, :6])
+
+        t_txt, t_bin = medir_carga(txt_path, bin_path)
+        print(f"Registro sintético de {filas} filas:")
+        print(f"  texto:   {os.path.getsize(txt_path) / 1e6:8.2f} MB  genfromtxt   {t_txt:8.4f} s")
+        print(f"  binario: {os.path.getsize(bin_path) / 1e6:8.2f} MB  leer_binario {t_bin:8.4f} s")
+        print(f"  Aceleración de carga: x{t_txt / t_bin:.0f}")
+
+        # Corpus de Rutas/
+        rutas_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Rutas")
+        tam_txt = tam_bin = 0
+        t_txt = t_bin = 0.0
+        n_archivos = 0
+        for raiz, _, archivos in os.walk(rutas_dir):
+            for nombre in archivos:
+                if not nombre.endswith(".txt"):
+                    continue
+                origen = os.path.join(raiz, nombre)
+                destino = txt_a_binario(origen, os.path.join(tmp, f"{n_archivos}.rutb"))
+                a, b = medir_carga(origen, destino, repeticiones=1)
+                t_txt += a
+                t_bin += b
+                tam_txt += os.path.getsize(origen)
+                tam_bin += os.path.getsize(destino)
+                n_archivos += 1
+
+        print(f"Corpus Rutas/ ({n_archivos} archivos):")
+        print(f"  texto:   {tam_txt / 1e3:8.1f} kB  genfromtxt   {t_txt:8.4f} s")
+        print(f"  binario: {tam_bin / 1e3:8.1f} kB  leer_binario {t_bin:8.4f} s")
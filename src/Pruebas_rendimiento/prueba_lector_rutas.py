@@ -0,0 +1,146 @@
+"""
+Prueba de rendimiento del lector común de rutas (lector_rutas.py) frente a np.genfromtxt.
+Sobre los archivos de Rutas y sobre un registro sintético grande de 7 columnas mide:
+    - genfromtxt (con un convertidor para True/False, como lo usaba cargar_ruta),
+    - leer_ruta por defecto, sin caché (lectura del texto con np.loadtxt),
+    - leer_ruta con la caché caliente: la copia binaria ya creada (lecturas siguientes de un mismo archivo),
+y comprueba que el lector devuelve exactamente los mismos valores que genfromtxt, que todas las rutas tienen una
+variante conocida, que sin caché es al menos MEJORA_MINIMA_TEXTO veces más rápido y con la caché caliente al menos
+MEJORA_MINIMA veces, que por defecto no escribe copias y que la caché no deja archivos en Rutas.
+También comprueba que una copia incompleta de la caché (escrita a medias) se descarta y se vuelve a crear.
+Uso: python prueba_lector_rutas.py [filas] [repeticiones]
+"""
+import sys
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from formato_binario import _valor_texto, COLUMNAS_BOOLEANAS
+import lector_rutas
+from lector_rutas import leer_ruta, a_matriz, ESQUEMAS, ESQUEMA_DESCONOCIDO
+from replay_rutas import listar_rutas, RUTAS_DIR
+from prueba_reconstruccion import generar_registro
+
+# Mejora mínima frente a genfromtxt de leer_ruta sin caché y con la caché caliente
+MEJORA_MINIMA_TEXTO = 1.5
+MEJORA_MINIMA = 5.0
+
+
+def leer_genfromtxt(file_path):
+    """Lectura de referencia: genfromtxt con la columna objetivo_alcanzado convertida a 1.0/0.0."""
+    with open(file_path, "r") as f:
+        cabecera = [col.strip() for col in f.readline().strip().split(",")]
+    convertidores = {i: lambda v: _valor_texto(v.decode() if isinstance(v, bytes) else v)
+                     for i, col in enumerate(cabecera) if col in COLUMNAS_BOOLEANAS}
+    return cabecera, np.genfromtxt(file_path, delimiter=',', skip_header=1, ndmin=2, converters=convertidores or None)
+
+
+def escribir_sintetico(file_path, filas):
+    """Registro sintético con el formato de move_drone (7 columnas, objetivo_alcanzado como True/False)."""
+    rng = np.random.default_rng(2)
+    datos = generar_registro(filas)
+    with open(file_path, "w") as f:
+        f.write(", ".join(ESQUEMAS["completo"]) + "\n")
+        for fila, objetivo in zip(datos.tolist(), rng.random(filas) < 0.1):
+            f.write(", ".join([repr(v) for v in fila] + [str(bool(objetivo))]) + "\n")
+
+
+def archivos_rutas():
+    """Todos los archivos de Rutas y sus subdirectorios, para comprobar que la caché no deja nada allí."""
+    return sorted(os.path.join(raiz, nombre) for raiz, _, nombres in os.walk(RUTAS_DIR) for nombre in nombres)
+
+
+def medir(funcion, rutas, repeticiones):
+    """Mejor tiempo total de leer todas las rutas."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for file_path in rutas:
+            funcion(file_path)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def comparar(nombre, rutas, repeticiones):
+    """
+    Comprueba la equivalencia con genfromtxt e imprime los tiempos de un conjunto de rutas.
+    Returns:
+        True si todas las variantes son conocidas y leer_ruta alcanza las mejoras mínimas.
+    """
+    variantes = {}
+    for file_path in rutas:
+        _, referencia = leer_genfromtxt(file_path)
+        esquema, datos = leer_ruta(file_path)
+        assert np.array_equal(a_matriz(datos), referencia, equal_nan=True), f"Valores distintos en {file_path}"
+        variantes[esquema.nombre] = variantes.get(esquema.nombre, 0) + 1
+
+    t_genfromtxt = medir(leer_genfromtxt, rutas, repeticiones)
+    t_texto = medir(leer_ruta, rutas, repeticiones)
+    for file_path in rutas:
+        leer_ruta(file_path, cache=True)        # Crea las copias binarias
+    t_cache = medir(lambda p: leer_ruta(p, cache=True), rutas, repeticiones)
+
+    mejora_texto = t_genfromtxt / t_texto
+    mejora = t_genfromtxt / t_cache
+    correcto = (ESQUEMA_DESCONOCIDO not in variantes and mejora_texto >= MEJORA_MINIMA_TEXTO
+                and mejora >= MEJORA_MINIMA)
+    print(f"{nombre}: {len(rutas)} archivos, variantes {variantes}")
+    print(f"  genfromtxt                    {t_genfromtxt * 1000:9.1f} ms")
+    print(f"  leer_ruta sin caché           {t_texto * 1000:9.1f} ms  (x{mejora_texto:.1f}, "
+          f"mínimo x{MEJORA_MINIMA_TEXTO:g})")
+    print(f"  leer_ruta con caché caliente  {t_cache * 1000:9.1f} ms  (x{mejora:.1f}, mínimo x{MEJORA_MINIMA:g}; "
+          f"solo desde la segunda lectura de cada archivo)")
+    print(f"  {'OK' if correcto else 'FALLO'}")
+    return correcto
+
+
+def copia_incompleta(file_path):
+    """
+    Trunca la copia de la caché de un archivo como si se hubiera escrito a medias y comprueba que la lectura
+    siguiente devuelve el archivo completo y vuelve a crear la copia. Devuelve True si es así.
+    """
+    _, referencia = leer_genfromtxt(file_path)
+    leer_ruta(file_path, cache=True)
+    copia = lector_rutas._ruta_cache(file_path)
+    with open(copia, "r+b") as f:
+        f.truncate(os.path.getsize(copia) - 4)
+    _, datos = leer_ruta(file_path, cache=True)
+    _, releida = leer_ruta(file_path, cache=True)
+    temporales = [nombre for nombre in os.listdir(os.path.dirname(copia)) if nombre.endswith(".tmp")]
+    correcto = (np.array_equal(a_matriz(datos), referencia, equal_nan=True)
+                and np.array_equal(a_matriz(releida), referencia, equal_nan=True) and not temporales)
+    print(f"Copia incompleta en la caché: {'OK' if correcto else 'FALLO'}")
+    return correcto
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    # La caché se crea en un directorio temporal para no tocar la del usuario; por defecto está desactivada
+    temporal = tempfile.mkdtemp()
+    lector_rutas.CARPETA_CACHE = os.path.join(temporal, "cache")
+    lector_rutas.USAR_CACHE = False
+    try:
+        antes = archivos_rutas()
+        correcto = comparar("Rutas", listar_rutas(), repeticiones)
+        if archivos_rutas() != antes:
+            print("FALLO: la caché ha dejado archivos en Rutas")
+            correcto = False
+
+        sintetico = os.path.join(temporal, "sintetico.txt")
+        escribir_sintetico(sintetico, filas)
+        shutil.rmtree(lector_rutas.CARPETA_CACHE)
+        leer_ruta(sintetico)
+        if os.path.exists(lector_rutas.CARPETA_CACHE):
+            print("FALLO: leer_ruta ha escrito una copia sin activar la caché")
+            correcto = False
+        correcto &= comparar(f"Sintético ({filas} filas)", [sintetico], max(1, repeticiones // 2))
+        correcto &= copia_incompleta(sintetico)
+    finally:
+        shutil.rmtree(temporal)
+    sys.exit(0 if correcto else 1)
@@ -0,0 +1,78 @@
+"""
+Prueba de rendimiento del modo LOD de las gráficas.
+Dibuja (backend Agg, sin ventana) la trayectoria 3D de un registro sintético con todos los puntos y con LOD,
+mide el tiempo de crear y renderizar la figura y el de un zoom, y comprueba que el LOD conserva los puntos forzados
+(objetivo_alcanzado y calidades atípicas).
+Uso: python prueba_lod.py [filas] [max_puntos]
+"""
+import sys
+import os
+import time
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import matplotlib.colors as mcolors
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from trayectoria import reconstruct_trajectory
+from grafica import colores_puntos
+from lod import PuntosLOD, indices_lod, forzados_trayectoria, MAX_PUNTOS_LOD
+from prueba_reconstruccion import generar_registro
+
+
+def registro_con_objetivos(filas):
+    """Registro sintético de 7 columnas con algunos objetivos alcanzados y calidades atípicas."""
+    rng = np.random.default_rng(1)
+    datos = np.column_stack((generar_registro(filas), np.zeros(filas)))
+    datos[:, 2] = rng.normal(200, 5, filas)
+    datos[rng.choice(filas, 50, replace=False), 6] = 1
+    datos[rng.choice(filas, 50, replace=False), 2] = 20
+    return datos
+
+
+def dibujar(datos, lod, max_puntos):
+    """Crea y renderiza la figura 3D. Devuelve el tiempo empleado, el de un zoom y el objeto PuntosLOD."""
+    inicio = time.perf_counter()
+    x, y, z = reconstruct_trajectory(datos)
+    colores = np.vstack((mcolors.to_rgba('red'), colores_puntos(datos[:, 2], datos[:, 6])))
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    puntos = None
+    if lod:
+        puntos = PuntosLOD(ax, (x, y, z), colores, forzados_trayectoria(datos), max_puntos, marker='o')
+        puntos.dibujar()
+    else:
+        ax.scatter(x, y, z, c=colores, marker='o')
+    fig.canvas.draw()
+    t_dibujo = time.perf_counter() - inicio
+
+    # Zoom a la cuarta parte central del recorrido en X e Y
+    inicio = time.perf_counter()
+    for lim, c in ((ax.set_xlim, x), (ax.set_ylim, y)):
+        centro, ancho = (np.nanmin(c) + np.nanmax(c)) / 2, np.ptp(c) / 8
+        lim(centro - ancho, centro + ancho)
+    fig.canvas.draw()
+    t_zoom = time.perf_counter() - inicio
+    plt.close(fig)
+    return t_dibujo, t_zoom, puntos
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    max_puntos = int(sys.argv[2]) if len(sys.argv) > 2 else MAX_PUNTOS_LOD
+    datos = registro_con_objetivos(filas)
+
+    t_todos, z_todos, _ = dibujar(datos, False, max_puntos)
+    t_lod, z_lod, puntos = dibujar(datos, True, max_puntos)
+
+    forzados = np.flatnonzero(forzados_trayectoria(datos))
+    iniciales = indices_lod(puntos.coords, max_puntos, puntos.forzados)
+    assert np.isin(forzados, iniciales).all(), "El LOD ha descartado puntos forzados"
+
+    print(f"Filas: {filas}, max_puntos {max_puntos}, {len(forzados)} puntos forzados")
+    print(f"Todos los puntos: dibujo {t_todos:7.3f} s  zoom {z_todos:7.3f} s")
+    print(f"LOD ({len(iniciales)} puntos): dibujo {t_lod:7.3f} s  zoom {z_lod:7.3f} s "
+          f"({len(puntos.indices)} puntos tras el zoom)")
+    print(f"Aceleración del dibujo: x{t_todos / t_lod:.1f}")
@@ -0,0 +1,85 @@
+"""
+Prueba de los objetivos en ejes del mundo (marco_mundo.py) frente a los objetivos en ejes del cuerpo.
+    - Comprueba que waypoints_mundo coincide con trayectoria.reconstruct_trajectory en todas las rutas.
+    - Reproduce el corpus en el simulador con los dos modos de move_drone y compara la tasa de éxito y los tiempos
+      de finalización de los segmentos (medio, percentil 90, máximo y total), en conjunto y por ruta.
+      Los segmentos que empiezan en el suelo se separan. En los dos modos las filas con un desplazamiento menor
+      que la tolerancia se dan por alcanzadas sin moverse y un segmento que agota su tiempo no retrasa a los
+      siguientes (PosicionMundo.reanclar); la diferencia que queda es que en ejes del mundo el dron recorre el
+      desplazamiento de cada fila, mientras que en ejes del cuerpo basta con quedar a menos de la tolerancia de él.
+Uso: python prueba_marco_mundo.py [directorio] [procesos]
+"""
+import sys
+import os
+import time
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import ordenes
+from trayectoria import reconstruct_trajectory
+from marco_mundo import MARCO_CUERPO, MARCO_MUNDO, waypoints_mundo
+from replay_rutas import listar_rutas, replay_corpus, RUTAS_DIR
+
+
+def comprobar_waypoints(rutas):
+    """Compara waypoints_mundo con la reconstrucción de grafica.py; devuelve el número de rutas comparadas."""
+    comparadas = 0
+    for ruta in rutas:
+        filas = [f for f in ordenes.read_variations(ruta) if len(f) >= 5]
+        if not filas:
+            continue
+        puntos = np.array(waypoints_mundo(filas))
+        x, y, _ = reconstruct_trajectory(np.array([f[:5] for f in filas], dtype=float))
+        assert np.allclose(puntos[:, 0], x[1:]) and np.allclose(puntos[:, 1], y[1:]), ruta
+        comparadas += 1
+    return comparadas
+
+
+def resumir(resultados):
+    """Tasa de éxito de todas las rutas válidas y tiempos por segmento, en total, en el suelo y en el aire."""
+    validos = [r for r in resultados if "error" not in r]
+    segmentos = sum(r["segmentos"] for r in validos)
+    tiempos = np.concatenate([r["tiempos_seg"] for r in validos])
+    en_vuelo = np.concatenate([r["en_vuelo_seg"] for r in validos])
+    resumen = {
+        "rutas": len(validos),
+        "segmentos": segmentos,
+        "exito": sum(r["exito"] * r["segmentos"] for r in validos) / segmentos,
+        "error_xy": np.median([r["error_xy"] for r in validos]),
+    }
+    for clave, mascara in (("todos", np.ones_like(en_vuelo)), ("suelo", ~en_vuelo), ("aire", en_vuelo)):
+        t = tiempos[mascara]
+        resumen[clave] = (len(t), t.mean(), np.percentile(t, 90), t.max(), t.sum()) if len(t) else (0, 0, 0, 0, 0)
+    return resumen
+
+
+if __name__ == "__main__":
+    directorio = sys.argv[1] if len(sys.argv) > 1 else RUTAS_DIR
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    rutas = listar_rutas(directorio)
+
+    print(f"waypoints_mundo coincide con reconstruct_trajectory en {comprobar_waypoints(rutas)} rutas")
+
+    resultados = {}
+    for marco in (MARCO_CUERPO, MARCO_MUNDO):
+        inicio = time.perf_counter()
+        resultados[marco] = replay_corpus(rutas, procesos=procesos, marco=marco)
+        print(f"Modo {marco}: {time.perf_counter() - inicio:.1f} s de tiempo real")
+
+    print(f"{'modo':<8} {'rutas':>5} {'éxito':>6} {'err_xy med':>10} | {'grupo':<6} {'seg':>5} {'t_med(s)':>9} "
+          f"{'p90(s)':>7} {'t_max(s)':>9} {'t_tot(s)':>9}")
+    for marco, lista in resultados.items():
+        r = resumir(lista)
+        cabecera = f"{marco:<8} {r['rutas']:>5} {r['exito']:>6.0%} {r['error_xy']:>10.3f}"
+        for grupo in ("todos", "suelo", "aire"):
+            n, medio, p90, maximo, total = r[grupo]
+            print(f"{cabecera} | {grupo:<6} {n:>5} {medio:>9.2f} {p90:>7.2f} {maximo:>9.2f} {total:>9.1f}")
+            cabecera = " " * len(cabecera)
+
+    # Rutas con más diferencia de tiempo total entre los dos modos
+    print("Rutas con más diferencia de tiempo total (mundo - cuerpo):")
+    pares = [(m["t_total"] - c["t_total"], c["ruta"], c["t_total"], m["t_total"])
+             for c, m in zip(resultados[MARCO_CUERPO], resultados[MARCO_MUNDO]) if "error" not in c]
+    for diferencia, ruta, t_cuerpo, t_mundo in sorted(pares, key=lambda p: -abs(p[0]))[:5]:
+        print(f"  {ruta[:58]:<58} cuerpo {t_cuerpo:>7.1f} s, mundo {t_mundo:>7.1f} s ({diferencia:+.1f} s)")
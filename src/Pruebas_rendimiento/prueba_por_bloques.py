@@ -0,0 +1,71 @@
+"""
+Prueba de la reconstrucción por bloques.
+Escribe un registro sintético en binario (.rutb), lo reconstruye entero en memoria y por bloques,
+comprueba que las trayectorias son idénticas y compara tiempos y memoria máxima (tracemalloc).
+Uso: python prueba_por_bloques.py [filas] [filas_por_bloque]
+"""
+import sys
+import os
+import time
+import tempfile
+import tracemalloc
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from trayectoria import reconstruct_trajectory, reconstruir_por_bloques, recorrer_por_bloques
+from formato_binario import EscritorBinario, cargar_ruta, cargar_ruta_por_bloques, FILAS_POR_BLOQUE
+from prueba_reconstruccion import generar_registro
+
+
+def escribir_registro(file_path, datos):
+    """Escribe la matriz en formato binario por trozos."""
+    columnas = ["opt_m_x", "opt_m_y", "opt_qua", "yaw", "alt", "battery_V"]
+    with EscritorBinario(file_path, columnas) as escritor:
+        for fila in datos:
+            escritor.write_row(fila)
+
+
+def medir(funcion):
+    """Devuelve el resultado de funcion(), el tiempo empleado (s) y el pico de memoria (MB)."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    tiempo = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return resultado, tiempo, pico
+
+
+def en_memoria(file_path):
+    _, datos = cargar_ruta(file_path)
+    return reconstruct_trajectory(np.array(datos))
+
+
+def por_bloques(file_path, filas_por_bloque):
+    partes = [(x, y, z) for _, _, x, y, z in reconstruir_por_bloques(cargar_ruta_por_bloques(file_path, filas_por_bloque))]
+    return [np.concatenate([[0.0]] + [p[k] for p in partes]) for k in range(3)]
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    filas_por_bloque = int(sys.argv[2]) if len(sys.argv) > 2 else FILAS_POR_BLOQUE
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        file_path = os.path.join(carpeta, "registro.rutb")
+        escribir_registro(file_path, generar_registro(filas))
+
+        ref, t_memoria, m_memoria = medir(lambda: en_memoria(file_path))
+        bloques, _, _ = medir(lambda: por_bloques(file_path, filas_por_bloque))
+        for a, b in zip(ref, bloques):
+            assert np.array_equal(a, b), "Las trayectorias no coinciden"
+
+        (resumen, *_), t_bloques, m_bloques = medir(
+            lambda: recorrer_por_bloques(cargar_ruta_por_bloques(file_path, filas_por_bloque)))
+        assert resumen.filas == filas
+        assert np.array_equal(resumen.final, [ref[0][-1], ref[1][-1], ref[2][-1]])
+
+    print(f"Filas: {filas}, {filas_por_bloque} filas por bloque")
+    print(f"En memoria:  {t_memoria:7.3f} s  pico {m_memoria:8.1f} MB")
+    print(f"Por bloques: {t_bloques:7.3f} s  pico {m_bloques:8.1f} MB (resumen y trayectoria diezmada)")
+    print("Las trayectorias por bloques y en memoria son idénticas.")
@@ -0,0 +1,97 @@
+"""
+Prueba de rendimiento de la reconstrucción de la trayectoria.
+Compara el bucle por filas que usaba grafica.py con reconstruct_trajectory sobre un registro sintético de 1M de filas.
+"""
+import sys
+import os
+import math
+import time
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from trayectoria import reconstruct_trajectory
+
+
+def reconstruccion_por_filas(datos):
+    """
+    Reconstrucción original de grafica.main, fila a fila con math.cos/sin y listas.
+    Args:
+        datos: Matriz NxM con las columnas opt_m_x, opt_m_y, opt_qua, yaw, alt.
+    Returns:
+        x_coords, y_coords, z_coords: Listas con las coordenadas de la trayectoria.
+    """
+    x_coords = [0]
+    y_coords = [0]
+    z_coords = [0]
+    previous_yaw_raw = None
+    acum_yaw = 0
+
+    for i in range(len(datos)):
+        opt_m_x = -datos[i, 0]
+        opt_m_y = datos[i, 1]
+        current_yaw_raw = math.radians(datos[i, 3])
+
+        if previous_yaw_raw is None:
+            acum_yaw = current_yaw_raw
+        else:
+            diff = current_yaw_raw - previous_yaw_raw
+            if diff > math.pi:
+                diff -= 2 * math.pi
+            elif diff < -math.pi:
+                diff += 2 * math.pi
+            acum_yaw += diff
+        previous_yaw_raw = current_yaw_raw
+
+        delta_x = opt_m_x * math.cos(acum_yaw) - opt_m_y * math.sin(acum_yaw)
+        delta_y = opt_m_x * math.sin(acum_yaw) + opt_m_y * math.cos(acum_yaw)
+        x_coords.append(x_coords[-1] + delta_x)
+        y_coords.append(y_coords[-1] + delta_y)
+        z_coords.append(datos[i, 4])
+
+    return x_coords, y_coords, z_coords
+
+
+def generar_registro(filas, semilla=0):
+    """
+    Genera un registro sintético con el formato opt_m_x, opt_m_y, opt_qua, yaw, alt, battery_V.
+    Args:
+        filas: Número de filas del registro.
+        semilla: Semilla del generador aleatorio.
+    Returns:
+        datos: Matriz de filas x 6.
+    """
+    rng = np.random.default_rng(semilla)
+    datos = np.empty((filas, 6))
+    datos[:, 0] = rng.normal(0, 0.05, filas)
+    datos[:, 1] = rng.normal(0, 0.05, filas)
+    datos[:, 2] = rng.integers(0, 256, filas)
+    # Yaw en grados [0, 360) con giros lentos que cruzan 0/360
+    datos[:, 3] = np.mod(np.cumsum(rng.normal(0, 2, filas)), 360)
+    datos[:, 4] = 1.0 + rng.normal(0, 0.01, filas)
+    datos[:, 5] = np.linspace(16.8, 14.8, filas)
+    return datos
+
+
+def medir(funcion, datos):
+    """Devuelve el resultado de funcion(datos) y el tiempo empleado en segundos."""
+    inicio = time.perf_counter()
+    resultado = funcion(datos)
+    return resultado, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    datos = generar_registro(filas)
+
+    ref, t_bucle = medir(reconstruccion_por_filas, datos)
+    vec, t_vector = medir(reconstruct_trajectory, datos)
+
+    # Comprobar que ambos métodos producen la misma trayectoria
+    for a, b in zip(ref, vec):
+        assert np.allclose(a, b, atol=1e-6), "Las trayectorias no coinciden"
+
+    print(f"Filas: {filas}")
+    print(f"Bucle por filas:  {t_bucle:8.3f} s  ({filas / t_bucle:12.0f} filas/s)")
+    print(f"Vectorizado:      {t_vector:8.3f} s  ({filas / t_vector:12.0f} filas/s)")
+    print(f"Aceleración: x{t_bucle / t_vector:.1f}")
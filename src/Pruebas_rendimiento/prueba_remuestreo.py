@@ -0,0 +1,135 @@
+"""
+Prueba del remuestreo en el tiempo de los archivos de ruta (remuestreo.py).
+    - Rendimiento: remuestrea un registro sintético grande (a 100 Hz con variación del periodo) a 10 Hz con
+      remuestrear, que interpola todas las columnas a la vez, y con una referencia columna a columna (np.interp
+      y un bucle en Python para objetivo_alcanzado), y comprueba que dan el mismo resultado.
+    - Alineación: registra el mismo vuelo simulado a 100 Hz y a 10 Hz con ruta.registrar y compara la altura y el
+      yaw de los dos registros alineados en una rejilla común.
+    - Rutas: diezma cada archivo de Rutas a 1 Hz (los antiguos, con la frecuencia supuesta) y comprueba que se
+      conservan el desplazamiento total del flujo y los objetivos alcanzados.
+Uso: python prueba_remuestreo.py [filas]
+"""
+import sys
+import os
+import io
+import time
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import ruta
+from remuestreo import remuestrear, diezmar, alinear, cargar_con_tiempo, frecuencia_supuesta
+from lector_rutas import ESQUEMAS, parsear_texto, separar_tiempo
+from replay_rutas import listar_rutas, RUTAS_DIR
+from simulador import Simulador
+from prueba_reconstruccion import generar_registro
+
+CABECERA = list(ESQUEMAS["completo"])
+
+
+def remuestrear_referencia(datos, t, t_nuevo):
+    """Remuestreo de referencia columna a columna, con el mismo tratamiento de cada columna que remuestrear."""
+    resultado = np.empty((len(t_nuevo), datos.shape[1]))
+    for i in (0, 1):
+        acumulado = np.interp(t_nuevo, t, np.cumsum(datos[:, i]))
+        resultado[:, i] = np.diff(acumulado, prepend=0.0)
+    for i in (2, 4, 5):
+        resultado[:, i] = np.interp(t_nuevo, t, datos[:, i])
+    resultado[:, 3] = np.interp(t_nuevo, t, np.unwrap(datos[:, 3], period=360.0)) % 360.0
+    resultado[:, 6] = 0.0
+    for j in np.flatnonzero(datos[:, 6] == 1):
+        resultado[min(np.searchsorted(t_nuevo, t[j]), len(t_nuevo) - 1), 6] = 1.0
+    return resultado
+
+
+def rendimiento(filas):
+    """Compara remuestrear con la referencia en un registro sintético; devuelve True si coinciden."""
+    rng = np.random.default_rng(1)
+    datos = np.column_stack((generar_registro(filas), rng.random(filas) < 0.01))
+    t = np.cumsum(rng.uniform(0.008, 0.012, filas))
+    t_nuevo = np.arange(t[0], t[-1], 0.1)
+
+    inicio = time.perf_counter()
+    referencia = remuestrear_referencia(datos, t, t_nuevo)
+    t_referencia = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    resultado = remuestrear(CABECERA, datos, t, t_nuevo)
+    t_vectorizado = time.perf_counter() - inicio
+
+    # Diferencia en yaw medida como ángulo (359.99 y 0.01 son el mismo)
+    diferencia = np.abs(resultado - referencia)
+    diferencia[:, 3] = np.minimum(diferencia[:, 3], 360.0 - diferencia[:, 3])
+    print(f"  {filas} filas -> {len(t_nuevo)}: referencia {t_referencia * 1000:.1f} ms, "
+          f"remuestrear {t_vectorizado * 1000:.1f} ms, diferencia máxima {diferencia.max():.2e}")
+    return diferencia.max() < 1e-9
+
+
+def registro_simulado(frecuencia, duracion, semilla=0):
+    """Registra con ruta.registrar un vuelo simulado (ascenso con giro continuo) a la frecuencia indicada."""
+    sim = Simulador(semilla=semilla)
+    sim.vehiculo.armed = True
+    sim.vehiculo.set_rc(3, 1700)
+    sim.vehiculo.set_rc(4, 1800)
+    archivo = io.StringIO()
+    ruta.registrar(sim.cs, archivo, frecuencia=frecuencia, modo="duracion", duracion=duracion,
+                   reloj=sim.reloj.monotonic, dormir=sim.reloj.sleep, imprimir=lambda texto: None)
+    cabecera = [col.strip() for col in ruta.CABECERA.split(",")]
+    return separar_tiempo(cabecera, parsear_texto(archivo.getvalue(), len(cabecera)))
+
+
+def alineacion():
+    """
+    Alinea los registros a 100 Hz y a 10 Hz en una rejilla de 3 Hz, que no coincide con las muestras del registro
+    lento, y compara la altura y el yaw (que cruza 0/360).
+    """
+    rapido = registro_simulado(100, 10.0)
+    lento = registro_simulado(10, 10.0)
+    t_comun, (a, b) = alinear([rapido, lento], 3.0)
+    error_alt = np.abs(a[:, 4] - b[:, 4]).max()
+    error_yaw = np.abs((a[:, 3] - b[:, 3] + 180.0) % 360.0 - 180.0).max()
+    print(f"  100 Hz ({len(rapido[1])} filas) y 10 Hz ({len(lento[1])} filas) en {len(t_comun)} instantes a 3 Hz: "
+          f"altura {a[0, 4]:.2f}-{a[-1, 4]:.2f} m, diferencia máxima {error_alt:.4f} m; yaw cruza 0/360 "
+          f"{int((np.abs(np.diff(rapido[1][:, 3])) > 180).sum())} veces, diferencia máxima {error_yaw:.3f}°")
+    return error_alt < 0.02 and error_yaw < 1.0
+
+
+def rutas_corpus():
+    """
+    Diezma las rutas a 1 Hz; devuelve True si el flujo total se conserva y no aparecen objetivos nuevos (dos objetivos
+    en el mismo segundo se juntan en una muestra).
+    """
+    correcto = True
+    supuestas = {}
+    juntados = 0
+    for file_path in listar_rutas(RUTAS_DIR):
+        cabecera, datos, t, medido = cargar_con_tiempo(file_path)
+        if len(cabecera) < 3 or cabecera[:2] != ["opt_m_x", "opt_m_y"] or not len(datos):
+            continue
+        if not medido:
+            frecuencia = frecuencia_supuesta(cabecera)
+            supuestas[frecuencia] = supuestas.get(frecuencia, 0) + 1
+        _, nuevos = diezmar(cabecera, datos, t, 1.0)
+        flujo = np.abs(np.nansum(datos[:, :2], axis=0) - nuevos[:, :2].sum(axis=0)).max()
+        objetivos = "objetivo_alcanzado" in cabecera
+        i = cabecera.index("objetivo_alcanzado") if objetivos else None
+        perdidos = int((datos[:, i] == 1).sum() - (nuevos[:, i] == 1).sum()) if objetivos else 0
+        juntados += max(perdidos, 0)
+        if flujo > 1e-9 or perdidos < 0:
+            correcto = False
+            print(f"  FALLO {os.path.relpath(file_path, RUTAS_DIR)}: flujo {flujo:.2e}, objetivos {perdidos}")
+    print(f"  Archivos sin columna t por frecuencia supuesta: "
+          + ", ".join(f"{f:g} Hz: {n}" for f, n in sorted(supuestas.items())))
+    print(f"  Objetivos juntados con otro en la misma muestra: {juntados}")
+    return correcto
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print("Rendimiento frente a la referencia columna a columna:")
+    correcto = rendimiento(filas)
+    print("Alineación de registros simulados a distinta frecuencia:")
+    correcto &= alineacion()
+    print("Rutas diezmadas a 1 Hz:")
+    correcto &= rutas_corpus()
+    print("OK" if correcto else "FALLO")
+    sys.exit(0 if correcto else 1)
@@ -0,0 +1,124 @@
+"""
+Prueba del runtime asyncio (runtime_async.py) contra el simulador.
+    - Tiempo simulado (BucleVirtual): recorre varias rutas compiladas (de las que tienen columnas yaw y alt) con el
+      runtime y con move_drone y comprueba que tienen los mismos segmentos, alcanzan los mismos y tardan el mismo
+      tiempo simulado (con un margen de un ciclo de control por segmento).
+    - Tiempo real: recorre unos puntos de paso con un registro cuyo write tarda RETARDO_ESCRITURA y mensajes de consola
+      que tardan RETARDO_IMPRESION, mide el retraso de los ciclos de control respecto a su plazo y comprueba que
+      ningún ciclo se atrasa más de medio periodo y que no se descarta ningún elemento del registro.
+Uso: python prueba_runtime_async.py [rutas]
+"""
+import sys
+import os
+import io
+import time
+import asyncio
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import ordenes
+import runtime_async
+from compilador_rutas import compilar_ruta
+from marco_mundo import MARCO_MUNDO
+from formato_binario import leer_cabecera_ruta
+from simulador import Simulador
+from replay_rutas import armar, listar_rutas, replay_ruta, RUTAS_DIR
+
+RETARDO_ESCRITURA = 0.2   # s que tarda cada write del registro lento
+RETARDO_IMPRESION = 0.15  # s que tarda cada mensaje de consola lento
+PUNTOS_TIEMPO_REAL = [(0.0, 0.0, 0, 0.0, 0.5), (1.0, 0.0, 0, 0.0, 0.5), (1.0, 1.0, 0, 0.0, 0.5), (0.0, 0.0, 0, 0.0, 0.5)]
+
+
+class ArchivoLento(io.StringIO):
+    """Archivo en memoria cuyo write bloquea RETARDO_ESCRITURA segundos."""
+
+    def write(self, texto):
+        time.sleep(RETARDO_ESCRITURA)
+        return super().write(texto)
+
+
+def impresion_lenta(texto):
+    time.sleep(RETARDO_IMPRESION)
+
+
+def rutas_con_yaw_y_altura(n):
+    """Las n primeras rutas de Rutas con columnas yaw y alt (las de 3 columnas no se pueden recorrer)."""
+    rutas = [ruta for ruta in listar_rutas(RUTAS_DIR) if {"yaw", "alt"} <= set(leer_cabecera_ruta(ruta))]
+    return rutas[:n]
+
+
+def comparar_con_move_drone(rutas):
+    """
+    Recorre cada ruta compilada con el runtime (tiempo simulado) y con replay_ruta; devuelve True si coinciden los
+    segmentos, los alcanzados y el tiempo simulado.
+    """
+    tolerancias = {k: ordenes.PARAMETROS_RUTA[k] for k in ("tolerance", "yaw_tolerance", "alt_tolerance")}
+    correcto = True
+    for ruta in rutas:
+        filas = [f for f in ordenes.read_variations(ruta) if len(f) >= 5]
+        plan = [p[:5] for p in compilar_ruta(filas, **tolerancias)]
+        sim = Simulador(semilla=0)
+        sim.instalar(ordenes)
+        armar(sim)
+        inicio, reloj = sim.tiempo, time.perf_counter()
+        resultados, estadisticas = runtime_async.ejecutar_en_simulador(sim, plan, log_file=io.StringIO(),
+                                                                       marco=MARCO_MUNDO, imprimir=lambda texto: None)
+        t_runtime, t_real = sim.tiempo - inicio, time.perf_counter() - reloj
+
+        referencia = replay_ruta(ruta, compilar=True)
+        alcanzados = round(referencia["exito"] * referencia["segmentos"])
+        # Cada segmento puede terminar en un ciclo de control distinto en los dos bucles
+        margen = len(resultados) / ordenes.FRECUENCIA_CONTROL
+        ok = (len(resultados) == referencia["segmentos"] and sum(resultados) == alcanzados
+              and abs(t_runtime - referencia["t_total"]) <= margen)
+        correcto &= ok
+        print(f"  {os.path.relpath(ruta, RUTAS_DIR)[:40]:<40} runtime {sum(resultados):>3}/{len(resultados):<3} "
+              f"{t_runtime:>7.1f} s simulados ({t_real:.2f} s reales) | move_drone {alcanzados:>3}/"
+              f"{referencia['segmentos']:<3} {referencia['t_total']:>7.1f} s {'OK' if ok else 'FALLO'}")
+    return correcto
+
+
+async def con_fisica_en_tiempo_real(sim, corrutina):
+    """Ejecuta la corrutina mientras otra tarea avanza el simulador al ritmo del reloj real."""
+    loop = asyncio.get_running_loop()
+    desfase = loop.time() - sim.tiempo
+
+    async def fisica():
+        while True:
+            sim.reloj.sleep(loop.time() - desfase - sim.tiempo)
+            await asyncio.sleep(sim.reloj.dt)
+
+    tarea = asyncio.ensure_future(fisica())
+    try:
+        return await corrutina
+    finally:
+        tarea.cancel()
+
+
+def tiempo_real():
+    """
+    Recorre PUNTOS_TIEMPO_REAL en tiempo real con registro y consola lentos; devuelve True si ningún ciclo de
+    control se atrasa y no se descarta nada del registro.
+    """
+    sim = Simulador(semilla=0)
+    sim.instalar(ordenes)
+    armar(sim)
+    archivo = ArchivoLento()
+    inicio = time.perf_counter()
+    resultados, estadisticas = asyncio.run(con_fisica_en_tiempo_real(sim, runtime_async.recorrer_ruta(
+        PUNTOS_TIEMPO_REAL, sim.cs, sim.Script, log_file=archivo, marco=MARCO_MUNDO, imprimir=impresion_lenta)))
+    print(f"  {sum(resultados)}/{len(resultados)} segmentos en {time.perf_counter() - inicio:.1f} s reales, "
+          f"{len(archivo.getvalue().splitlines())} muestras escritas")
+    print(f"  {estadisticas.resumen()}")
+    ok = estadisticas.ciclos_atrasados == 0 and estadisticas.descartados == 0
+    print(f"  {'OK' if ok else 'FALLO'}")
+    return ok
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Tiempo simulado, {n} rutas compiladas:")
+    correcto = comparar_con_move_drone(rutas_con_yaw_y_altura(n))
+    print(f"Tiempo real con write de {RETARDO_ESCRITURA * 1000:.0f} ms y print de {RETARDO_IMPRESION * 1000:.0f} ms:")
+    correcto &= tiempo_real()
+    sys.exit(0 if correcto else 1)
@@ -0,0 +1,109 @@
+"""
+Prueba del registro a alta frecuencia de ruta.py contra el 'cs' del simulador.
+    - Tiempo real: registra DURACION_PRUEBA segundos a 50 y 100 Hz sobre un archivo que se bloquea BLOQUEO segundos
+      cada ESCRITURAS_POR_BLOQUEO escrituras, y comprueba la frecuencia sostenida, que no se descarta ninguna muestra
+      y que las marcas de tiempo de la columna t son crecientes y separadas un periodo.
+    - Tiempo simulado: comprueba los modos de parada ("muestras", "duracion" y "desarme", desarmando el dron
+      simulado a mitad del registro).
+Uso: python prueba_ruta_alta_frecuencia.py [duracion]
+"""
+import sys
+import os
+import io
+import time
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import ruta
+from lector_rutas import parsear_texto
+from simulador import Simulador
+from replay_rutas import armar
+
+FRECUENCIAS = (50, 100)
+DURACION_PRUEBA = 5.0      # s de registro en tiempo real
+BLOQUEO = 0.25             # Duración de cada bloqueo del archivo (s)
+ESCRITURAS_POR_BLOQUEO = 5
+TOLERANCIA_FRECUENCIA = 0.01
+
+
+class ArchivoLento(io.StringIO):
+    """Archivo en memoria que se bloquea BLOQUEO segundos cada ESCRITURAS_POR_BLOQUEO escrituras."""
+
+    def __init__(self):
+        super().__init__()
+        self.escrituras = 0
+
+    def write(self, texto):
+        self.escrituras += 1
+        if self.escrituras % ESCRITURAS_POR_BLOQUEO == 0:
+            time.sleep(BLOQUEO)
+        return super().write(texto)
+
+
+def filas(archivo):
+    """Filas escritas en el archivo como matriz NxM."""
+    return parsear_texto(archivo.getvalue(), len(ruta.CABECERA.split(",")))
+
+
+def tiempo_real(frecuencia, duracion):
+    """Registra 'duracion' segundos en tiempo real; devuelve True si se cumplen todas las comprobaciones."""
+    sim = Simulador(semilla=0)
+    archivo = ArchivoLento()
+    lineas_estado = []
+    estado = ruta.registrar(sim.cs, archivo, frecuencia=frecuencia, modo="duracion", duracion=duracion,
+                            imprimir=lineas_estado.append)
+    datos = filas(archivo)
+    periodos = np.diff(datos[:, -1])
+    periodo = 1.0 / frecuencia
+
+    comprobaciones = {
+        "frecuencia": abs(estado.frecuencia - frecuencia) <= TOLERANCIA_FRECUENCIA * frecuencia,
+        "sin descartes": estado.descartadas == 0,
+        "todas escritas": len(datos) == estado.muestras == estado.escritas,
+        "t creciente": bool((periodos > 0).all()),
+        "líneas de estado": len(lineas_estado) <= duracion / ruta.INTERVALO_ESTADO + 1,
+    }
+    print(f"  {frecuencia:>3} Hz: {estado.linea()}")
+    print(f"         periodo medio {periodos.mean() * 1000:.2f} ms (objetivo {periodo * 1000:.2f} ms), "
+          f"máximo {periodos.max() * 1000:.2f} ms, {archivo.escrituras} escrituras, "
+          f"{len(lineas_estado)} líneas de estado")
+    fallos = [nombre for nombre, correcto in comprobaciones.items() if not correcto]
+    print(f"         {'OK' if not fallos else 'FALLO: ' + ', '.join(fallos)}")
+    return not fallos
+
+
+def modos_parada():
+    """Comprueba los tres modos de parada en tiempo simulado; devuelve True si son correctos."""
+    correcto = True
+    for modo, opciones, esperadas in (("muestras", {"n_muestras": 250}, 250),
+                                      ("duracion", {"duracion": 3.0}, 301),
+                                      ("desarme", {}, 200)):
+        sim = Simulador(semilla=0)
+        armar(sim)
+        desarme = sim.tiempo + 2.0
+
+        def dormir(segundos):
+            sim.reloj.sleep(segundos)
+            if modo == "desarme" and sim.tiempo >= desarme - 1e-9:
+                sim.vehiculo.armed = False
+
+        archivo = io.StringIO()
+        estado = ruta.registrar(sim.cs, archivo, frecuencia=100, modo=modo, reloj=sim.reloj.monotonic,
+                                dormir=dormir, imprimir=lambda texto: None, **opciones)
+        datos = filas(archivo)
+        ok = len(datos) == estado.muestras == esperadas and estado.descartadas == 0
+        correcto &= ok
+        print(f"  {modo:<9} {estado.muestras} muestras (esperadas {esperadas}), t final {datos[-1, -1]:.2f} s "
+              f"{'OK' if ok else 'FALLO'}")
+    return correcto
+
+
+if __name__ == "__main__":
+    duracion = float(sys.argv[1]) if len(sys.argv) > 1 else DURACION_PRUEBA
+    print(f"Tiempo real, {duracion:g} s con un archivo que se bloquea {BLOQUEO * 1000:.0f} ms "
+          f"cada {ESCRITURAS_POR_BLOQUEO} escrituras:")
+    correcto = all([tiempo_real(f, duracion) for f in FRECUENCIAS])
+    print("Modos de parada en tiempo simulado a 100 Hz:")
+    correcto &= modos_parada()
+    sys.exit(0 if correcto else 1)
@@ -0,0 +1,49 @@
+"""
+Prueba de la salida RC agrupada.
+Recorre una ruta en el simulador enviando cada canal por separado (comportamiento original, un mensaje por SendRC)
+y agrupando los canales de cada ciclo con RCOutput, y compara los mensajes de override por segundo
+que cuenta el Script simulado.
+Uso: python prueba_salida_rc.py [archivo_ruta]
+"""
+import sys
+import os
+import io
+import contextlib
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import ordenes
+from simulador import Simulador
+from salida_rc import RCOutput
+from replay_rutas import armar, RUTAS_DIR
+
+
+def recorrer(puntos, agrupar):
+    """
+    Recorre los puntos de la ruta en un simulador nuevo.
+    Returns:
+        mensajes: Mensajes de override contados por el Script simulado durante la ruta.
+        tiempo: Tiempo simulado de la ruta (s).
+        rc: Objeto RCOutput usado.
+    """
+    sim = Simulador(semilla=0)
+    sim.instalar(ordenes)
+    armar(sim)
+    mensajes_inicio = sim.Script.mensajes_rc
+    tiempo_inicio = sim.tiempo
+
+    rc = RCOutput(sim.Script, reloj=sim.reloj.monotonic, agrupar=agrupar)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for punto in puntos:
+            ordenes.move_drone(*punto[:5], rc=rc, **ordenes.PARAMETROS_RUTA)
+    return sim.Script.mensajes_rc - mensajes_inicio, sim.tiempo - tiempo_inicio, rc
+
+
+if __name__ == "__main__":
+    archivo = sys.argv[1] if len(sys.argv) > 1 else os.path.join(RUTAS_DIR, "ruta_Cuadrado.txt")
+    puntos = ordenes.read_variations(archivo)
+
+    for nombre, agrupar in (("Un mensaje por canal", False), ("RCOutput agrupado", True)):
+        mensajes, tiempo, rc = recorrer(puntos, agrupar)
+        print(f"{nombre:<22} {mensajes:>6} mensajes en {tiempo:7.1f} s simulados -> {mensajes / tiempo:6.1f} mensajes/s "
+              f"({rc.omitidos} canales sin cambios omitidos)")
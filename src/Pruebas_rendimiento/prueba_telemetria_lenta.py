@@ -0,0 +1,80 @@
+"""
+Prueba del registro de telemetría con un archivo lento.
+Simula un bucle de control de 100 ms que registra una muestra por iteración sobre un archivo cuyas escrituras
+se bloquean de vez en cuando, y compara el periodo del bucle escribiendo directamente y usando TelemetrySink.
+Uso: python prueba_telemetria_lenta.py [iteraciones]
+"""
+import sys
+import os
+import io
+import time
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from telemetria import TelemetrySink
+
+PERIODO = 0.1            # Periodo del bucle de control (s)
+BLOQUEO = 0.25           # Duración de cada bloqueo del archivo (s)
+ESCRITURAS_POR_BLOQUEO = 5
+
+
+class ArchivoLento(io.StringIO):
+    """Archivo en memoria que se bloquea BLOQUEO segundos cada ESCRITURAS_POR_BLOQUEO escrituras."""
+
+    def __init__(self):
+        super().__init__()
+        self.escrituras = 0
+
+    def write(self, texto):
+        self.escrituras += 1
+        if self.escrituras % ESCRITURAS_POR_BLOQUEO == 0:
+            time.sleep(BLOQUEO)
+        return super().write(texto)
+
+
+def bucle_control(iteraciones, registrar):
+    """
+    Ejecuta un bucle de periodo PERIODO que registra una muestra por iteración.
+    Returns:
+        periodos: Lista con la duración real de cada iteración (s).
+    """
+    periodos = []
+    anterior = time.perf_counter()
+    for i in range(iteraciones):
+        registrar((0.01 * i, -0.02 * i, 100, 90.0, 1.0, 15.5, False))
+        time.sleep(PERIODO)
+        ahora = time.perf_counter()
+        periodos.append(ahora - anterior)
+        anterior = ahora
+    return periodos
+
+
+def resumen(nombre, periodos):
+    """Imprime el periodo medio, el máximo y el número de iteraciones retrasadas más de 20 ms."""
+    media = sum(periodos) / len(periodos)
+    retrasadas = sum(1 for p in periodos if p > PERIODO + 0.02)
+    print(f"{nombre:<16} periodo medio {media * 1000:7.1f} ms  máximo {max(periodos) * 1000:7.1f} ms  "
+          f"iteraciones retrasadas: {retrasadas}/{len(periodos)}")
+    return retrasadas
+
+
+if __name__ == "__main__":
+    iteraciones = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+
+    # Escritura directa en el bucle, como hacían ruta.py y move_drone
+    archivo = ArchivoLento()
+    directo = bucle_control(iteraciones, lambda m: archivo.write(f"{m[0]}, {m[1]}, {m[2]}, {m[3]}, {m[4]}, {m[5]}, {m[6]}\n"))
+
+    # Escritura a través de TelemetrySink
+    archivo = ArchivoLento()
+    sink = TelemetrySink(archivo, capacidad=64, intervalo_flush=0.05)
+    con_sink = bucle_control(iteraciones, sink.push)
+    sink.close()
+
+    resumen("Escritura directa", directo)
+    retrasadas = resumen("TelemetrySink", con_sink)
+    print(f"Muestras escritas: {sink.written}, descartadas: {sink.dropped}")
+
+    assert sink.written == iteraciones and sink.dropped == 0, "Se han perdido muestras"
+    assert retrasadas == 0, "El archivo lento ha retrasado el bucle de control"
+    print("OK")
@@ -0,0 +1,95 @@
+"""
+Prueba de rendimiento del visor en vivo.
+Un hilo escribe muestras en un archivo de ruta a la frecuencia indicada (como ruta.py) mientras el visor lo lee
+y refresca la gráfica cada PERIODO_REFRESCO_MS con el backend Agg (sin ventana). Se mide el tiempo de cada
+refresco y la latencia de cada muestra: desde que se escribe en el archivo hasta que termina el refresco que la dibuja,
+y se comprueba que todas las muestras se dibujan y que el percentil 95 de la latencia es menor que LATENCIA_P95_MAX.
+Uso: python prueba_visor_vivo.py [frecuencia_Hz] [duracion_s] [max_puntos]
+"""
+import sys
+import os
+import time
+import tempfile
+import threading
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from visor_vivo import VisorVivo, FuenteArchivo, PERIODO_REFRESCO_MS, MAX_PUNTOS_VISOR
+from prueba_reconstruccion import generar_registro
+
+# Percentil 95 máximo de la latencia (ms)
+LATENCIA_P95_MAX = 100.0
+
+
+def escribir(file_path, datos, frecuencia, tiempos, parar):
+    """Escribe una fila del registro cada 1/frecuencia s y guarda el instante en que se escribe."""
+    periodo = 1.0 / frecuencia
+    with open(file_path, "w") as f:
+        f.write("opt_m_x, opt_m_y, opt_qua, yaw, alt, battery_V\n")
+        f.flush()
+        siguiente = time.perf_counter()
+        for fila in datos:
+            if parar.is_set():
+                return
+            f.write(", ".join(str(v) for v in fila) + "\n")
+            f.flush()
+            tiempos.append(time.perf_counter())
+            siguiente += periodo
+            espera = siguiente - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+
+
+def percentiles(valores):
+    return " ".join(f"p{p} {np.percentile(valores, p):7.2f} ms" for p in (50, 95, 99)) + f"  max {max(valores):7.2f} ms"
+
+
+if __name__ == "__main__":
+    frecuencia = float(sys.argv[1]) if len(sys.argv) > 1 else 100.0
+    duracion = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    max_puntos = int(sys.argv[3]) if len(sys.argv) > 3 else MAX_PUNTOS_VISOR
+    datos = generar_registro(int(frecuencia * duracion))
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        file_path = os.path.join(carpeta, "ruta_vivo.txt")
+        tiempos_escritura = []
+        parar = threading.Event()
+        escritor = threading.Thread(target=escribir, args=(file_path, datos, frecuencia, tiempos_escritura, parar))
+
+        fuente = FuenteArchivo(file_path)
+        visor = VisorVivo(fuente, max_puntos)
+        escritor.start()
+
+        refrescos = []
+        latencias = []
+        recibidas = 0
+        periodo = PERIODO_REFRESCO_MS / 1000.0
+        siguiente = time.perf_counter()
+        while escritor.is_alive() or recibidas < len(tiempos_escritura):
+            inicio = time.perf_counter()
+            nuevas = visor.refrescar()
+            fin = time.perf_counter()
+            if nuevas:
+                refrescos.append((fin - inicio) * 1000)
+                latencias.extend((fin - t) * 1000 for t in tiempos_escritura[recibidas:recibidas + nuevas])
+                recibidas += nuevas
+            siguiente += periodo
+            espera = siguiente - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+        parar.set()
+        escritor.join()
+        fuente.close()
+
+    print(f"{len(tiempos_escritura)} muestras escritas a {frecuencia:.0f} Hz, {recibidas} dibujadas, "
+          f"refresco cada {PERIODO_REFRESCO_MS} ms, {max_puntos} puntos en pantalla")
+    print(f"Refresco: {percentiles(refrescos)}  ({len(refrescos)} refrescos, "
+          f"{visor.redibujados} con ejes redibujados)")
+    print(f"Latencia: {percentiles(latencias)}")
+    p95 = np.percentile(latencias, 95)
+    correcto = recibidas == len(tiempos_escritura) and p95 < LATENCIA_P95_MAX
+    print(f"{'OK' if correcto else 'FALLO'}: latencia p95 {p95:.2f} ms (máximo {LATENCIA_P95_MAX:.0f} ms)")
+    sys.exit(0 if correcto else 1)
@@ -1,9 +1,14 @@
 """
 Codigo para comprobar la distancia recorrida en cada eje durante una ruta.
 """
-import csv
 import sys
-import math
+import os
+import numpy as np
+
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from trayectoria import ReconstructorIncremental
+from formato_binario import cargar_ruta_por_bloques
 
 def sumar_desplazamiento_rotado(nombre_archivo):
     """
@@ -12,39 +17,23 @@ def sumar_desplazamiento_rotado(nombre_archivo):
         nombre_archivo (str): Ruta al archivo con los datos del dron.
 
     """
-    suma_delta_x = 0.0
-    suma_delta_y = 0.0
-
-    with open(nombre_archivo, 'r', encoding='utf-8') as archivo:
-        lector = csv.reader(archivo, delimiter=',')
-        # Saltamos la cabecera
-        cabecera = next(lector)
-        
-        for fila in lector:
-            yaw_inicial = 0.0  # Inicializar yaw para la primera fila
-            if not fila:
-                continue  # Saltar filas vacías
-            try:
-                # Convertir los valores necesarios a float:
-                opt_m_x = float(fila[0].strip())
-                opt_m_y = float(fila[1].strip())
-                # Se ignora 'opt_qua' que está en fila[2]
-                # El ángulo 'yaw' se encuentra en la cuarta columna (fila[3])
-                yaw = float(fila[3].strip())
-                
-                yaw = math.radians(yaw)  # Convertir a radianes
-                yaw_diff = yaw - yaw_inicial  # Calcular la diferencia respecto al yaw inicial
-                yaw_inicial = yaw  # Actualizar yaw inicial para la siguiente iteración
-            except ValueError:
-                print("Error al procesar la fila:", fila)
-                continue
-            
-            # Calcular las componentes x e y teniendo en cuenta la rotación del dron:
-            delta_x = opt_m_x * math.cos(yaw_diff) - opt_m_y * math.sin(yaw_diff)
-            delta_y = opt_m_x * math.sin(yaw_diff) + opt_m_y * math.cos(yaw_diff)
-            
-            suma_delta_x += delta_x
-            suma_delta_y += delta_y
+    # Leer las columnas opt_m_x, opt_m_y, opt_qua y yaw por bloques (archivo de texto o binario .rutb),
+    # de forma que el archivo no tiene que caber en memoria
+    reconstructor = ReconstructorIncremental()
+    descartadas = 0
+    for datos in cargar_ruta_por_bloques(nombre_archivo):
+        datos = datos[:, :4]
+
+        # Saltar las filas que no se han podido convertir a float
+        filas_validas = ~np.isnan(datos[:, [0, 1, 3]]).any(axis=1)
+        descartadas += int((~filas_validas).sum())
+        reconstructor.procesar(datos[filas_validas])
+    if descartadas:
+        print("Filas descartadas por error de formato:", descartadas)
+
+    # La suma de los desplazamientos rotados es la última posición de la trayectoria
+    suma_delta_x = reconstructor.x
+    suma_delta_y = reconstructor.y
 
     print("Suma de delta_x:", suma_delta_x)
     print("Suma de delta_y:", suma_delta_y)
@@ -55,4 +44,4 @@ if __name__ == '__main__':
         sys.exit(1)
 
     nombre_archivo = sys.argv[1]
-    sumar_desplazamiento_rotado(nombre_archivo)
\ No newline at end of file
+    sumar_desplazamiento_rotado(nombre_archivo)
@@ -0,0 +1,199 @@
+"""
+Banco de pruebas y autoajuste de los PID de move_drone (controlador.py) en el simulador.
+Cada eje se evalúa con respuestas a escalón (ESCALONES) manteniendo los demás ejes en su objetivo, y se mide:
+    - t_tolerancia: primer instante en que el error entra en la tolerancia del eje.
+    - t_estabilizacion: instante a partir del cual el error ya no sale de la tolerancia.
+    - sobreimpulso: máximo rebase del objetivo en el sentido del escalón, en % del escalón.
+El autoajuste es una búsqueda por coordenadas sobre kp, kd y ki de cada eje que minimiza el tiempo de
+estabilización (con penalización por sobreimpulso) de todos sus escalones.
+
+Uso: python autoajuste_pid.py [--ajustar] [--guardar] [archivo_ganancias]
+    Sin opciones compara las ganancias del archivo (por defecto el ejemplo ganancias_pid_sim.json) con el control
+    proporcional original. --ajustar parte de las ganancias del archivo y --guardar escribe el resultado en el archivo.
+    Las ganancias que usa move_drone son las de ganancias_pid.json: copiar las ajustadas allí solo tras probarlas en
+    el dron real.
+"""
+import sys
+import copy
+import numpy as np
+
+from controlador import ControladorVuelo, cargar_ganancias, guardar_ganancias, ARCHIVO_GANANCIAS_SIM, EJES, \
+    GANANCIAS_POR_DEFECTO
+from telemetria import TelemetryReader
+from simulador import Simulador
+import ordenes
+
+# Escalones (inicio, objetivo) de cada eje: altura en m, yaw en grados y X/Y en m de flujo desde el inicio
+ESCALONES = {
+    "alt": [(1.0, 2.0), (2.0, 1.0)],
+    "yaw": [(0.0, 90.0), (90.0, 0.0)],
+    "x": [(0.0, 2.0)],
+    "y": [(0.0, 2.0)],
+}
+
+# Tolerancias de move_drone con las que se recorren las rutas; la de yaw es la de move_drone por defecto
+TOLERANCIAS = {
+    "alt": ordenes.PARAMETROS_RUTA["alt_tolerance"],
+    "yaw": 2.0,
+    "x": ordenes.PARAMETROS_RUTA["tolerance"],
+    "y": ordenes.PARAMETROS_RUTA["tolerance"],
+}
+
+ALTURA_BASE = 1.5           # Altura (m) de los escalones de los demás ejes
+DURACION_ESCALON = 30.0     # Tiempo simulado (s) de cada escalón, igual que max_duration de PARAMETROS_RUTA
+PESO_SOBREIMPULSO = 0.05    # Segundos de coste por cada % de sobreimpulso
+
+# Filtro de la derivada, límite de la integral y límites de salida que se añaden antes de ajustar.
+# Los límites de altura y yaw son los rangos de RC3 y RC4 originales; X e Y se limitan a ±0.5 de stick.
+BASE_AJUSTE = {
+    "alt": {"tau_derivada": 0.2, "limite_integral": 50.0},
+    "yaw": {"tau_derivada": 0.2, "limite_integral": 25.0},
+    "x": {"tau_derivada": 0.2, "limite_integral": 100.0, "salida_min": -250.0, "salida_max": 250.0,
+          "pendiente_max": 1000.0},
+    "y": {"tau_derivada": 0.2, "limite_integral": 100.0, "salida_min": -250.0, "salida_max": 250.0,
+          "pendiente_max": 1000.0},
+}
+FACTORES = (0.5, 0.8, 1.25, 2.0)        # Multiplicadores probados para cada ganancia no nula
+FRACCIONES_KP = (0.02, 0.1, 0.5)        # Valores probados (fracción de kp) para una ganancia nula
+
+
+def _error_yaw(objetivo, actual):
+    """Error de yaw normalizado a [-180, 180], como en move_drone."""
+    return (objetivo - actual + 180.0) % 360.0 - 180.0
+
+
+def respuesta_escalon(eje, inicio, objetivo, ganancias, duracion=DURACION_ESCALON, semilla=0, ruido=None):
+    """
+    Simula un escalón de un eje con el resto de ejes mantenidos en su objetivo.
+    Returns:
+        tiempos, valores: Arrays con el tiempo desde el inicio (s) y el valor del eje en cada ciclo de control.
+    """
+    sim = Simulador(semilla=semilla, ruido=ruido)
+    vehiculo = sim.vehiculo
+    vehiculo.armed = True
+    vehiculo.z = inicio if eje == "alt" else ALTURA_BASE
+    vehiculo.yaw = inicio if eje == "yaw" else 0.0
+    objetivo_alt = objetivo if eje == "alt" else ALTURA_BASE
+    objetivo_yaw = objetivo if eje == "yaw" else 0.0
+    objetivo_x = objetivo if eje == "x" else 0.0
+    objetivo_y = objetivo if eje == "y" else 0.0
+
+    lector = TelemetryReader(sim.cs, reloj=sim.reloj.monotonic)
+    controlador = ControladorVuelo(ganancias)
+    periodo = 1.0 / ordenes.FRECUENCIA_CONTROL
+    snap = lector.read()
+    t0, flujo_x0, flujo_y0 = snap.t, snap.opt_m_x, snap.opt_m_y
+    t_previo = None
+
+    tiempos, valores = [], []
+    for _ in range(int(duracion * ordenes.FRECUENCIA_CONTROL)):
+        snap = lector.read()
+        error_x = objetivo_x - (snap.opt_m_x - flujo_x0)
+        error_y = objetivo_y - (snap.opt_m_y - flujo_y0)
+        error_yaw = _error_yaw(objetivo_yaw, snap.yaw)
+        error_alt = objetivo_alt - snap.sonarrange
+        dt = snap.t - t_previo if t_previo is not None else periodo
+        t_previo = snap.t
+
+        errores = {"alt": error_alt, "yaw": error_yaw, "x": error_x, "y": error_y}
+        tiempos.append(snap.t - t0)
+        valores.append(objetivo - errores[eje])
+
+        for canal, pwm in enumerate(controlador.actualizar(error_x, error_y, error_yaw, error_alt, dt), 1):
+            vehiculo.set_rc(canal, pwm)
+        sim.reloj.sleep(periodo)
+    return np.array(tiempos), np.array(valores)
+
+
+def metricas(tiempos, valores, inicio, objetivo, tolerancia):
+    """
+    Returns:
+        Diccionario con t_tolerancia y t_estabilizacion (None si no se alcanzan) y sobreimpulso (%).
+    """
+    dentro = np.abs(objetivo - valores) < tolerancia
+    fuera = np.flatnonzero(~dentro)
+    if not len(fuera):
+        t_estabilizacion = tiempos[0]
+    elif fuera[-1] < len(valores) - 1:
+        t_estabilizacion = tiempos[fuera[-1] + 1]
+    else:
+        t_estabilizacion = None
+    sentido = np.sign(objetivo - inicio)
+    rebase = max(0.0, float(np.max((valores - objetivo) * sentido)))
+    return {
+        "t_tolerancia": tiempos[np.argmax(dentro)] if dentro.any() else None,
+        "t_estabilizacion": t_estabilizacion,
+        "sobreimpulso": 100.0 * rebase / abs(objetivo - inicio),
+    }
+
+
+def evaluar_eje(eje, ganancias, semilla=0, ruido=None):
+    """Métricas de todos los escalones de un eje; devuelve (lista de (inicio, objetivo, metricas), coste)."""
+    resultados = []
+    coste = 0.0
+    for inicio, objetivo in ESCALONES[eje]:
+        tiempos, valores = respuesta_escalon(eje, inicio, objetivo, ganancias, semilla=semilla, ruido=ruido)
+        m = metricas(tiempos, valores, inicio, objetivo, TOLERANCIAS[eje])
+        resultados.append((inicio, objetivo, m))
+        t = m["t_estabilizacion"]
+        coste += (DURACION_ESCALON if t is None else t) + PESO_SOBREIMPULSO * m["sobreimpulso"]
+    return resultados, coste
+
+
+def autoajustar(ganancias, ejes=EJES, rondas=3, semilla=0, ruido=None):
+    """
+    Búsqueda por coordenadas de kp, kd y ki en cada eje partiendo de 'ganancias' (más BASE_AJUSTE para los
+    parámetros que no tengan). Devuelve las ganancias ajustadas.
+    """
+    mejores = copy.deepcopy(ganancias)
+    for eje in ejes:
+        for parametro, valor in BASE_AJUSTE[eje].items():
+            mejores[eje].setdefault(parametro, valor)
+        _, mejor_coste = evaluar_eje(eje, mejores, semilla, ruido)
+        for _ in range(rondas):
+            mejorado = False
+            for parametro in ("kp", "kd", "ki"):
+                actual = mejores[eje].get(parametro, 0.0)
+                if actual:
+                    candidatos = [actual * f for f in FACTORES]
+                else:
+                    candidatos = [mejores[eje]["kp"] * f for f in FRACCIONES_KP]
+                for valor in candidatos:
+                    prueba = copy.deepcopy(mejores)
+                    prueba[eje][parametro] = round(valor, 4)
+                    _, coste = evaluar_eje(eje, prueba, semilla, ruido)
+                    if coste < mejor_coste:
+                        mejores, mejor_coste, mejorado = prueba, coste, True
+            if not mejorado:
+                break
+        print(f"{eje}: coste {mejor_coste:.2f} s con {mejores[eje]}")
+    return mejores
+
+
+def imprimir_banco(nombre, ganancias, semilla=0, ruido=None):
+    """Imprime las métricas de todos los escalones con unas ganancias."""
+    formato = lambda t: f"{t:>8.1f}" if t is not None else f"{'-':>8}"
+    print(f"{nombre}:")
+    print(f"  {'eje':<4} {'escalón':>14} {'t_tol(s)':>8} {'t_est(s)':>8} {'sobreimp':>9}")
+    for eje in EJES:
+        resultados, _ = evaluar_eje(eje, ganancias, semilla, ruido)
+        for inicio, objetivo, m in resultados:
+            print(f"  {eje:<4} {inicio:>6.1f} -> {objetivo:<5.1f} {formato(m['t_tolerancia'])} "
+                  f"{formato(m['t_estabilizacion'])} {m['sobreimpulso']:>8.1f}%")
+
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    archivo = argumentos[0] if argumentos else ARCHIVO_GANANCIAS_SIM
+
+    ganancias = cargar_ganancias(archivo)
+    imprimir_banco("Control proporcional original", cargar_ganancias(None))
+    if ganancias != {eje: dict(GANANCIAS_POR_DEFECTO[eje]) for eje in EJES}:
+        imprimir_banco(f"Ganancias de {archivo}", ganancias)
+
+    if "--ajustar" in sys.argv:
+        ganancias = autoajustar(ganancias)
+        imprimir_banco("Ganancias ajustadas", ganancias)
+        if "--guardar" in sys.argv:
+            guardar_ganancias(ganancias, archivo)
+            print(f"Ganancias guardadas en {archivo}")
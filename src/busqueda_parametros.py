@@ -0,0 +1,367 @@
+"""
+Búsqueda de parámetros de move_drone sobre vuelos simulados.
+Cada conjunto de parámetros (tolerancias y max_duration de move_drone y ganancias de controlador.py) se evalúa
+recorriendo en el simulador todas las rutas del corpus con replay_rutas.replay_ruta, repartiendo las parejas
+(conjunto, ruta) entre todos los núcleos. Para cada conjunto se obtiene el tiempo total de vuelo simulado y el
+error final medio (posición y altura al terminar cada ruta), y se calcula el frente de Pareto de ambos.
+Estrategias:
+    - rejilla: producto cartesiano de n valores por parámetro.
+    - aleatoria: n conjuntos uniformes en el espacio (logarítmicos donde la escala es "log").
+    - bayesiana: proceso gaussiano sobre una combinación de los dos objetivos con pesos aleatorios en cada lote
+      (ParEGO) y mejora esperada sobre candidatos aleatorios.
+Los resultados se guardan en caché por el hash de los parámetros completos, la semilla, el ruido y el corpus, de modo
+que repetir o ampliar una búsqueda solo simula los conjuntos nuevos. El resumen (CSV de todas las evaluaciones con
+la marca de Pareto y gráfica del frente) se guarda en ../Graficas/busqueda.
+
+Uso: python busqueda_parametros.py [rejilla|aleatoria|bayesiana] [opciones]
+    --parametros p1,p2   Parámetros a buscar (de ESPACIO); por defecto tolerance,alt_tolerance,xy.kp
+    --n N                Valores por parámetro (rejilla), conjuntos (aleatoria) o evaluaciones (bayesiana)
+    --rutas N            Usar solo las N primeras rutas del corpus
+    --procesos N         Procesos en paralelo; por defecto tantos como núcleos
+    --filas              Recorrer las filas de las rutas en lugar de compilarlas (más lento)
+"""
+import os
+import sys
+import csv
+import json
+import math
+import time
+import copy
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+
+import ordenes
+from controlador import ControladorVuelo, ganancias_archivo
+from replay_rutas import listar_rutas, replay_ruta, RUTAS_DIR
+
+SALIDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Graficas", "busqueda")
+CARPETA_CACHE = "cache"
+VERSION_CACHE = 1
+ARCHIVO_RESULTADOS = "busqueda.csv"
+ARCHIVO_FRENTE = "frente_pareto.png"
+
+ESTRATEGIAS = ("rejilla", "aleatoria", "bayesiana")
+
+# Parámetros buscables: (mínimo, máximo, escala). "eje.parametro" es una ganancia de controlador.py; "xy" fija a la
+# vez la de X y la de Y.
+ESPACIO = {
+    "tolerance": (0.1, 0.6, "lin"),
+    "yaw_tolerance": (5.0, 180.0, "log"),
+    "alt_tolerance": (0.05, 0.4, "lin"),
+    "max_duration": (5000, 30000, "lin"),
+    "alt.kp": (50.0, 1000.0, "log"),
+    "alt.kd": (1.0, 100.0, "log"),
+    "yaw.kp": (5.0, 50.0, "log"),
+    "xy.kp": (50.0, 1000.0, "log"),
+    "xy.kd": (1.0, 200.0, "log"),
+}
+PARAMETROS_POR_DEFECTO = ("tolerance", "alt_tolerance", "xy.kp")
+
+# Candidatos aleatorios sobre los que se maximiza la mejora esperada, y longitudes de escala probadas para el
+# proceso gaussiano (en el espacio normalizado [0, 1])
+CANDIDATOS_BAYESIANA = 2000
+LONGITUDES_GP = (0.1, 0.2, 0.4, 0.8)
+RUIDO_GP = 1e-4
+
+
+def resolver(conjunto):
+    """
+    Parámetros completos de un conjunto: los de move_drone (PARAMETROS_RUTA) y las ganancias (ganancias_pid.json),
+    con los valores del conjunto sustituidos.
+    """
+    move = dict(ordenes.PARAMETROS_RUTA)
+    ganancias = copy.deepcopy(ganancias_archivo())
+    for nombre, valor in conjunto.items():
+        if nombre not in ESPACIO:
+            raise ValueError(f"Parámetro desconocido: {nombre}")
+        if "." in nombre:
+            eje, parametro = nombre.split(".")
+            for e in (("x", "y") if eje == "xy" else (eje,)):
+                ganancias[e][parametro] = valor
+        else:
+            move[nombre] = int(round(valor)) if nombre == "max_duration" else valor
+    return {"move": move, "ganancias": ganancias}
+
+
+def valores_actuales(nombres):
+    """Valor actual (PARAMETROS_RUTA y ganancias_pid.json) de los parámetros indicados."""
+    resuelto = resolver({})
+    actuales = {}
+    for nombre in nombres:
+        if "." in nombre:
+            eje, parametro = nombre.split(".")
+            actuales[nombre] = resuelto["ganancias"]["x" if eje == "xy" else eje].get(parametro, 0.0)
+        else:
+            actuales[nombre] = resuelto["move"][nombre]
+    return actuales
+
+
+def clave_cache(resuelto, opciones, rutas):
+    """Hash de los parámetros completos, las opciones de la simulación y el corpus (nombre y fecha de cada ruta)."""
+    corpus = [(os.path.relpath(r, RUTAS_DIR), os.stat(r).st_mtime_ns) for r in rutas]
+    texto = json.dumps({"version": VERSION_CACHE, "parametros": resuelto, "opciones": opciones, "corpus": corpus},
+                       sort_keys=True)
+    return hashlib.sha1(texto.encode()).hexdigest()[:16]
+
+
+def _evaluar_ruta(tarea):
+    """Recorre una ruta con un conjunto de parámetros (se ejecuta en un proceso aparte)."""
+    resuelto, ruta, opciones = tarea
+    parametros = dict(resuelto["move"], controlador=ControladorVuelo(resuelto["ganancias"]))
+    resultado = replay_ruta(ruta, parametros, semilla=opciones["semilla"], ruido=opciones["ruido"],
+                            compilar=opciones["compilar"])
+    # Las listas por segmento no hacen falta y encarecen la vuelta desde el proceso
+    resultado.pop("tiempos_seg", None)
+    resultado.pop("en_vuelo_seg", None)
+    return resultado
+
+
+def agregar(resultados):
+    """Tiempo total, error final medio, error XY medio y tasa de éxito de las rutas válidas de un conjunto."""
+    validos = [r for r in resultados if "error" not in r]
+    segmentos = sum(r["segmentos"] for r in validos)
+    return {
+        "rutas": len(validos),
+        "segmentos": segmentos,
+        "t_total": sum(r["t_total"] for r in validos),
+        "error_final": sum(math.hypot(r["error_xy"], r["error_alt"]) for r in validos) / len(validos),
+        "error_xy": sum(r["error_xy"] for r in validos) / len(validos),
+        "exito": sum(r["exito"] * r["segmentos"] for r in validos) / segmentos,
+    }
+
+
+def evaluar_conjuntos(conjuntos, rutas, opciones, procesos=None, cache_dir=None):
+    """
+    Evalúa varios conjuntos de parámetros sobre el corpus; los que no están en caché se simulan en paralelo.
+    Returns:
+        Lista de diccionarios (uno por conjunto) con 'conjunto', 'clave' y las métricas de agregar().
+    """
+    cache_dir = cache_dir or os.path.join(SALIDA_DIR, CARPETA_CACHE)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    evaluaciones = []
+    pendientes = {}
+    for conjunto in conjuntos:
+        resuelto = resolver(conjunto)
+        clave = clave_cache(resuelto, opciones, rutas)
+        archivo = os.path.join(cache_dir, clave + ".json")
+        evaluacion = {"conjunto": conjunto, "clave": clave}
+        if os.path.exists(archivo):
+            with open(archivo) as f:
+                evaluacion.update(json.load(f))
+        else:
+            pendientes.setdefault(clave, (resuelto, archivo, []))[2].append(evaluacion)
+        evaluaciones.append(evaluacion)
+
+    if pendientes:
+        tareas = [(resuelto, ruta, opciones) for resuelto, _, _ in pendientes.values() for ruta in rutas]
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = list(pool.map(_evaluar_ruta, tareas, chunksize=max(1, len(rutas) // 4)))
+        for i, (resuelto, archivo, pendientes_clave) in enumerate(pendientes.values()):
+            metricas = agregar(resultados[i * len(rutas):(i + 1) * len(rutas)])
+            with open(archivo, "w") as f:
+                json.dump(metricas, f)
+            for evaluacion in pendientes_clave:
+                evaluacion.update(metricas)
+    return evaluaciones
+
+
+def _desde_unitario(nombres, u):
+    """Convierte un punto de [0, 1]^d en un conjunto de parámetros según la escala de cada uno."""
+    conjunto = {}
+    for nombre, valor in zip(nombres, u):
+        minimo, maximo, escala = ESPACIO[nombre]
+        if escala == "log":
+            conjunto[nombre] = float(minimo * (maximo / minimo) ** valor)
+        else:
+            conjunto[nombre] = float(minimo + (maximo - minimo) * valor)
+        conjunto[nombre] = round(conjunto[nombre], 4)
+    return conjunto
+
+
+def _a_unitario(nombres, conjunto):
+    """Inversa de _desde_unitario."""
+    u = []
+    for nombre in nombres:
+        minimo, maximo, escala = ESPACIO[nombre]
+        if escala == "log":
+            u.append(math.log(conjunto[nombre] / minimo) / math.log(maximo / minimo))
+        else:
+            u.append((conjunto[nombre] - minimo) / (maximo - minimo))
+    return u
+
+
+def rejilla(nombres, n):
+    """Producto cartesiano de n valores equiespaciados (en su escala) por parámetro."""
+    valores = np.linspace(0.0, 1.0, n) if n > 1 else [0.5]
+    return [_desde_unitario(nombres, u) for u in itertools.product(valores, repeat=len(nombres))]
+
+
+def aleatoria(nombres, n, semilla=0):
+    """n conjuntos uniformes en el espacio (en la escala de cada parámetro)."""
+    rng = np.random.default_rng(semilla)
+    return [_desde_unitario(nombres, u) for u in rng.random((n, len(nombres)))]
+
+
+def frente_pareto(objetivos):
+    """
+    Args:
+        objetivos: Array Nx2 de objetivos a minimizar.
+    Returns:
+        Máscara booleana de los puntos no dominados.
+    """
+    objetivos = np.asarray(objetivos, dtype=float)
+    dominado = np.zeros(len(objetivos), dtype=bool)
+    for i, punto in enumerate(objetivos):
+        mejores = np.all(objetivos <= punto, axis=1) & np.any(objetivos < punto, axis=1)
+        dominado[i] = mejores.any()
+    return ~dominado
+
+
+def _nucleo(a, b, longitud):
+    """Núcleo gaussiano (RBF) entre dos conjuntos de puntos."""
+    d2 = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+    return np.exp(-0.5 * d2 / longitud ** 2)
+
+
+def _ajustar_gp(x, y):
+    """Proceso gaussiano con la longitud de escala de LONGITUDES_GP que maximiza la verosimilitud marginal."""
+    mejor = None
+    for longitud in LONGITUDES_GP:
+        k = _nucleo(x, x, longitud) + RUIDO_GP * np.eye(len(x))
+        try:
+            l = np.linalg.cholesky(k)
+        except np.linalg.LinAlgError:
+            continue
+        alfa = np.linalg.solve(l.T, np.linalg.solve(l, y))
+        verosimilitud = -0.5 * y @ alfa - np.log(np.diag(l)).sum()
+        if mejor is None or verosimilitud > mejor[0]:
+            mejor = (verosimilitud, longitud, l, alfa)
+    return mejor[1:]
+
+
+def _mejora_esperada(x, y, candidatos):
+    """Mejora esperada (minimizando) de los candidatos según el proceso gaussiano ajustado a (x, y)."""
+    media, escala = y.mean(), y.std() or 1.0
+    yn = (y - media) / escala
+    longitud, l, alfa = _ajustar_gp(x, yn)
+    k = _nucleo(candidatos, x, longitud)
+    mu = k @ alfa
+    v = np.linalg.solve(l, k.T)
+    sigma = np.sqrt(np.maximum(1.0 + RUIDO_GP - (v ** 2).sum(axis=0), 1e-12))
+    z = (yn.min() - mu) / sigma
+    cdf = 0.5 * (1.0 + np.vectorize(math.erf)(z / math.sqrt(2.0)))
+    pdf = np.exp(-0.5 * z ** 2) / math.sqrt(2.0 * math.pi)
+    return (yn.min() - mu) * cdf + sigma * pdf
+
+
+def bayesiana(nombres, n, evaluar, lote=4, iniciales=None, semilla=0):
+    """
+    Búsqueda bayesiana multiobjetivo (ParEGO): en cada lote se combinan los dos objetivos normalizados con pesos
+    aleatorios (Chebyshev aumentada), se ajusta un proceso gaussiano y se eligen los candidatos de mayor mejora
+    esperada; los del mismo lote se eligen con el valor ficticio del mejor observado.
+    Args:
+        evaluar: Función que recibe una lista de conjuntos y devuelve sus evaluaciones (evaluar_conjuntos).
+        n: Número total de evaluaciones.
+        lote: Conjuntos evaluados en paralelo en cada iteración.
+        iniciales: Evaluaciones aleatorias iniciales; por defecto 2 * (dimensión + 1).
+    """
+    rng = np.random.default_rng(semilla)
+    iniciales = min(n, iniciales or 2 * (len(nombres) + 1))
+    evaluaciones = evaluar(aleatoria(nombres, iniciales, semilla))
+    while len(evaluaciones) < n:
+        x = np.array([_a_unitario(nombres, e["conjunto"]) for e in evaluaciones])
+        objetivos = np.array([(e["t_total"], e["error_final"]) for e in evaluaciones])
+        rango = np.ptp(objetivos, axis=0)
+        normalizados = (objetivos - objetivos.min(axis=0)) / np.where(rango > 0, rango, 1.0)
+        pesos = rng.dirichlet(np.ones(2))
+        y = (pesos * normalizados).max(axis=1) + 0.05 * (pesos * normalizados).sum(axis=1)
+
+        nuevos = []
+        for _ in range(min(lote, n - len(evaluaciones))):
+            candidatos = rng.random((CANDIDATOS_BAYESIANA, len(nombres)))
+            elegido = candidatos[np.argmax(_mejora_esperada(x, y, candidatos))]
+            nuevos.append(_desde_unitario(nombres, elegido))
+            x = np.vstack((x, elegido))
+            y = np.append(y, y.min())
+        evaluaciones += evaluar(nuevos)
+    return evaluaciones
+
+
+def guardar_resultados(evaluaciones, nombres, salida=SALIDA_DIR):
+    """Escribe el CSV de todas las evaluaciones con la marca de Pareto y la gráfica del frente."""
+    os.makedirs(salida, exist_ok=True)
+    objetivos = np.array([(e["t_total"], e["error_final"]) for e in evaluaciones])
+    pareto = frente_pareto(objetivos)
+
+    metricas = ["rutas", "segmentos", "t_total", "error_final", "error_xy", "exito"]
+    with open(os.path.join(salida, ARCHIVO_RESULTADOS), "w", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["clave"] + list(nombres) + metricas + ["pareto"])
+        for e, en_frente in zip(evaluaciones, pareto):
+            escritor.writerow([e["clave"]] + [e["conjunto"].get(n, "") for n in nombres]
+                              + [e[m] for m in metricas] + [int(en_frente)])
+
+    fig = Figure(figsize=(8, 6))
+    ax = fig.add_subplot(111)
+    ax.scatter(objetivos[:, 0], objetivos[:, 1], s=12, color="lightgray", label="Evaluados")
+    orden = np.argsort(objetivos[pareto, 0])
+    ax.plot(objetivos[pareto, 0][orden], objetivos[pareto, 1][orden], "o-", color="tab:red", label="Frente de Pareto")
+    ax.set_xlabel("Tiempo total de vuelo simulado (s)")
+    ax.set_ylabel("Error final medio (m)")
+    ax.set_title(f"Búsqueda de parámetros: {', '.join(nombres)}")
+    ax.grid(True)
+    ax.legend()
+    fig.savefig(os.path.join(salida, ARCHIVO_FRENTE), dpi=100)
+    return pareto
+
+
+def _opcion(nombre, defecto):
+    """Valor de una opción '--nombre valor' de la línea de comandos."""
+    if nombre in sys.argv:
+        return sys.argv[sys.argv.index(nombre) + 1]
+    return defecto
+
+
+if __name__ == "__main__":
+    estrategia = sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].startswith("--") else "aleatoria"
+    if estrategia not in ESTRATEGIAS:
+        print(f"Uso: python busqueda_parametros.py [{'|'.join(ESTRATEGIAS)}] [--parametros p1,p2] [--n N] "
+              f"[--rutas N] [--procesos N] [--filas]")
+        sys.exit(1)
+    nombres = tuple(_opcion("--parametros", ",".join(PARAMETROS_POR_DEFECTO)).split(","))
+    desconocidos = [n for n in nombres if n not in ESPACIO]
+    if desconocidos:
+        print(f"Parámetros desconocidos: {desconocidos}. Disponibles: {', '.join(ESPACIO)}")
+        sys.exit(1)
+    n = int(_opcion("--n", 3 if estrategia == "rejilla" else 20))
+    procesos = int(_opcion("--procesos", 0)) or None
+    rutas = listar_rutas(RUTAS_DIR)
+    rutas = rutas[:int(_opcion("--rutas", len(rutas)))]
+    opciones = {"semilla": 0, "ruido": None, "compilar": "--filas" not in sys.argv}
+
+    evaluar = lambda conjuntos: evaluar_conjuntos(conjuntos, rutas, opciones, procesos)
+    inicio = time.perf_counter()
+    # Los parámetros actuales se evalúan siempre como referencia
+    actuales = valores_actuales(nombres)
+    evaluaciones = evaluar([actuales])
+    if estrategia == "rejilla":
+        evaluaciones += evaluar(rejilla(nombres, n))
+    elif estrategia == "aleatoria":
+        evaluaciones += evaluar(aleatoria(nombres, n))
+    else:
+        evaluaciones += bayesiana(nombres, n, evaluar, lote=procesos or os.cpu_count() or 1)
+
+    pareto = guardar_resultados(evaluaciones, nombres)
+    print(f"{len(evaluaciones)} evaluaciones sobre {len(rutas)} rutas en {time.perf_counter() - inicio:.1f} s")
+    print(f"Actuales: {actuales} -> t_total {evaluaciones[0]['t_total']:.0f} s, "
+          f"error final {evaluaciones[0]['error_final']:.3f} m, éxito {evaluaciones[0]['exito']:.0%}")
+    print("Frente de Pareto:")
+    for e in sorted((e for e, p in zip(evaluaciones, pareto) if p), key=lambda e: e["t_total"]):
+        print(f"  t_total {e['t_total']:>9.0f} s  error final {e['error_final']:.3f} m  éxito {e['exito']:>4.0%}  "
+              f"{e['conjunto']}")
+    print(f"Resultados en {os.path.abspath(SALIDA_DIR)}")
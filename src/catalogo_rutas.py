@@ -0,0 +1,279 @@
+"""
+Catálogo de las rutas en una base de datos SQLite local, con un resumen de cada archivo para poder buscar vuelos
+sin volver a leerlos (por ejemplo, los que alcanzan la altura pero no la distancia).
+Por cada archivo se guarda: columnas, variante detectada (lector_rutas.py) y si cumplen grafica.COLUMNAS_VALIDAS,
+número de muestras, desplazamiento rotado total (como sumar_columnas.py), longitud del recorrido, rango de altura,
+caída de la batería, proporción de muestras con objetivo_alcanzado y calidad media (opt_qua).
+El catálogo se actualiza de forma incremental: solo se vuelven a leer los archivos cuya fecha de modificación o
+tamaño han cambiado y, de esos, solo los que tienen un contenido (hash) distinto. Las entradas se guardan por ruta
+absoluta, de modo que un mismo catálogo puede reunir varios directorios: al actualizar uno solo se eliminan las
+entradas de ese directorio cuyos archivos ya no están.
+
+Uso: python catalogo_rutas.py ["condición SQL"] [directorio]
+    Ejemplo: python catalogo_rutas.py "alt_max > 0.5 and distancia < 0.3"
+"""
+import os
+import sys
+import time
+import hashlib
+import sqlite3
+import numpy as np
+
+from trayectoria import reconstruct_trajectory
+from formato_binario import cargar_ruta, leer_cabecera_ruta, EXTENSION_BINARIA
+from lector_rutas import detectar_esquema
+from grafica import COLUMNAS_VALIDAS, comprobar_cabecera
+from replay_rutas import listar_rutas, RUTAS_DIR
+
+CATALOGO_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "catalogo_rutas.sqlite")
+
+# Al cambiar el cálculo de los resúmenes, incrementarla obliga a recalcular todas las entradas
+VERSION_CATALOGO = 2
+
+# Columnas de la tabla 'rutas': (nombre, tipo SQL)
+CAMPOS_CATALOGO = [
+    ("ruta", "TEXT PRIMARY KEY"),   # Ruta absoluta del archivo
+    ("mtime", "REAL"),
+    ("tam", "INTEGER"),
+    ("hash", "TEXT"),
+    ("version", "INTEGER"),
+    ("cabecera", "TEXT"),           # Nombres de las columnas separados por comas
+    ("columnas", "INTEGER"),
+    ("esquema", "TEXT"),            # Variante de columnas (lector_rutas.ESQUEMAS o 'desconocido')
+    ("esquema_valido", "INTEGER"),  # 1 si la cabecera es válida para grafica.py
+    ("error", "TEXT"),              # Error de lectura o de esquema (NULL si no hay)
+    ("muestras", "INTEGER"),
+    ("desp_x", "REAL"),             # Desplazamiento rotado total en X e Y (última posición)
+    ("desp_y", "REAL"),
+    ("distancia", "REAL"),          # Distancia en línea recta del inicio al final
+    ("recorrido", "REAL"),          # Longitud del recorrido en el plano XY
+    ("alt_min", "REAL"),
+    ("alt_max", "REAL"),
+    ("bateria_inicial", "REAL"),
+    ("bateria_final", "REAL"),
+    ("caida_bateria", "REAL"),
+    ("exito", "REAL"),              # Proporción de muestras con objetivo_alcanzado
+    ("calidad_media", "REAL"),
+]
+NOMBRES_CAMPOS = [nombre for nombre, _ in CAMPOS_CATALOGO]
+
+# Columnas que se muestran en las consultas desde la línea de comandos
+CAMPOS_CONSULTA = ["ruta", "esquema", "muestras", "distancia", "recorrido", "alt_min", "alt_max", "caida_bateria", "exito",
+                   "calidad_media"]
+
+# Nombres alternativos de la columna de altura (comparar_sensores escribe 'sonarrange')
+COLUMNAS_ALTURA = ("alt", "sonarrange")
+
+
+def abrir_catalogo(db_path=CATALOGO_DB):
+    """Abre (o crea) la base de datos del catálogo."""
+    conexion = sqlite3.connect(db_path)
+    campos = ", ".join(f"{nombre} {tipo}" for nombre, tipo in CAMPOS_CATALOGO)
+    conexion.execute(f"CREATE TABLE IF NOT EXISTS rutas ({campos})")
+    # Catálogos creados con una versión anterior: se añaden las columnas nuevas (se rellenan al recalcular)
+    existentes = {fila[1] for fila in conexion.execute("PRAGMA table_info(rutas)")}
+    for nombre, tipo in CAMPOS_CATALOGO:
+        if nombre not in existentes:
+            conexion.execute(f"ALTER TABLE rutas ADD COLUMN {nombre} {tipo}")
+    # Catálogos anteriores guardaban rutas relativas al directorio escaneado: se descartan y se recalculan
+    relativas = [fila[0] for fila in conexion.execute("SELECT ruta FROM rutas") if not os.path.isabs(fila[0])]
+    conexion.executemany("DELETE FROM rutas WHERE ruta = ?", [(nombre,) for nombre in relativas])
+    conexion.commit()
+    return conexion
+
+
+def _dentro(file_path, directorio):
+    """True si file_path (absoluta) está en directorio (absoluto) o en alguno de sus subdirectorios."""
+    try:
+        return os.path.commonpath([file_path, directorio]) == directorio
+    except ValueError:
+        # Rutas en unidades distintas (Windows)
+        return False
+
+
+def hash_archivo(file_path):
+    h = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _columna(cabecera, nombres):
+    """Índice de la primera columna de la cabecera con alguno de los nombres dados, o None."""
+    for i, col in enumerate(cabecera):
+        if col in nombres:
+            return i
+    return None
+
+
+def _flotante(valor):
+    """Convierte un escalar de NumPy en float de Python (None si es NaN) para guardarlo en SQLite."""
+    valor = float(valor)
+    return None if np.isnan(valor) else valor
+
+
+def resumir_ruta(file_path):
+    """
+    Calcula el resumen de un archivo de ruta.
+    Returns:
+        Diccionario con los campos de CAMPOS_CATALOGO que dependen del contenido.
+    """
+    resumen = dict.fromkeys(NOMBRES_CAMPOS)
+    cabecera = leer_cabecera_ruta(file_path)
+    resumen["cabecera"] = ",".join(cabecera)
+    resumen["columnas"] = len(cabecera)
+    resumen["esquema"] = detectar_esquema(cabecera).nombre
+    try:
+        comprobar_cabecera(cabecera)
+        resumen["esquema_valido"] = 1
+    except ValueError as error:
+        resumen["esquema_valido"] = 0
+        resumen["error"] = str(error)
+
+    _, datos = cargar_ruta(file_path)
+    datos = np.asarray(datos, dtype=float)
+    if datos.size == 0:
+        resumen["muestras"] = 0
+        return resumen
+    resumen["muestras"] = len(datos)
+
+    # Desplazamiento rotado: las cuatro primeras columnas deben ser opt_m_x, opt_m_y, opt_qua y yaw
+    if cabecera[:4] == COLUMNAS_VALIDAS[:4]:
+        x, y, _ = reconstruct_trajectory(datos[:, :4])
+        resumen["desp_x"] = _flotante(x[-1])
+        resumen["desp_y"] = _flotante(y[-1])
+        resumen["distancia"] = _flotante(np.hypot(x[-1], y[-1]))
+        resumen["recorrido"] = _flotante(np.nansum(np.hypot(np.diff(x), np.diff(y))))
+
+    calidad = _columna(cabecera, ("opt_qua",))
+    if calidad is not None:
+        resumen["calidad_media"] = _flotante(np.nanmean(datos[:, calidad]))
+
+    altura = _columna(cabecera, COLUMNAS_ALTURA)
+    if altura is not None:
+        resumen["alt_min"] = _flotante(np.nanmin(datos[:, altura]))
+        resumen["alt_max"] = _flotante(np.nanmax(datos[:, altura]))
+
+    bateria = _columna(cabecera, ("battery_V",))
+    if bateria is not None:
+        validos = datos[~np.isnan(datos[:, bateria]), bateria]
+        if len(validos):
+            resumen["bateria_inicial"] = float(validos[0])
+            resumen["bateria_final"] = float(validos[-1])
+            resumen["caida_bateria"] = float(validos[0] - validos[-1])
+
+    objetivo = _columna(cabecera, ("objetivo_alcanzado",))
+    if objetivo is not None:
+        resumen["exito"] = _flotante(np.nanmean(datos[:, objetivo] == 1))
+
+    return resumen
+
+
+def actualizar_catalogo(conexion, directorio=RUTAS_DIR, rutas=None):
+    """
+    Actualiza el catálogo con los archivos de un directorio.
+    Solo se eliminan entradas de archivos de ese directorio (o sus subdirectorios): los que no aparecen al
+    recorrerlo o, si se pasa una lista de rutas, los que ya no existen.
+    Args:
+        conexion: Conexión abierta con abrir_catalogo.
+        directorio: Directorio raíz de las rutas.
+        rutas: Lista de archivos; por defecto todos los .txt y .rutb del directorio y sus subdirectorios.
+    Returns:
+        Diccionario con el número de rutas nuevas, recalculadas, sin cambios y eliminadas.
+    """
+    directorio = os.path.abspath(directorio)
+    recorrido = rutas is None
+    if recorrido:
+        rutas = listar_rutas(directorio, (".txt", EXTENSION_BINARIA))
+    guardadas = {fila[0]: fila[1:] for fila in conexion.execute("SELECT ruta, mtime, tam, hash, version FROM rutas")}
+    estadisticas = dict(nuevas=0, recalculadas=0, sin_cambios=0, eliminadas=0)
+
+    presentes = set()
+    for file_path in rutas:
+        nombre = os.path.abspath(file_path)
+        presentes.add(nombre)
+        estado = os.stat(file_path)
+        anterior = guardadas.get(nombre)
+
+        # Misma fecha y tamaño: no se abre el archivo
+        if anterior is not None and anterior[0] == estado.st_mtime and anterior[1] == estado.st_size \
+                and anterior[3] == VERSION_CATALOGO:
+            estadisticas["sin_cambios"] += 1
+            continue
+
+        clave = hash_archivo(file_path)
+        if anterior is not None and anterior[2] == clave and anterior[3] == VERSION_CATALOGO:
+            # Solo ha cambiado la fecha (por ejemplo, al copiar el archivo): se actualiza sin recalcular
+            conexion.execute("UPDATE rutas SET mtime = ?, tam = ? WHERE ruta = ?",
+                             (estado.st_mtime, estado.st_size, nombre))
+            estadisticas["sin_cambios"] += 1
+            continue
+
+        try:
+            resumen = resumir_ruta(file_path)
+        except Exception as error:
+            resumen = dict.fromkeys(NOMBRES_CAMPOS)
+            resumen["error"] = str(error) or type(error).__name__
+        resumen.update(ruta=nombre, mtime=estado.st_mtime, tam=estado.st_size, hash=clave, version=VERSION_CATALOGO)
+        conexion.execute(f"INSERT OR REPLACE INTO rutas ({', '.join(NOMBRES_CAMPOS)}) "
+                         f"VALUES ({', '.join('?' * len(NOMBRES_CAMPOS))})",
+                         [resumen[nombre] for nombre in NOMBRES_CAMPOS])
+        estadisticas["nuevas" if anterior is None else "recalculadas"] += 1
+
+    for nombre in set(guardadas) - presentes:
+        if not _dentro(nombre, directorio) or (not recorrido and os.path.exists(nombre)):
+            continue
+        conexion.execute("DELETE FROM rutas WHERE ruta = ?", (nombre,))
+        estadisticas["eliminadas"] += 1
+
+    conexion.commit()
+    return estadisticas
+
+
+def consultar(conexion, condicion=None, campos=CAMPOS_CONSULTA):
+    """
+    Devuelve las filas del catálogo que cumplen una condición SQL (cláusula WHERE), ordenadas por ruta.
+    Ejemplo: consultar(conexion, "alt_max > 0.5 AND distancia < 0.3")
+    """
+    sql = f"SELECT {', '.join(campos)} FROM rutas"
+    if condicion:
+        sql += f" WHERE {condicion}"
+    return conexion.execute(sql + " ORDER BY ruta").fetchall()
+
+
+def imprimir_consulta(filas, campos=CAMPOS_CONSULTA):
+    """Imprime las filas de una consulta como una tabla."""
+    ancho = max([len(campos[0])] + [len(str(f[0])) for f in filas])
+    print(f"{campos[0]:<{ancho}}" + "".join(f"{c:>14}" for c in campos[1:]))
+    for fila in filas:
+        valores = "".join(f"{'-':>14}" if v is None else f"{v:>14.3f}" if isinstance(v, float) else f"{v:>14}"
+                          for v in fila[1:])
+        print(f"{fila[0]:<{ancho}}{valores}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print('Uso: python catalogo_rutas.py ["condición SQL"] [directorio]')
+        sys.exit(1)
+
+    condicion = sys.argv[1] if len(sys.argv) > 1 else None
+    directorio = sys.argv[2] if len(sys.argv) > 2 else RUTAS_DIR
+
+    conexion = abrir_catalogo()
+    inicio = time.perf_counter()
+    estadisticas = actualizar_catalogo(conexion, directorio)
+    t_actualizacion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    filas = consultar(conexion, condicion)
+    t_consulta = time.perf_counter() - inicio
+
+    # Las rutas del directorio consultado se muestran relativas a él
+    raiz = os.path.abspath(directorio)
+    filas = [(os.path.relpath(f[0], raiz) if _dentro(f[0], raiz) else f[0],) + tuple(f[1:]) for f in filas]
+    imprimir_consulta(filas)
+    print(f"\n{len(filas)} rutas. Catálogo: {estadisticas['nuevas']} nuevas, {estadisticas['recalculadas']} "
+          f"recalculadas, {estadisticas['sin_cambios']} sin cambios, {estadisticas['eliminadas']} eliminadas "
+          f"({t_actualizacion * 1000:.0f} ms); consulta en {t_consulta * 1000:.1f} ms")
+    conexion.close()
@@ -0,0 +1,429 @@
+"""
+Compara cada ruta recreada por ordenes.py (Rutas/Rutas_Recreadas) con la ruta original que reproduce.
+Las dos trayectorias se reconstruyen igual que en grafica.py y se alinean en el plano XY:
+    - dtw: alineamiento temporal dinámico (DTW), calculado por antidiagonales con NumPy.
+    - kdtree: cada muestra de la recreación se empareja con el punto más cercano de la original
+      (scipy.spatial.cKDTree si está instalado; si no, búsqueda por fuerza bruta por bloques con NumPy).
+La original se densifica (puntos cada PASO_DENSIFICADO a lo largo de cada segmento), de forma que la desviación es
+la distancia al recorrido y no al vértice más cercano. Para cada pareja se calcula el error por segmento de la
+original (muestras alineadas, desviación media y máxima, distancia del extremo del segmento a la recreación),
+la desviación RMS y máxima, el error del punto final y la desviación de altura, y se guarda una gráfica superpuesta.
+
+Las parejas se leen de Rutas_Recreadas/origenes.csv, que ordenes.main completa con cada recreación. Las
+recreaciones que no aparecen en él se emparejan con la original más parecida (menor distancia media simétrica).
+Todas las parejas se procesan en paralelo.
+
+Uso: python comparar_rutas.py [original recreada] [--kdtree]
+    Sin archivos compara todas las recreaciones y escribe las gráficas y comparacion_segmentos.csv
+    en ../Graficas/comparaciones. Con una pareja muestra su gráfica en una ventana.
+"""
+import os
+import sys
+import csv
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from trayectoria import reconstruct_trajectory
+from formato_binario import cargar_ruta, leer_cabecera_ruta
+from grafica import COLUMNAS_VALIDAS
+from replay_rutas import listar_rutas, RUTAS_DIR
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+RECREADAS_DIR = os.path.join(RUTAS_DIR, "Rutas_Recreadas")
+SALIDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Graficas", "comparaciones")
+
+# Archivo de Rutas_Recreadas con las parejas "recreada,original" (original relativa a Rutas/)
+ARCHIVO_ORIGENES = "origenes.csv"
+ARCHIVO_SEGMENTOS = "comparacion_segmentos.csv"
+
+METODOS = ("dtw", "kdtree")
+
+# Separación (en las unidades de la trayectoria) entre los puntos de la original densificada,
+# y número máximo de puntos densificados (si se supera, se aumenta la separación)
+PASO_DENSIFICADO = 0.05
+MAX_PUNTOS_DENSIFICADO = 5000
+
+# Puntos densificados de cada candidata al buscar la original más parecida (basta una versión más gruesa)
+MAX_PUNTOS_EMPAREJADO = 500
+
+# Tamaño máximo de la matriz de costes del DTW; las parejas más grandes se alinean con kdtree
+MAX_CELDAS_DTW = 20_000_000
+
+# Puntos de la recreación por bloque en la búsqueda por fuerza bruta
+BLOQUE_CERCANOS = 1024
+
+# Columnas de la tabla resumen
+COLUMNAS_RESUMEN = ["recreada", "original", "pareja", "metodo", "muestras", "rms", "max", "final", "rms_alt"]
+
+
+def trayectoria_ruta(file_path):
+    """
+    Reconstruye la trayectoria de un archivo de ruta (con rotación, como grafica.py) sin las filas con NaN.
+    Returns:
+        Matriz (N+1)x3 con x, y, z; la primera fila es el punto de inicio.
+    """
+    cabecera, datos = cargar_ruta(file_path)
+    if cabecera[:4] != COLUMNAS_VALIDAS[:4]:
+        raise ValueError("La ruta debe empezar por las columnas " + ", ".join(COLUMNAS_VALIDAS[:4]))
+    datos = np.asarray(datos, dtype=float)
+    if len(datos) == 0:
+        raise ValueError("La ruta no tiene muestras.")
+    x, y, z = reconstruct_trajectory(datos)
+    puntos = np.column_stack((x, y, z))
+    return puntos[~np.isnan(puntos[:, :2]).any(axis=1)]
+
+
+def densificar(puntos, paso=PASO_DENSIFICADO, max_puntos=MAX_PUNTOS_DENSIFICADO):
+    """
+    Añade puntos intermedios a lo largo de cada segmento de una trayectoria.
+    Args:
+        puntos: Matriz (N+1)xD con los vértices.
+        paso: Separación aproximada entre puntos.
+        max_puntos: Número máximo aproximado de puntos.
+    Returns:
+        densos: Matriz KxD; empieza en el primer vértice y pasa por todos los demás.
+        segmento: Array de K enteros con el segmento (1..N) de cada punto (0 para el punto de inicio).
+    """
+    tramos = np.diff(puntos, axis=0)
+    longitudes = np.hypot(tramos[:, 0], tramos[:, 1])
+    paso = max(paso, longitudes.sum() / max_puntos)
+    divisiones = np.maximum(1, np.ceil(longitudes / paso)).astype(int)
+
+    # Fracción t en (0, 1] de cada punto intermedio dentro de su segmento
+    segmento = np.repeat(np.arange(len(tramos)), divisiones)
+    paso_local = np.arange(len(segmento)) - np.repeat(np.cumsum(divisiones) - divisiones, divisiones) + 1
+    t = paso_local / divisiones[segmento]
+    densos = puntos[segmento] + tramos[segmento] * t[:, None]
+    return np.vstack((puntos[:1], densos)), np.concatenate(([0], segmento + 1))
+
+
+def _distancias(a, b):
+    """Matriz de distancias euclídeas entre las filas de a (NxD) y b (MxD)."""
+    return np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))
+
+
+def cercanos(referencia, consulta):
+    """
+    Punto de 'referencia' más cercano a cada punto de 'consulta'.
+    Returns:
+        distancias, indices: Arrays con una entrada por punto de consulta.
+    """
+    if cKDTree is not None:
+        return cKDTree(referencia).query(consulta)
+    distancias = np.empty(len(consulta))
+    indices = np.empty(len(consulta), dtype=int)
+    for inicio in range(0, len(consulta), BLOQUE_CERCANOS):
+        d = _distancias(consulta[inicio:inicio + BLOQUE_CERCANOS], referencia)
+        indices[inicio:inicio + BLOQUE_CERCANOS] = d.argmin(axis=1)
+        distancias[inicio:inicio + BLOQUE_CERCANOS] = d[np.arange(len(d)), indices[inicio:inicio + BLOQUE_CERCANOS]]
+    return distancias, indices
+
+
+def alinear_dtw(a, b):
+    """
+    Alineamiento temporal dinámico entre dos secuencias de puntos.
+    La matriz acumulada se rellena por antidiagonales (i + j constante), cuyas celdas solo dependen de las dos
+    antidiagonales anteriores, de forma que cada una se calcula con una sola operación de NumPy.
+    Args:
+        a: Matriz NxD.
+        b: Matriz MxD.
+    Returns:
+        ia, ib: Índices de a y b de cada pareja del camino óptimo, en orden.
+        distancias: Distancia de cada pareja del camino.
+    """
+    n, m = len(a), len(b)
+    coste = _distancias(a, b)
+    acumulado = np.full((n + 1, m + 1), np.inf)
+    acumulado[0, 0] = 0.0
+    for k in range(2, n + m + 1):
+        i = np.arange(max(1, k - m), min(n, k - 1) + 1)
+        j = k - i
+        previo = np.minimum(np.minimum(acumulado[i - 1, j - 1], acumulado[i - 1, j]), acumulado[i, j - 1])
+        acumulado[i, j] = coste[i - 1, j - 1] + previo
+
+    # Recorrer el camino desde el final
+    i, j = n, m
+    camino = [(i - 1, j - 1)]
+    while i > 1 or j > 1:
+        opciones = (acumulado[i - 1, j - 1], acumulado[i - 1, j], acumulado[i, j - 1])
+        paso = int(np.argmin(opciones))
+        if paso == 0:
+            i, j = i - 1, j - 1
+        elif paso == 1:
+            i -= 1
+        else:
+            j -= 1
+        camino.append((i - 1, j - 1))
+    ia, ib = np.array(camino[::-1]).T
+    return ia, ib, coste[ia, ib]
+
+
+def comparar_trayectorias(original, recreada, metodo="dtw"):
+    """
+    Alinea una recreación con su original y calcula los errores.
+    Args:
+        original: Matriz (N+1)x3 de la trayectoria original (trayectoria_ruta).
+        recreada: Matriz (M+1)x3 de la trayectoria recreada.
+        metodo: "dtw" o "kdtree".
+    Returns:
+        Diccionario con el método usado, las métricas globales, la lista 'segmentos' y las parejas alineadas
+        ('alineado': índices de los puntos densificados y de la recreación) para dibujarlas.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo} (válidos: {', '.join(METODOS)})")
+    densos, segmento = densificar(original[:, :2])
+    # Altura de cada punto densificado: la del vértice final de su segmento
+    altura = original[segmento, 2]
+    xy = recreada[:, :2]
+
+    if metodo == "dtw" and len(densos) * len(xy) > MAX_CELDAS_DTW:
+        metodo = "kdtree"
+    if metodo == "dtw":
+        i_densos, i_recreada, distancias = alinear_dtw(densos, xy)
+    else:
+        distancias, i_densos = cercanos(densos, xy)
+        i_recreada = np.arange(len(xy))
+
+    desvio_alt = np.abs(altura[i_densos] - recreada[i_recreada, 2])
+    # Distancia de cada vértice de la original a la recreación (¿pasa la recreación por el extremo del segmento?)
+    extremos, _ = cercanos(xy, original[:, :2])
+
+    segmentos = []
+    seg_pareja = segmento[i_densos]
+    for s in range(1, len(original)):
+        d = distancias[seg_pareja == s]
+        segmentos.append({
+            "segmento": s,
+            "muestras": len(np.unique(i_recreada[seg_pareja == s])),
+            "error_medio": float(d.mean()) if len(d) else float("nan"),
+            "error_max": float(d.max()) if len(d) else float("nan"),
+            "error_extremo": float(extremos[s]),
+        })
+
+    return {
+        "metodo": metodo,
+        "muestras": len(recreada),
+        "rms": float(np.sqrt(np.mean(distancias ** 2))),
+        "max": float(distancias.max()),
+        "final": float(np.hypot(*(original[-1, :2] - recreada[-1, :2]))),
+        "rms_alt": float(np.sqrt(np.mean(desvio_alt ** 2))),
+        "segmentos": segmentos,
+        "alineado": (i_densos, i_recreada),
+        "densos": densos,
+    }
+
+
+def distancia_simetrica(a, b):
+    """Media de las distancias de cada punto de a a b y de b a a (para elegir la original más parecida)."""
+    densos, _ = densificar(a, max_puntos=MAX_PUNTOS_EMPAREJADO)
+    return (cercanos(densos, b)[0].mean() + cercanos(b, densos)[0].mean()) / 2
+
+
+def dibujar_comparacion(fig, original, recreada, comparacion, titulo=""):
+    """
+    Dibuja sobre una figura vacía la original y la recreación superpuestas en el plano XY, con líneas entre
+    algunas parejas alineadas, y el error medio y máximo por segmento.
+    """
+    ax, ax_seg = fig.subplots(1, 2, gridspec_kw={"width_ratios": [3, 2]})
+
+    densos = comparacion["densos"]
+    i_densos, i_recreada = comparacion["alineado"]
+    paso = max(1, len(i_densos) // 200)
+    for i, j in zip(i_densos[::paso], i_recreada[::paso]):
+        ax.plot([densos[i, 0], recreada[j, 0]], [densos[i, 1], recreada[j, 1]], color="0.8", linewidth=0.5, zorder=1)
+    ax.plot(original[:, 0], original[:, 1], "o-", color="tab:blue", label="Original", zorder=2)
+    ax.plot(recreada[:, 0], recreada[:, 1], ".-", color="tab:orange", markersize=3, label="Recreada", zorder=3)
+    ax.plot(0, 0, "o", color="red", zorder=4)
+    ax.set_xlabel("Posición X")
+    ax.set_ylabel("Posición Y")
+    ax.set_aspect("equal", adjustable="datalim")
+    ax.legend()
+    ax.set_title(f"RMS {comparacion['rms']:.3f}, máx {comparacion['max']:.3f}, final {comparacion['final']:.3f} "
+                 f"({comparacion['metodo']})", fontsize=9)
+
+    segmentos = comparacion["segmentos"]
+    numeros = [s["segmento"] for s in segmentos]
+    ax_seg.bar(numeros, [s["error_max"] for s in segmentos], color="tab:red", alpha=0.4, label="Máximo")
+    ax_seg.bar(numeros, [s["error_medio"] for s in segmentos], color="tab:red", label="Medio")
+    ax_seg.plot(numeros, [s["error_extremo"] for s in segmentos], "k.", label="Extremo")
+    ax_seg.set_xlabel("Segmento de la original")
+    ax_seg.set_ylabel("Desviación")
+    ax_seg.legend()
+
+    fig.suptitle(titulo, fontsize=10)
+    fig.tight_layout()
+
+
+def nombre_imagen(recreada):
+    return os.path.splitext(os.path.basename(recreada))[0] + "_comparacion.png"
+
+
+def leer_origenes(directorio=RECREADAS_DIR):
+    """Lee las parejas de ARCHIVO_ORIGENES: diccionario {nombre de la recreada: original relativa a Rutas/}."""
+    origenes = {}
+    try:
+        with open(os.path.join(directorio, ARCHIVO_ORIGENES), "r") as f:
+            for fila in csv.reader(f):
+                if len(fila) == 2:
+                    origenes[fila[0].strip()] = fila[1].strip()
+    except OSError:
+        pass
+    return origenes
+
+
+def originales_validas(directorio=RUTAS_DIR, recreadas_dir=RECREADAS_DIR):
+    """Rutas que pueden ser originales: fuera de Rutas_Recreadas y con las columnas de la trayectoria rotada."""
+    recreadas_dir = os.path.abspath(recreadas_dir)
+    validas = []
+    for file_path in listar_rutas(directorio):
+        if os.path.abspath(file_path).startswith(recreadas_dir + os.sep):
+            continue
+        if leer_cabecera_ruta(file_path)[:4] == COLUMNAS_VALIDAS[:4]:
+            validas.append(file_path)
+    return validas
+
+
+def comparar_pareja(tarea):
+    """
+    Función de cada proceso: compara una recreación con su original (o con la más parecida de los candidatos)
+    y guarda la gráfica.
+    Args:
+        tarea: (recreada, original o None, candidatos, metodo, salida).
+    Returns:
+        Diccionario con las columnas de COLUMNAS_RESUMEN y 'segmentos', o con la clave 'error'.
+    """
+    recreada_path, original_path, candidatos, metodo, salida = tarea
+    resultado = {"recreada": os.path.relpath(recreada_path, RECREADAS_DIR)}
+    inicio = time.perf_counter()
+    try:
+        recreada = trayectoria_ruta(recreada_path)
+        if original_path is None:
+            puntuados = []
+            for candidato in candidatos:
+                try:
+                    puntuados.append((distancia_simetrica(trayectoria_ruta(candidato)[:, :2], recreada[:, :2]),
+                                      candidato))
+                except ValueError:
+                    continue
+            if not puntuados:
+                raise ValueError("No hay ninguna original válida con la que emparejarla.")
+            original_path = min(puntuados)[1]
+            resultado["pareja"] = "auto"
+        else:
+            resultado["pareja"] = "origenes"
+        resultado["original"] = os.path.relpath(original_path, RUTAS_DIR)
+
+        original = trayectoria_ruta(original_path)
+        comparacion = comparar_trayectorias(original, recreada, metodo)
+        if salida is not None:
+            fig = Figure(figsize=(12, 5))
+            dibujar_comparacion(fig, original, recreada, comparacion,
+                                f"{resultado['recreada']}  frente a  {resultado['original']}")
+            fig.savefig(os.path.join(salida, nombre_imagen(recreada_path)), dpi=100)
+        resultado.update({k: v for k, v in comparacion.items() if k not in ("alineado", "densos")})
+    except (OSError, ValueError) as error:
+        resultado["error"] = str(error) or type(error).__name__
+    resultado["tiempo"] = time.perf_counter() - inicio
+    return resultado
+
+
+def comparar_corpus(recreadas=None, metodo="dtw", salida=SALIDA_DIR, procesos=None):
+    """
+    Compara en paralelo todas las recreaciones con sus originales.
+    Args:
+        recreadas: Lista de archivos recreados; por defecto todos los de Rutas_Recreadas.
+        metodo: "dtw" o "kdtree".
+        salida: Directorio de las gráficas y de ARCHIVO_SEGMENTOS (None para no guardar nada).
+        procesos: Número de procesos; por defecto tantos como núcleos.
+    Returns:
+        Lista de diccionarios devueltos por comparar_pareja, en el orden de 'recreadas'.
+    """
+    if recreadas is None:
+        recreadas = listar_rutas(RECREADAS_DIR)
+    origenes = leer_origenes()
+    candidatos = originales_validas()
+    if salida is not None:
+        os.makedirs(salida, exist_ok=True)
+
+    tareas = []
+    for recreada in recreadas:
+        original = origenes.get(os.path.basename(recreada))
+        tareas.append((recreada, None if original is None else os.path.join(RUTAS_DIR, original),
+                       candidatos, metodo, salida))
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        resultados = list(pool.map(comparar_pareja, tareas))
+
+    if salida is not None:
+        escribir_segmentos(resultados, os.path.join(salida, ARCHIVO_SEGMENTOS))
+    return resultados
+
+
+def escribir_segmentos(resultados, file_path):
+    """Escribe un CSV con el error de cada segmento de todas las parejas."""
+    campos = ["segmento", "muestras", "error_medio", "error_max", "error_extremo"]
+    with open(file_path, "w", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["recreada", "original"] + campos)
+        for r in resultados:
+            for s in r.get("segmentos", []):
+                escritor.writerow([r["recreada"], r["original"]] + [s[c] for c in campos])
+
+
+def imprimir_resumen(resultados):
+    """Imprime la tabla resumen de las comparaciones."""
+    print(f"{'recreada':<42} {'original':<42} {'pareja':>8} {'muestras':>8} {'rms':>7} {'max':>7} {'final':>7} "
+          f"{'rms_alt':>7}")
+    for r in resultados:
+        if "error" in r:
+            print(f"{r['recreada'][:42]:<42} omitida: {r['error']}")
+            continue
+        print(f"{r['recreada'][:42]:<42} {r['original'][:42]:<42} {r['pareja']:>8} {r['muestras']:>8} "
+              f"{r['rms']:>7.3f} {r['max']:>7.3f} {r['final']:>7.3f} {r['rms_alt']:>7.3f}")
+
+
+def imprimir_segmentos(resultado):
+    print(f"{'seg':>4} {'muestras':>8} {'medio':>7} {'max':>7} {'extremo':>7}")
+    for s in resultado["segmentos"]:
+        print(f"{s['segmento']:>4} {s['muestras']:>8} {s['error_medio']:>7.3f} {s['error_max']:>7.3f} "
+              f"{s['error_extremo']:>7.3f}")
+
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if a != "--kdtree"]
+    metodo = "kdtree" if "--kdtree" in sys.argv else "dtw"
+    if len(argumentos) not in (0, 2):
+        print("Uso: python comparar_rutas.py [original recreada] [--kdtree]")
+        sys.exit(1)
+
+    inicio = time.perf_counter()
+    if argumentos:
+        import matplotlib.pyplot as plt
+
+        original_path, recreada_path = argumentos
+        try:
+            original, recreada = trayectoria_ruta(original_path), trayectoria_ruta(recreada_path)
+        except ValueError as error:
+            print(f"Error: {error}")
+            sys.exit(1)
+        comparacion = comparar_trayectorias(original, recreada, metodo)
+        imprimir_segmentos(comparacion)
+        print(f"RMS {comparacion['rms']:.3f}, máx {comparacion['max']:.3f}, final {comparacion['final']:.3f}, "
+              f"RMS altura {comparacion['rms_alt']:.3f} ({comparacion['metodo']}, "
+              f"{time.perf_counter() - inicio:.2f} s)")
+        fig = plt.figure(figsize=(12, 5))
+        dibujar_comparacion(fig, original, recreada, comparacion,
+                            f"{os.path.basename(recreada_path)}  frente a  {os.path.basename(original_path)}")
+        plt.show()
+    else:
+        resultados = comparar_corpus(metodo=metodo)
+        imprimir_resumen(resultados)
+        print(f"Gráficas y {ARCHIVO_SEGMENTOS} en {SALIDA_DIR}")
+        print(f"Tiempo real: {time.perf_counter() - inicio:.1f} s")
@@ -0,0 +1,274 @@
+"""
+Compilación de rutas antes del vuelo.
+ordenes.main recorre cada muestra del archivo de ruta como un segmento propio, con su fase de estabilización en
+tolerancia, de modo que una ruta de 300 líneas son 300 paradas. El compilador prepara la ruta sin conexión:
+    1. Acumula las muestras en puntos de paso en ejes del mundo (marco_mundo.waypoints_mundo), con la misma
+       tolerancia de posición que ordenes.main: las filas que no la superan no mueven el punto de paso.
+    2. Descarta los movimientos menores que la tolerancia de posición, yaw y altura de move_drone.
+    3. Une los segmentos colineales: un punto de paso se omite si el segmento que lo salta pasa a menos de la
+       tolerancia de él y no cambia el yaw ni la altura más allá de sus tolerancias.
+El resultado es un plan de texto compacto (x, y, qua, yaw, alt y número de filas de la ruta original que cubre
+cada punto) que ordenes.main carga directamente con la librería estándar.
+
+La primera línea del plan guarda la versión del formato y las tolerancias con las que se compiló; un plan solo está
+al día (plan_vigente) si no es más antiguo que su ruta y sus tolerancias son las que se van a usar en el vuelo.
+
+Uso: python compilador_rutas.py [archivo_o_directorio] [--forzar]
+    Sin argumentos compila todas las rutas de ../Rutas; cada plan se guarda junto a su ruta con extensión .plan.
+    Solo se recompilan los planes que no están al día con las tolerancias de ordenes.PARAMETROS_RUTA, salvo con
+    --forzar.
+"""
+import os
+import sys
+import math
+
+from marco_mundo import MARCO_MUNDO, waypoints_mundo
+
+EXTENSION_PLAN = ".plan"
+VERSION_PLAN = 3
+COLUMNAS_PLAN = ["x", "y", "qua", "yaw", "alt", "filas"]
+TOLERANCIAS_PLAN = ("tolerance", "yaw_tolerance", "alt_tolerance")
+
+
+def ruta_plan(file_path):
+    """Archivo de plan correspondiente a un archivo de ruta."""
+    return os.path.splitext(file_path)[0] + EXTENSION_PLAN
+
+
+def leer_cabecera_plan(plan_path):
+    """
+    Lee la primera línea de un plan: '# plan v<versión> marco=<marco> <tolerancia>=<valor>... origen=<ruta>'.
+    Returns:
+        Diccionario con 'version' (int), 'marco', 'origen' y las tolerancias (float) que tenga.
+    """
+    with open(plan_path, "r") as f:
+        linea = f.readline().rstrip("\n")
+    if not linea.startswith("# plan v"):
+        raise ValueError(f"{plan_path} no es un plan de ruta")
+    # El origen va al final porque el nombre de la ruta puede tener espacios
+    linea, _, origen = linea.partition(" origen=")
+    version, *campos = linea[len("# plan v"):].split()
+    cabecera = {"version": int(version), "origen": origen}
+    for campo in campos:
+        clave, _, valor = campo.partition("=")
+        cabecera[clave] = float(valor) if clave in TOLERANCIAS_PLAN else valor
+    return cabecera
+
+
+def plan_vigente(file_path, tolerancias, plan_path=None):
+    """
+    True si el plan de la ruta existe, tiene la versión actual, no es más antiguo que la ruta y se compiló con las
+    tolerancias indicadas (diccionario con TOLERANCIAS_PLAN, por ejemplo ordenes.PARAMETROS_RUTA).
+    """
+    plan_path = plan_path or ruta_plan(file_path)
+    if not os.path.exists(plan_path) or os.path.getmtime(plan_path) < os.path.getmtime(file_path):
+        return False
+    try:
+        cabecera = leer_cabecera_plan(plan_path)
+    except ValueError:
+        return False
+    return cabecera["version"] == VERSION_PLAN and all(
+        cabecera.get(k) is not None and math.isclose(cabecera[k], float(tolerancias[k])) for k in TOLERANCIAS_PLAN)
+
+
+def _diferencia_yaw(a, b):
+    """Diferencia de yaw en grados normalizada a [-180, 180)."""
+    return (a - b + 180.0) % 360.0 - 180.0
+
+
+def _distancia_segmento(px, py, ax, ay, bx, by):
+    """Distancia del punto P al segmento AB."""
+    abx, aby = bx - ax, by - ay
+    longitud2 = abx * abx + aby * aby
+    t = 0.0 if longitud2 == 0.0 else max(0.0, min(1.0, ((px - ax) * abx + (py - ay) * aby) / longitud2))
+    return math.hypot(px - ax - t * abx, py - ay - t * aby)
+
+
+def _mismo_objetivo(a, b, yaw_tolerance, alt_tolerance):
+    """True si dos puntos de paso tienen el yaw y la altura dentro de las tolerancias."""
+    return abs(_diferencia_yaw(a[3], b[3])) < yaw_tolerance and abs(a[4] - b[4]) < alt_tolerance
+
+
+def descartar_pequenos(puntos, tolerance, yaw_tolerance, alt_tolerance):
+    """
+    Descarta los puntos de paso que no se alejan del último conservado más que las tolerancias.
+    Args:
+        puntos: Lista de [x, y, qua, yaw, alt, filas] en ejes del mundo.
+    Returns:
+        Lista de puntos conservados; las filas de los descartados se suman al siguiente conservado.
+        El último punto se conserva siempre.
+    """
+    conservados = []
+    anterior = None
+    pendientes = 0
+    for i, punto in enumerate(puntos):
+        pendientes += punto[5]
+        ultimo = i == len(puntos) - 1
+        if (anterior is None or ultimo or math.hypot(punto[0] - anterior[0], punto[1] - anterior[1]) >= tolerance
+                or not _mismo_objetivo(punto, anterior, yaw_tolerance, alt_tolerance)):
+            anterior = punto[:5] + [pendientes]
+            conservados.append(anterior)
+            pendientes = 0
+    return conservados
+
+
+def _recortar_arcos(arcos, centro, tolerancia):
+    """
+    Intersección de un conjunto de arcos de yaw [inicio, fin) en [0, 360] con los yaw a menos de 'tolerancia'
+    grados de 'centro'. Cada recorte parte como mucho un arco en dos y solo puede partir arcos más largos que
+    360 - 2 * tolerancia, así que el conjunto no pasa de unos pocos arcos.
+    """
+    if tolerancia >= 180.0:
+        return arcos
+    inicio = (centro - tolerancia) % 360.0
+    fin = inicio + 2.0 * tolerancia
+    trozos = [(inicio, fin)] if fin <= 360.0 else [(inicio, 360.0), (0.0, fin - 360.0)]
+    return [(max(a, c), min(b, d)) for a, b in arcos for c, d in trozos if max(a, c) < min(b, d)]
+
+
+def _angulo_relativo(angulo, referencia):
+    """Diferencia de ángulos en radianes normalizada a [-pi, pi)."""
+    return (angulo - referencia + math.pi) % (2.0 * math.pi) - math.pi
+
+
+def unir_colineales(puntos, tolerance, yaw_tolerance, alt_tolerance, origen=(0.0, 0.0)):
+    """
+    Une los segmentos consecutivos casi colineales de forma voraz: desde cada punto conservado se alarga el
+    segmento mientras todos los puntos intermedios queden a menos de 'tolerance' de él y tengan el mismo yaw y
+    altura (dentro de sus tolerancias) que el nuevo extremo.
+    Las condiciones de los puntos intermedios se acumulan al avanzar, de modo que cada candidato se comprueba en
+    tiempo constante y la unión es lineal en el número de puntos:
+        - Posición: un punto P a distancia d >= tolerance del inicio A solo admite extremos en direcciones a menos
+          de asin(tolerance / d) de la suya; se guarda la intersección (cuña) de esas direcciones. Además el
+          extremo no puede estar más cerca de A que esos puntos, así su distancia al segmento es su distancia a la
+          recta (algo más estricto que comprobar la distancia al segmento, que admite puntos que rebasan el
+          extremo en menos de la tolerancia).
+        - Altura: rango [mínima, máxima] de los puntos intermedios.
+        - Yaw: arcos de yaw a menos de yaw_tolerance de todos los puntos intermedios (_recortar_arcos).
+    Args:
+        puntos: Lista de [x, y, qua, yaw, alt, filas] en ejes del mundo.
+        origen: Posición de partida del primer segmento.
+    Returns:
+        Lista de puntos conservados con las filas de los omitidos sumadas al extremo.
+    """
+    unidos = []
+    ax, ay = origen
+    inicio = 0
+    while inicio < len(puntos):
+        # Condiciones acumuladas de los puntos intermedios puntos[inicio:candidato]
+        referencia = None                           # Dirección de la primera restricción de la cuña
+        cuna_min, cuna_max = -math.inf, math.inf    # Cuña de direcciones relativas a 'referencia'
+        distancia_max = 0.0
+        alt_min, alt_max = math.inf, -math.inf
+        arcos_yaw = [(0.0, 360.0)]
+
+        fin = inicio
+        for candidato in range(inicio + 1, len(puntos)):
+            p = puntos[candidato - 1]
+            d = math.hypot(p[0] - ax, p[1] - ay)
+            if d >= tolerance:
+                distancia_max = max(distancia_max, d)
+                angulo = math.atan2(p[1] - ay, p[0] - ax)
+                referencia = angulo if referencia is None else referencia
+                relativo = _angulo_relativo(angulo, referencia)
+                apertura = math.asin(tolerance / d)
+                cuna_min, cuna_max = max(cuna_min, relativo - apertura), min(cuna_max, relativo + apertura)
+            alt_min, alt_max = min(alt_min, p[4]), max(alt_max, p[4])
+            arcos_yaw = _recortar_arcos(arcos_yaw, p[3], yaw_tolerance)
+
+            extremo = puntos[candidato]
+            d_extremo = math.hypot(extremo[0] - ax, extremo[1] - ay)
+            if d_extremo < distancia_max or cuna_min >= cuna_max:
+                break
+            if referencia is not None:
+                relativo = _angulo_relativo(math.atan2(extremo[1] - ay, extremo[0] - ax), referencia)
+                if not cuna_min < relativo < cuna_max:
+                    break
+            if not (alt_max - extremo[4] < alt_tolerance and extremo[4] - alt_min < alt_tolerance):
+                break
+            yaw = extremo[3] % 360.0
+            if not any(a <= yaw < b for a, b in arcos_yaw):
+                break
+            fin = candidato
+        punto = puntos[fin][:5] + [sum(p[5] for p in puntos[inicio:fin + 1])]
+        unidos.append(punto)
+        ax, ay = punto[0], punto[1]
+        inicio = fin + 1
+    return unidos
+
+
+def compilar_ruta(route_data, tolerance, yaw_tolerance, alt_tolerance):
+    """
+    Compila las filas de una ruta en un plan de puntos de paso.
+    Args:
+        route_data: Filas de ordenes.read_variations (opt_m_x, opt_m_y, opt_qua, yaw, alt, ...).
+        tolerance, yaw_tolerance, alt_tolerance: Tolerancias de move_drone con las que se va a volar el plan.
+    Returns:
+        plan: Lista de [x, y, qua, yaw, alt, filas] en ejes del mundo.
+    """
+    objetivos = waypoints_mundo(route_data, tolerance)
+    puntos = [[x, y, fila[2], fila[3], fila[4], 1] for (x, y), fila in zip(objetivos, route_data)]
+    puntos = descartar_pequenos(puntos, tolerance, yaw_tolerance, alt_tolerance)
+    return unir_colineales(puntos, tolerance, yaw_tolerance, alt_tolerance)
+
+
+def guardar_plan(file_path, plan, origen="", tolerancias=None):
+    """
+    Escribe un plan: una línea de comentario con la versión, las tolerancias y el origen, la cabecera y una fila por
+    punto.
+    """
+    tolerancias = tolerancias or {}
+    descripcion = "".join(f" {k}={v!r}" for k, v in sorted(tolerancias.items()))
+    with open(file_path, "w") as f:
+        f.write(f"# plan v{VERSION_PLAN} marco={MARCO_MUNDO}{descripcion} origen={origen}\n")
+        f.write(", ".join(COLUMNAS_PLAN) + "\n")
+        for x, y, qua, yaw, alt, filas in plan:
+            f.write(f"{x!r}, {y!r}, {qua!r}, {yaw!r}, {alt!r}, {filas}\n")
+
+
+def cargar_plan(file_path):
+    """
+    Lee un plan guardado con guardar_plan.
+    Returns:
+        Lista de (x, y, qua, yaw, alt) en ejes del mundo.
+    """
+    plan = []
+    with open(file_path, "r") as f:
+        linea = f.readline()
+        if not linea.startswith("# plan v"):
+            raise ValueError(f"{file_path} no es un plan de ruta")
+        f.readline()  # Cabecera
+        for linea in f:
+            if linea.strip():
+                plan.append(tuple(float(v) for v in linea.split(",")[:5]))
+    return plan
+
+
+if __name__ == "__main__":
+    import ordenes
+    from replay_rutas import listar_rutas, RUTAS_DIR
+
+    argumentos = [a for a in sys.argv[1:] if a != "--forzar"]
+    forzar = "--forzar" in sys.argv
+    if len(argumentos) > 1:
+        print("Uso: python compilador_rutas.py [archivo_o_directorio] [--forzar]")
+        sys.exit(1)
+    destino = argumentos[0] if argumentos else RUTAS_DIR
+    rutas = [destino] if os.path.isfile(destino) else listar_rutas(destino)
+
+    tolerancias = {k: ordenes.PARAMETROS_RUTA[k] for k in TOLERANCIAS_PLAN}
+    total_filas = total_puntos = 0
+    for ruta in rutas:
+        if not forzar and plan_vigente(ruta, tolerancias):
+            continue
+        filas = [f for f in ordenes.read_variations(ruta) if len(f) >= 5]
+        if not filas:
+            print(f"{ruta}: sin columnas yaw/alt, se omite")
+            continue
+        plan = compilar_ruta(filas, **tolerancias)
+        guardar_plan(ruta_plan(ruta), plan, os.path.basename(ruta), tolerancias)
+        total_filas += len(filas)
+        total_puntos += len(plan)
+        print(f"{ruta}: {len(filas)} filas -> {len(plan)} puntos de paso")
+    if total_filas:
+        print(f"Total: {total_filas} filas -> {total_puntos} puntos de paso ({total_puntos / total_filas:.1%})")
@@ -0,0 +1,184 @@
+"""
+Controladores PID de move_drone, uno por eje (altura, yaw, X e Y del cuerpo).
+Cada eje tiene ganancias proporcional, integral y derivativa, con:
+    - Anti-windup: el término integral se limita a ±limite_integral y deja de acumularse mientras la salida está
+      saturada en el mismo sentido que el error.
+    - Derivada filtrada: paso bajo de primer orden con constante de tiempo tau_derivada sobre la derivada del error.
+    - Limitación de la salida a [salida_min, salida_max] y de su variación a pendiente_max (PWM/s).
+Las salidas son desviaciones en PWM respecto al centro (1500) de cada canal RC. Las ganancias se leen de un archivo
+JSON (ARCHIVO_GANANCIAS); los ejes o parámetros que falten toman el valor de GANANCIAS_POR_DEFECTO, que reproduce el
+control proporcional original de move_drone. Sin el archivo se vuela con GANANCIAS_POR_DEFECTO.
+ARCHIVO_GANANCIAS_SIM (ganancias_pid_sim.json) es un ejemplo con las ganancias ajustadas en el simulador con
+autoajuste_pid.py; no están validadas en el dron real, así que solo deben copiarse a ARCHIVO_GANANCIAS tras probarlas.
+Solo usa la librería estándar para poder ejecutarse dentro de Mission Planner.
+"""
+import os
+import json
+
+ARCHIVO_GANANCIAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ganancias_pid.json")
+ARCHIVO_GANANCIAS_SIM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ganancias_pid_sim.json")
+
+PWM_CENTRO = 1500
+
+EJES = ("alt", "yaw", "x", "y")
+PARAMETROS_PID = ("kp", "ki", "kd", "salida_min", "salida_max", "limite_integral", "tau_derivada", "pendiente_max")
+
+# Control proporcional original de move_drone (Kp_alt=50, Kp_yaw=5, Kp_xy=50) con sus límites de RC3 y RC4
+GANANCIAS_POR_DEFECTO = {
+    "alt": {"kp": 50.0, "salida_min": -200.0, "salida_max": 50.0},
+    "yaw": {"kp": 5.0, "salida_min": -50.0, "salida_max": 50.0},
+    "x": {"kp": 50.0},
+    "y": {"kp": 50.0},
+}
+
+
+def _limitar(valor, minimo, maximo):
+    """Limita un valor a [minimo, maximo]; None en un extremo significa sin límite."""
+    if minimo is not None and valor < minimo:
+        return minimo
+    if maximo is not None and valor > maximo:
+        return maximo
+    return valor
+
+
+class PID:
+    """Controlador PID de un eje; actualizar() devuelve la salida para el error de un ciclo."""
+
+    __slots__ = PARAMETROS_PID + ("integral", "derivada", "error_previo", "salida")
+
+    def __init__(self, kp=0.0, ki=0.0, kd=0.0, salida_min=None, salida_max=None, limite_integral=None,
+                 tau_derivada=0.0, pendiente_max=None):
+        """
+        Args:
+            kp, ki, kd: Ganancias proporcional, integral (por segundo) y derivativa (por segundo⁻¹).
+            salida_min, salida_max: Límites de la salida; None para no limitar.
+            limite_integral: Valor absoluto máximo del término integral (en unidades de la salida).
+            tau_derivada: Constante de tiempo (s) del filtro de la derivada; 0 para no filtrar.
+            pendiente_max: Variación máxima de la salida por segundo; None para no limitar.
+        """
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.salida_min = salida_min
+        self.salida_max = salida_max
+        self.limite_integral = limite_integral
+        self.tau_derivada = tau_derivada
+        self.pendiente_max = pendiente_max
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Borra el estado (integral, derivada y última salida), por ejemplo al empezar un segmento."""
+        self.integral = 0.0
+        self.derivada = 0.0
+        self.error_previo = None
+        self.salida = 0.0
+
+    def actualizar(self, error, dt):
+        """
+        Args:
+            error: Error del eje en este ciclo (objetivo - medida).
+            dt: Tiempo (s) desde el ciclo anterior.
+        Returns:
+            salida: Salida limitada del controlador.
+        """
+        # Derivada del error con filtro de paso bajo; el primer ciclo tras reiniciar no tiene derivada
+        if self.error_previo is not None and dt > 0:
+            bruta = (error - self.error_previo) / dt
+            alfa = dt / (self.tau_derivada + dt) if self.tau_derivada > 0 else 1.0
+            self.derivada += alfa * (bruta - self.derivada)
+        self.error_previo = error
+
+        integral = self.integral + self.ki * error * dt
+        if self.limite_integral is not None:
+            integral = _limitar(integral, -self.limite_integral, self.limite_integral)
+
+        proporcional_derivativa = self.kp * error + self.kd * self.derivada
+        salida = proporcional_derivativa + integral
+        limitada = _limitar(salida, self.salida_min, self.salida_max)
+        if limitada != salida and (salida - limitada) * error > 0:
+            # Anti-windup: con la salida saturada en el sentido del error, la integral no sigue creciendo
+            integral = self.integral
+            limitada = _limitar(proporcional_derivativa + integral, self.salida_min, self.salida_max)
+        self.integral = integral
+
+        if self.pendiente_max is not None and dt > 0:
+            paso = self.pendiente_max * dt
+            limitada = _limitar(limitada, self.salida - paso, self.salida + paso)
+        self.salida = limitada
+        return limitada
+
+
+def cargar_ganancias(file_path=ARCHIVO_GANANCIAS):
+    """
+    Lee las ganancias de un archivo JSON {eje: {parametro: valor}}; si el archivo no existe se usan las de
+    GANANCIAS_POR_DEFECTO. Los ejes y parámetros que falten en el archivo se completan con los valores por defecto.
+    """
+    ganancias = {eje: dict(GANANCIAS_POR_DEFECTO[eje]) for eje in EJES}
+    if file_path is None or not os.path.exists(file_path):
+        return ganancias
+    with open(file_path, "r") as f:
+        leidas = json.load(f)
+    for eje, parametros in leidas.items():
+        if eje not in EJES:
+            raise ValueError(f"Eje desconocido en {file_path}: {eje}")
+        desconocidos = [p for p in parametros if p not in PARAMETROS_PID]
+        if desconocidos:
+            raise ValueError(f"Parámetros desconocidos en {file_path} para el eje {eje}: {desconocidos}")
+        ganancias[eje].update(parametros)
+    return ganancias
+
+
+def guardar_ganancias(ganancias, file_path=ARCHIVO_GANANCIAS):
+    """Escribe las ganancias en formato JSON legible."""
+    with open(file_path, "w") as f:
+        json.dump({eje: ganancias[eje] for eje in EJES if eje in ganancias}, f, indent=4, sort_keys=True)
+        f.write("\n")
+
+
+_ganancias_archivo = None
+
+
+def ganancias_archivo():
+    """Ganancias de ARCHIVO_GANANCIAS, leídas una sola vez."""
+    global _ganancias_archivo
+    if _ganancias_archivo is None:
+        _ganancias_archivo = cargar_ganancias()
+    return _ganancias_archivo
+
+
+class ControladorVuelo:
+    """Los cuatro PID de move_drone; convierte los errores de un ciclo en los comandos RC1-RC4."""
+
+    def __init__(self, ganancias=None):
+        """
+        Args:
+            ganancias: Diccionario {eje: {parametro: valor}}; por defecto las de ARCHIVO_GANANCIAS.
+        """
+        ganancias = ganancias or ganancias_archivo()
+        self.ganancias = ganancias
+        self.alt = PID(**ganancias["alt"])
+        self.yaw = PID(**ganancias["yaw"])
+        self.x = PID(**ganancias["x"])
+        self.y = PID(**ganancias["y"])
+
+    def reiniciar(self):
+        """Borra el estado de los cuatro ejes."""
+        self.alt.reiniciar()
+        self.yaw.reiniciar()
+        self.x.reiniciar()
+        self.y.reiniciar()
+
+    def actualizar(self, error_x, error_y, error_yaw, error_alt, dt):
+        """
+        Args:
+            error_x, error_y: Error de posición en ejes del cuerpo.
+            error_yaw: Error de yaw en grados, normalizado a [-180, 180].
+            error_alt: Error de altura en metros (positivo para subir).
+            dt: Tiempo (s) desde el ciclo anterior.
+        Returns:
+            (rc1, rc2, rc3, rc4): Comandos PWM de roll (Y), pitch (X), throttle (altura) y yaw.
+        """
+        return (int(PWM_CENTRO + self.y.actualizar(error_y, dt)),
+                int(PWM_CENTRO + self.x.actualizar(error_x, dt)),
+                int(PWM_CENTRO + self.alt.actualizar(error_alt, dt)),
+                int(PWM_CENTRO + self.yaw.actualizar(error_yaw, dt)))
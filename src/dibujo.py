@@ -0,0 +1,89 @@
+"""
+Funciones de dibujo compartidas por los scripts de gráficas.
+Las flechas de dirección del recorrido se dibujan con una sola llamada a quiver (un único artista de matplotlib)
+en lugar de una llamada por segmento.
+"""
+import math
+import numpy as np
+
+# Modos de dibujo de las flechas de dirección
+MODO_LOTE = "lote"              # Una sola colección con las flechas diezmadas según la pantalla
+MODO_INDIVIDUAL = "individual"  # Una llamada por segmento (comportamiento original)
+MODOS_FLECHAS = (MODO_LOTE, MODO_INDIVIDUAL)
+
+# Separación mínima aproximada entre flechas en pantalla (píxeles)
+SEPARACION_FLECHAS_PX = 25
+
+
+def paso_decimacion(ax, n_segmentos, separacion_px=SEPARACION_FLECHAS_PX):
+    """
+    Calcula cada cuántos segmentos se dibuja una flecha para no superar la densidad que cabe en pantalla.
+    Se admite aproximadamente una flecha por cada cuadrado de separacion_px x separacion_px del eje.
+    Args:
+        ax: Eje de matplotlib donde se dibujarán las flechas.
+        n_segmentos: Número de segmentos de la trayectoria.
+        separacion_px: Separación mínima aproximada entre flechas en píxeles.
+    Returns:
+        paso: Entero >= 1; se dibuja una flecha cada 'paso' segmentos.
+    """
+    bbox = ax.get_window_extent()
+    max_flechas = max(1, int((bbox.width * bbox.height) / (separacion_px ** 2)))
+    return max(1, math.ceil(n_segmentos / max_flechas))
+
+
+def dibujar_flechas(ax, x_coords, y_coords, z_coords=None, modo=MODO_LOTE,
+                    separacion_px=SEPARACION_FLECHAS_PX):
+    """
+    Añade flechas entre puntos consecutivos para mostrar la dirección del recorrido.
+    Args:
+        ax: Eje 2D o 3D de matplotlib.
+        x_coords, y_coords: Coordenadas de la trayectoria.
+        z_coords: Coordenadas z; si es None se dibuja en 2D.
+        modo: MODO_LOTE (una sola colección diezmada) o MODO_INDIVIDUAL (una flecha por segmento).
+        separacion_px: Separación mínima aproximada entre flechas en modo lote.
+    Returns:
+        artistas: Lista con los artistas de matplotlib creados.
+    """
+    if modo not in MODOS_FLECHAS:
+        raise ValueError(f"Modo de flechas desconocido: {modo}")
+
+    x = np.asarray(x_coords, dtype=float)
+    y = np.asarray(y_coords, dtype=float)
+    z = None if z_coords is None else np.asarray(z_coords, dtype=float)
+    n_segmentos = len(x) - 1
+    if n_segmentos < 1:
+        return []
+
+    if modo == MODO_INDIVIDUAL:
+        return _dibujar_flechas_individuales(ax, x, y, z)
+
+    # Elegir los segmentos que se dibujan según la densidad en pantalla
+    paso = paso_decimacion(ax, n_segmentos, separacion_px)
+    idx = np.arange(0, n_segmentos, paso)
+
+    dx = x[idx + 1] - x[idx]
+    dy = y[idx + 1] - y[idx]
+
+    if z is None:
+        # Flechas en coordenadas de datos para que cada una una dos puntos de la trayectoria
+        flechas = ax.quiver(x[idx], y[idx], dx, dy, angles='xy', scale_units='xy', scale=1,
+                            color='black', width=0.003)
+    else:
+        dz = z[idx + 1] - z[idx]
+        flechas = ax.quiver(x[idx], y[idx], z[idx], dx, dy, dz, arrow_length_ratio=0.1)
+
+    return [flechas]
+
+
+def _dibujar_flechas_individuales(ax, x, y, z):
+    """Dibuja una flecha por segmento, como hacían originalmente los scripts de gráficas."""
+    artistas = []
+    for i in range(len(x) - 1):
+        if z is None:
+            artistas.append(ax.annotate('', xy=(x[i + 1], y[i + 1]), xytext=(x[i], y[i]),
+                                        arrowprops=dict(facecolor='black', arrowstyle='->')))
+        else:
+            artistas.append(ax.quiver(x[i], y[i], z[i],
+                                      x[i + 1] - x[i], y[i + 1] - y[i], z[i + 1] - z[i],
+                                      arrow_length_ratio=0.1))
+    return artistas
@@ -0,0 +1,263 @@
+"""
+Estimador de la posición del dron a la frecuencia del bucle de control, con un filtro complementario sobre
+el flujo óptico (ponderado por opt_qua), el yaw, el sensor ToF (sonarrange) y el barómetro (alt).
+
+Posición horizontal:
+    - El incremento medido de cada ciclo (en ejes del cuerpo) se pondera con la calidad del flujo:
+      peso = (opt_qua - CALIDAD_MIN) / (CALIDAD_MAX - CALIDAD_MIN), limitado a [0, 1].
+    - Con peso 1 se usa el incremento medido; con peso 0 se usa el previsto, que es la media ponderada de los
+      incrementos de los últimos VENTANA_VELOCIDAD ciclos (velocidad reciente); en medio se combinan.
+    - El incremento se acumula en ejes del cuerpo (cuerpo_x, cuerpo_y; lo que compara move_drone) y, rotado con el
+      yaw, en ejes del mundo (x, y) con el mismo criterio que grafica.py, trayectoria.reconstruct_trajectory y
+      marco_mundo.cuerpo_a_mundo (X invertida y rotada).
+Altura:
+    - Mientras el ToF está dentro de su alcance (SONAR_MIN, SONAR_MAX) y hay barómetro, se estima el desfase del
+      barómetro como la media de (alt - sonarrange) de las últimas VENTANA_BARO lecturas válidas.
+    - z = PESO_SONAR * sonarrange + (1 - PESO_SONAR) * (alt - desfase); sin ToF válido, z = alt - desfase,
+      y sin ninguna lectura válida se mantiene la altura anterior.
+
+update(snapshot) solo usa la librería estándar y su coste es constante por ciclo: el estado son escalares y
+ventanas circulares de tamaño fijo reservadas al crear el estimador (puede ejecutarse dentro de Mission Planner).
+move_drone lo usa en el bucle de control si se le pasa (argumento estimador; ordenes.ESTIMAR_POSICION en main()).
+estimar_lote aplica el mismo filtro con NumPy a todas las filas de un registro a la vez (análisis de Rutas).
+"""
+import math
+
+from marco_mundo import cuerpo_a_mundo
+
+# Calidad del flujo (opt_qua) a partir de la cual el incremento medido empieza a contar y con la que cuenta del todo
+CALIDAD_MIN = 50
+CALIDAD_MAX = 150
+
+# Ciclos con los que se estima el incremento previsto y lecturas válidas con las que se estima el desfase del barómetro
+VENTANA_VELOCIDAD = 10
+VENTANA_BARO = 50
+
+# Peso del ToF frente al barómetro corregido
+PESO_SONAR = 0.8
+
+# Alcance válido del ToF (m); fuera de él (en el suelo o por encima del máximo) se usa el barómetro
+SONAR_MIN = 0.05
+SONAR_MAX = 4.0
+
+# Suma de pesos por debajo de la cual no hay incremento previsto
+_PESO_MINIMO = 1e-9
+
+# Campos de 'cs' que usa el estimador (para TelemetryReader)
+CAMPOS_ESTIMADOR = ("opt_m_x", "opt_m_y", "opt_qua", "yaw", "sonarrange", "alt")
+
+
+def peso_calidad(calidad):
+    """Peso del incremento medido según la calidad del flujo (0 si la calidad no es un número)."""
+    if calidad != calidad:
+        return 0.0
+    return min(1.0, max(0.0, (calidad - CALIDAD_MIN) / float(CALIDAD_MAX - CALIDAD_MIN)))
+
+
+class EstimadorPosicion:
+    """
+    Filtro complementario de posición con coste constante por ciclo.
+    Después de cada update() la estimación está en los atributos x, y (mundo), cuerpo_x, cuerpo_y, z,
+    desfase_baro y peso (peso del flujo medido en el último ciclo).
+    """
+
+    __slots__ = ("flujo_acumulado", "x", "y", "z", "cuerpo_x", "cuerpo_y", "desfase_baro", "peso", "ciclos",
+                 "_anterior_x", "_anterior_y", "_ventana_wx", "_ventana_wy", "_ventana_w", "_suma_wx", "_suma_wy",
+                 "_suma_w", "_i_velocidad", "_ventana_baro", "_suma_baro", "_n_baro", "_i_baro")
+
+    def __init__(self, flujo_acumulado=True):
+        """
+        Args:
+            flujo_acumulado: True si opt_m_x y opt_m_y son el flujo acumulado (como en el simulador y en move_drone,
+                             que resta el valor inicial); False si cada lectura ya es el incremento del ciclo
+                             (como en las filas de los archivos de Rutas).
+        """
+        self.flujo_acumulado = flujo_acumulado
+        self.x = self.y = self.z = 0.0
+        self.cuerpo_x = self.cuerpo_y = 0.0
+        self.desfase_baro = 0.0
+        self.peso = 0.0
+        self.ciclos = 0
+        self._anterior_x = self._anterior_y = None
+
+        # Ventanas circulares preasignadas: incrementos ponderados y pesos, y desfases del barómetro
+        self._ventana_wx = [0.0] * VENTANA_VELOCIDAD
+        self._ventana_wy = [0.0] * VENTANA_VELOCIDAD
+        self._ventana_w = [0.0] * VENTANA_VELOCIDAD
+        self._suma_wx = self._suma_wy = self._suma_w = 0.0
+        self._i_velocidad = 0
+        self._ventana_baro = [0.0] * VENTANA_BARO
+        self._suma_baro = 0.0
+        self._n_baro = 0
+        self._i_baro = 0
+
+    def reiniciar_posicion(self):
+        """Pone a cero la posición acumulada (por ejemplo, al empezar un segmento) sin perder el resto del estado."""
+        self.x = self.y = 0.0
+        self.cuerpo_x = self.cuerpo_y = 0.0
+
+    def update(self, snapshot):
+        """
+        Actualiza la estimación con un TelemetrySnapshot (el barómetro solo se usa si el snapshot tiene 'alt').
+        Returns:
+            El propio estimador.
+        """
+        return self.actualizar(snapshot.opt_m_x, snapshot.opt_m_y, snapshot.opt_qua, snapshot.yaw,
+                               getattr(snapshot, "sonarrange", None), getattr(snapshot, "alt", None))
+
+    def actualizar(self, flujo_x, flujo_y, calidad, yaw, sonar=None, baro=None):
+        """Actualiza la estimación con los valores de un ciclo (ver update). Devuelve el propio estimador."""
+        self.ciclos += 1
+
+        # Incremento medido en ejes del cuerpo
+        if self.flujo_acumulado:
+            if self._anterior_x is None:
+                medido_x = medido_y = 0.0
+            else:
+                medido_x = flujo_x - self._anterior_x
+                medido_y = flujo_y - self._anterior_y
+            self._anterior_x = flujo_x
+            self._anterior_y = flujo_y
+        else:
+            medido_x, medido_y = flujo_x, flujo_y
+
+        peso = peso_calidad(calidad)
+        if medido_x != medido_x or medido_y != medido_y:
+            peso, medido_x, medido_y = 0.0, 0.0, 0.0
+        self.peso = peso
+
+        # Incremento previsto con los ciclos anteriores y combinación según la calidad
+        if self._suma_w > _PESO_MINIMO:
+            previsto_x = self._suma_wx / self._suma_w
+            previsto_y = self._suma_wy / self._suma_w
+        else:
+            previsto_x = previsto_y = 0.0
+        dx = peso * medido_x + (1.0 - peso) * previsto_x
+        dy = peso * medido_y + (1.0 - peso) * previsto_y
+
+        i = self._i_velocidad
+        wx, wy = peso * medido_x, peso * medido_y
+        self._suma_wx += wx - self._ventana_wx[i]
+        self._suma_wy += wy - self._ventana_wy[i]
+        self._suma_w += peso - self._ventana_w[i]
+        self._ventana_wx[i], self._ventana_wy[i], self._ventana_w[i] = wx, wy, peso
+        self._i_velocidad = (i + 1) % VENTANA_VELOCIDAD
+
+        # Acumular en ejes del cuerpo y, rotado con el yaw, en ejes del mundo
+        self.cuerpo_x += dx
+        self.cuerpo_y += dy
+        mundo_x, mundo_y = cuerpo_a_mundo(dx, dy, math.radians(yaw))
+        self.x += mundo_x
+        self.y += mundo_y
+
+        # Altura: ToF dentro de su alcance, barómetro corregido con el desfase medio respecto al ToF
+        sonar_valido = sonar is not None and SONAR_MIN < sonar < SONAR_MAX
+        baro_valido = baro is not None and baro == baro
+        if sonar_valido and baro_valido:
+            i = self._i_baro
+            desfase = baro - sonar
+            self._suma_baro += desfase - self._ventana_baro[i]
+            self._ventana_baro[i] = desfase
+            self._i_baro = (i + 1) % VENTANA_BARO
+            if self._n_baro < VENTANA_BARO:
+                self._n_baro += 1
+            self.desfase_baro = self._suma_baro / self._n_baro
+
+        if sonar_valido:
+            self.z = PESO_SONAR * sonar + (1.0 - PESO_SONAR) * (baro - self.desfase_baro) if baro_valido else sonar
+        elif baro_valido:
+            self.z = baro - self.desfase_baro
+        return self
+
+
+def _suma_ventana(valores, ventana, incluir_actual):
+    """
+    Suma de cada ventana deslizante de un array con cumsum.
+    Con incluir_actual=False la ventana del elemento k son los 'ventana' elementos anteriores (sin el k).
+    """
+    import numpy as np
+
+    acumulado = np.concatenate(([0.0], np.cumsum(valores)))
+    fin = np.arange(len(valores)) + (1 if incluir_actual else 0)
+    return acumulado[fin] - acumulado[np.maximum(fin - ventana, 0)]
+
+
+def estimar_lote(flujo_x, flujo_y, calidad, yaw, sonar=None, baro=None, flujo_acumulado=False):
+    """
+    Aplica el filtro de EstimadorPosicion a un registro completo con operaciones vectorizadas.
+    Args:
+        flujo_x, flujo_y, calidad, yaw: Arrays con una lectura por ciclo.
+        sonar, baro: Arrays de altura del ToF y del barómetro, o None si no se tienen.
+        flujo_acumulado: Como en EstimadorPosicion (por defecto False: filas de Rutas con el incremento de cada ciclo).
+    Returns:
+        x, y, z: Arrays con la estimación después de cada ciclo (la misma que daría update() ciclo a ciclo).
+    """
+    import numpy as np
+
+    flujo_x = np.asarray(flujo_x, dtype=float)
+    flujo_y = np.asarray(flujo_y, dtype=float)
+    calidad = np.asarray(calidad, dtype=float)
+    n = len(flujo_x)
+
+    if flujo_acumulado:
+        medido_x = np.diff(flujo_x, prepend=flujo_x[:1])
+        medido_y = np.diff(flujo_y, prepend=flujo_y[:1])
+    else:
+        medido_x, medido_y = flujo_x, flujo_y
+
+    peso = np.clip((calidad - CALIDAD_MIN) / float(CALIDAD_MAX - CALIDAD_MIN), 0.0, 1.0)
+    invalidos = np.isnan(calidad) | np.isnan(medido_x) | np.isnan(medido_y)
+    peso[invalidos] = 0.0
+    medido_x = np.where(invalidos, 0.0, medido_x)
+    medido_y = np.where(invalidos, 0.0, medido_y)
+
+    # Incremento previsto: media ponderada de los VENTANA_VELOCIDAD ciclos anteriores
+    suma_w = _suma_ventana(peso, VENTANA_VELOCIDAD, False)
+    hay_prevision = suma_w > _PESO_MINIMO
+    divisor = np.where(hay_prevision, suma_w, 1.0)
+    previsto_x = np.where(hay_prevision, _suma_ventana(peso * medido_x, VENTANA_VELOCIDAD, False) / divisor, 0.0)
+    previsto_y = np.where(hay_prevision, _suma_ventana(peso * medido_y, VENTANA_VELOCIDAD, False) / divisor, 0.0)
+    dx = peso * medido_x + (1.0 - peso) * previsto_x
+    dy = peso * medido_y + (1.0 - peso) * previsto_y
+
+    # Rotación con el criterio de marco_mundo.cuerpo_a_mundo (X invertida)
+    yaw_rad = np.radians(np.asarray(yaw, dtype=float))
+    x = np.cumsum(-dx * np.cos(yaw_rad) - dy * np.sin(yaw_rad))
+    y = np.cumsum(-dx * np.sin(yaw_rad) + dy * np.cos(yaw_rad))
+
+    # Altura
+    sonar = np.full(n, np.nan) if sonar is None else np.asarray(sonar, dtype=float)
+    baro = np.full(n, np.nan) if baro is None else np.asarray(baro, dtype=float)
+    sonar_valido = (sonar > SONAR_MIN) & (sonar < SONAR_MAX)
+    baro_valido = ~np.isnan(baro)
+    ambos = sonar_valido & baro_valido
+
+    # Desfase: media de las últimas VENTANA_BARO lecturas con ToF y barómetro válidos (0 hasta la primera)
+    desfases = np.concatenate(([0.0], np.cumsum((baro - sonar)[ambos])))
+    n_validas = np.cumsum(ambos)
+    en_ventana = np.minimum(n_validas, VENTANA_BARO)
+    desfase = (desfases[n_validas] - desfases[n_validas - en_ventana]) / np.maximum(en_ventana, 1)
+
+    z = np.where(sonar_valido, np.where(baro_valido, PESO_SONAR * sonar + (1.0 - PESO_SONAR) * (baro - desfase), sonar),
+                 np.where(baro_valido, baro - desfase, np.nan))
+    # Sin lecturas válidas se mantiene la altura anterior (0 al principio)
+    definidos = np.where(np.isnan(z), 0, np.arange(1, n + 1))
+    z = np.concatenate(([0.0], z))[np.maximum.accumulate(definidos)]
+    return x, y, z
+
+
+def estimar_ruta(file_path):
+    """
+    Aplica estimar_lote a un archivo de Rutas (filas con el incremento del flujo de cada muestra).
+    La altura es la columna alt o sonarrange, que los scripts de registro leen del ToF; no hay barómetro.
+    Returns:
+        x, y, z: Arrays con la estimación después de cada fila.
+    """
+    from lector_rutas import leer_ruta
+
+    _, datos = leer_ruta(file_path)
+    campos = datos.dtype.names
+    if not {"opt_m_x", "opt_m_y", "opt_qua", "yaw"} <= set(campos):
+        raise ValueError("La ruta debe tener las columnas opt_m_x, opt_m_y, opt_qua y yaw.")
+    altura = next((datos[c] for c in ("alt", "sonarrange") if c in campos), None)
+    return estimar_lote(datos["opt_m_x"], datos["opt_m_y"], datos["opt_qua"], datos["yaw"], sonar=altura)
@@ -0,0 +1,294 @@
+"""
+Formato binario de columnas fijas para los archivos de rutas.
+
+Estructura del archivo (little-endian):
+    - Cabecera: firma b"RUTB", versión (uint8), número de columnas (uint8), reservado (uint16),
+      frecuencia de muestreo en Hz (float64, 0 si se desconoce), longitud de los nombres (uint16)
+      y los nombres de las columnas separados por comas (UTF-8). Se rellena con ceros hasta múltiplo de 8 bytes.
+    - Registros: una fila por muestra con un float64 por columna. Los booleanos (objetivo_alcanzado) se guardan como 1.0/0.0.
+
+El número de filas se deduce del tamaño del archivo, por lo que el escritor solo añade registros al final.
+El escritor usa únicamente la librería estándar para poder utilizarse en los scripts de vuelo;
+el lector usa np.memmap y devuelve una matriz NxM sin copiar los datos.
+
+Uso: python formato_binario.py <archivo o directorio> [frecuencia_Hz]
+    Convierte .txt -> .rutb o .rutb -> .txt según la extensión. Con un directorio convierte todos los .txt que contenga.
+"""
+import os
+import sys
+import struct
+
+FIRMA = b"RUTB"
+VERSION = 1
+EXTENSION_BINARIA = ".rutb"
+
+_CABECERA_FIJA = struct.Struct("<4sBBHdH")
+_ALINEACION = 8
+
+# Filas por bloque al leer un archivo por partes
+FILAS_POR_BLOQUE = 65536
+
+# Columnas que se escriben como True/False al volver a texto
+COLUMNAS_BOOLEANAS = ("objetivo_alcanzado",)
+
+
+def es_binario(file_path):
+    """Indica si el archivo tiene la extensión del formato binario."""
+    return file_path.lower().endswith(EXTENSION_BINARIA)
+
+
+def _empaquetar_cabecera(columnas, frecuencia):
+    """Construye los bytes de la cabecera para las columnas y la frecuencia indicadas."""
+    nombres = ",".join(columnas).encode("utf-8")
+    cabecera = _CABECERA_FIJA.pack(FIRMA, VERSION, len(columnas), 0, float(frecuencia), len(nombres)) + nombres
+    relleno = (-len(cabecera)) % _ALINEACION
+    return cabecera + b"\0" * relleno
+
+
+def leer_cabecera(file_obj):
+    """
+    Lee la cabecera de un archivo binario de ruta.
+    Args:
+        file_obj: Archivo abierto en modo binario y posicionado al inicio.
+    Returns:
+        columnas: Lista con los nombres de las columnas.
+        frecuencia: Frecuencia de muestreo en Hz (0.0 si se desconoce).
+        tam_cabecera: Tamaño de la cabecera en bytes (desplazamiento del primer registro).
+    """
+    fija = file_obj.read(_CABECERA_FIJA.size)
+    if len(fija) < _CABECERA_FIJA.size:
+        raise ValueError("Archivo binario de ruta truncado.")
+    firma, version, n_columnas, _, frecuencia, len_nombres = _CABECERA_FIJA.unpack(fija)
+    if firma != FIRMA:
+        raise ValueError("El archivo no tiene el formato binario de ruta.")
+    if version != VERSION:
+        raise ValueError(f"Versión de formato binario no soportada: {version}")
+
+    columnas = file_obj.read(len_nombres).decode("utf-8").split(",")
+    if len(columnas) != n_columnas:
+        raise ValueError("La cabecera del archivo binario está dañada.")
+
+    tam = _CABECERA_FIJA.size + len_nombres
+    tam += (-tam) % _ALINEACION
+    return columnas, frecuencia, tam
+
+
+class EscritorBinario:
+    """
+    Escritor de archivos binarios de ruta, pensado para usarse dentro de los bucles de registro.
+    Cada llamada a write_row añade un registro de ancho fijo al final del archivo.
+    """
+
+    def __init__(self, file_path, columnas, frecuencia=0.0):
+        """
+        Args:
+            file_path: Ruta del archivo a crear.
+            columnas: Nombres de las columnas, en orden.
+            frecuencia: Frecuencia de muestreo en Hz (0 si se desconoce).
+        """
+        self.columnas = list(columnas)
+        self._registro = struct.Struct("<%dd" % len(self.columnas))
+        self._file = open(file_path, "wb")
+        self._file.write(_empaquetar_cabecera(self.columnas, frecuencia))
+
+    def write_row(self, valores):
+        """Añade una fila; los booleanos se guardan como 1.0/0.0."""
+        self._file.write(self._registro.pack(*valores))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def leer_binario(file_path):
+    """
+    Abre un archivo binario de ruta sin copiar los datos en memoria.
+    Args:
+        file_path: Ruta del archivo .rutb.
+    Returns:
+        datos: Matriz NxM de float64 respaldada por np.memmap (solo lectura).
+        columnas: Lista con los nombres de las columnas.
+        frecuencia: Frecuencia de muestreo en Hz (0.0 si se desconoce).
+    """
+    import numpy as np
+
+    with open(file_path, "rb") as f:
+        columnas, frecuencia, tam_cabecera = leer_cabecera(f)
+
+    tam_registro = 8 * len(columnas)
+    n_filas = (os.path.getsize(file_path) - tam_cabecera) // tam_registro
+    if n_filas == 0:
+        return np.empty((0, len(columnas))), columnas, frecuencia
+
+    datos = np.memmap(file_path, dtype="<f8", mode="r", offset=tam_cabecera, shape=(n_filas, len(columnas)))
+    return datos, columnas, frecuencia
+
+
+def guardar_binario(file_path, columnas, datos, frecuencia=0.0):
+    """
+    Escribe una matriz NxM completa en formato binario (de una vez, sin pasar fila a fila por EscritorBinario).
+    Se escribe en un archivo temporal que se renombra al terminar: si la escritura falla no queda un archivo a medias,
+    y quien lea el archivo a la vez (otro proceso) ve el anterior o el nuevo completo.
+    Args:
+        file_path: Ruta del archivo a crear.
+        columnas: Nombres de las columnas, en orden.
+        datos: Matriz NxM de NumPy; los booleanos como 1.0/0.0.
+        frecuencia: Frecuencia de muestreo en Hz (0 si se desconoce).
+    """
+    import numpy as np
+
+    # Un temporal por proceso, para que dos procesos que escriben el mismo archivo no se mezclen
+    temporal = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, "wb") as f:
+            f.write(_empaquetar_cabecera(list(columnas), frecuencia))
+            np.ascontiguousarray(datos, dtype="<f8").tofile(f)
+        os.replace(temporal, file_path)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def cargar_ruta(file_path):
+    """
+    Carga un archivo de ruta en formato de texto o binario.
+    Args:
+        file_path: Ruta del archivo (.txt o .rutb).
+    Returns:
+        cabecera: Lista con los nombres de las columnas.
+        datos: Matriz NxM con los datos (2D aunque solo haya una fila); objetivo_alcanzado como 1.0/0.0.
+    """
+    from lector_rutas import leer_matriz
+
+    return leer_matriz(file_path)
+
+
+def leer_cabecera_ruta(file_path):
+    """Devuelve los nombres de las columnas de un archivo de ruta de texto o binario sin leer los datos."""
+    if es_binario(file_path):
+        with open(file_path, "rb") as f:
+            return leer_cabecera(f)[0]
+    with open(file_path, "r") as f:
+        return [col.strip() for col in f.readline().strip().split(",")]
+
+
+def cargar_ruta_por_bloques(file_path, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Lee un archivo de ruta de texto o binario por bloques, sin cargarlo entero en memoria.
+    Args:
+        file_path: Ruta del archivo (.txt o .rutb).
+        filas_por_bloque: Número máximo de filas de cada bloque.
+    Yields:
+        Matrices NxM (2D aunque solo haya una fila); las mismas filas que devolvería cargar_ruta.
+    """
+    if es_binario(file_path):
+        datos, _, _ = leer_binario(file_path)
+        for inicio in range(0, len(datos), filas_por_bloque):
+            yield datos[inicio:inicio + filas_por_bloque]
+        return
+
+    from lector_rutas import parsear_texto
+
+    with open(file_path, "r") as f:
+        n_columnas = len(f.readline().strip().split(","))
+        lineas = []
+        for linea in f:
+            # Las líneas en blanco se ignoran; aquí se descartan para que no cuenten en el bloque
+            if not linea.strip():
+                continue
+            lineas.append(linea)
+            if len(lineas) == filas_por_bloque:
+                yield parsear_texto("".join(lineas), n_columnas)
+                lineas = []
+        if lineas:
+            yield parsear_texto("".join(lineas), n_columnas)
+
+
+def _valor_texto(valor):
+    """Convierte un valor del formato de texto (número o True/False) a float."""
+    valor = valor.strip()
+    if valor == "True":
+        return 1.0
+    if valor == "False":
+        return 0.0
+    try:
+        return float(valor)
+    except ValueError:
+        return float("nan")
+
+
+def txt_a_binario(txt_path, bin_path=None, frecuencia=0.0):
+    """
+    Convierte un archivo de ruta de texto al formato binario.
+    Args:
+        txt_path: Archivo de texto de origen.
+        bin_path: Archivo binario de destino; por defecto el mismo nombre con extensión .rutb.
+        frecuencia: Frecuencia de muestreo en Hz a guardar en la cabecera.
+    Returns:
+        bin_path: Ruta del archivo creado.
+    """
+    if bin_path is None:
+        bin_path = os.path.splitext(txt_path)[0] + EXTENSION_BINARIA
+
+    with open(txt_path, "r") as f:
+        columnas = [col.strip() for col in f.readline().strip().split(",")]
+        with EscritorBinario(bin_path, columnas, frecuencia) as escritor:
+            for line in f:
+                if not line.strip():
+                    continue
+                valores = [_valor_texto(v) for v in line.split(",")]
+                # Completar o recortar filas mal formadas para mantener el ancho fijo
+                valores = (valores + [float("nan")] * len(columnas))[:len(columnas)]
+                escritor.write_row(valores)
+    return bin_path
+
+
+def binario_a_txt(bin_path, txt_path=None):
+    """
+    Convierte un archivo de ruta binario al formato de texto original (valores separados por ", ").
+    Args:
+        bin_path: Archivo binario de origen.
+        txt_path: Archivo de texto de destino; por defecto el mismo nombre con extensión .txt.
+    Returns:
+        txt_path: Ruta del archivo creado.
+    """
+    if txt_path is None:
+        txt_path = os.path.splitext(bin_path)[0] + ".txt"
+
+    datos, columnas, _ = leer_binario(bin_path)
+    booleanas = [col in COLUMNAS_BOOLEANAS for col in columnas]
+
+    with open(txt_path, "w") as f:
+        f.write(", ".join(columnas) + "\n")
+        for fila in datos.tolist():
+            valores = [str(v == 1.0) if es_bool else repr(v) for v, es_bool in zip(fila, booleanas)]
+            f.write(", ".join(valores) + "\n")
+    return txt_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Uso: python formato_binario.py <archivo o directorio> [frecuencia_Hz]")
+        sys.exit(1)
+
+    origen = sys.argv[1]
+    frecuencia = float(sys.argv[2]) if len(sys.argv) == 3 else 0.0
+
+    if os.path.isdir(origen):
+        for raiz, _, archivos in os.walk(origen):
+            for nombre in sorted(archivos):
+                if nombre.lower().endswith(".txt"):
+                    print(txt_a_binario(os.path.join(raiz, nombre), frecuencia=frecuencia))
+    elif es_binario(origen):
+        print(binario_a_txt(origen))
+    else:
+        print(txt_a_binario(origen, frecuencia=frecuencia))
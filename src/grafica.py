@@ -8,136 +8,168 @@ import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import math
 import matplotlib.cm as cm
+import matplotlib.colors as mcolors
+from trayectoria import reconstruct_trajectory, recorrer_por_bloques
+from dibujo import dibujar_flechas, MODO_LOTE
+from formato_binario import cargar_ruta, cargar_ruta_por_bloques, leer_cabecera_ruta
+from lod import PuntosLOD, indices_lod, forzados_trayectoria, MAX_PUNTOS_LOD
+from lector_rutas import separar_tiempo, COLUMNA_TIEMPO
+from remuestreo import tiempos_ruta, frecuencia_supuesta
 
 # Nombres de columnas válidos (en orden)
 COLUMNAS_VALIDAS = [
     "opt_m_x", "opt_m_y", "opt_qua", "yaw", "alt", "battery_V", "objetivo_alcanzado"
 ]
 
-def main(file_name):
+# Tamaño (bytes) a partir del cual el archivo se lee por bloques y se dibuja una versión diezmada
+UMBRAL_POR_BLOQUES = 64 * 1024 * 1024
+# Número máximo de puntos que se dibujan al leer por bloques
+MAX_PUNTOS_POR_BLOQUES = 20000
+
+def colores_puntos(calidad, objetivo=None, min_quality=None, max_quality=None):
     """
-    Función principal que grafica la trayectoria del dron en 3D a partir de un archivo de datos.
+    Calcula el color de cada punto: verde si el objetivo se alcanzó y, si no, coolwarm según la calidad
+    normalizada (azul la mejor calidad, rojo la peor). El mapa de colores se evalúa en una sola llamada.
     Args:
-        file_name: Nombre del archivo que contiene los datos de la trayectoria del dron.
+        calidad: Array con opt_qua de cada punto.
+        objetivo: Array con objetivo_alcanzado de cada punto (o None si no hay columna).
+        min_quality, max_quality: Rango de calidad para normalizar; por defecto el de 'calidad'.
+    Returns:
+        Matriz Nx4 con los colores RGBA.
     """
-    
-    # Obtener la ruta del directorio actual del script 
-    current_dir = os.path.dirname(os.path.abspath(__file__))
+    calidad = np.asarray(calidad, dtype=float)
+    if min_quality is None:
+        min_quality = np.nanmin(calidad) if len(calidad) else 0.0
+    if max_quality is None:
+        max_quality = np.nanmax(calidad) if len(calidad) else 0.0
 
-    # Ruta completa al archivo 
-    file_path = os.path.join(current_dir, "..\\Rutas", file_name) 
+    # Normalizar la calidad para que esté entre 0 y 1
+    rango = max_quality - min_quality
+    norm_quality = (calidad - min_quality) / rango if rango > 0 else np.zeros_like(calidad)
+    colores = cm.coolwarm(1.0 - norm_quality)
+
+    if objetivo is not None:
+        colores[np.asarray(objetivo) == 1] = mcolors.to_rgba('green')
+    return colores
 
-    # Leer la cabecera y comprobar columnas
-    with open(file_path, "r") as f:
-        header = f.readline().strip().split(",")
-        
+def comprobar_cabecera(header):
+    """
+    Comprueba que la cabecera tiene entre 5 y 7 columnas con los nombres de COLUMNAS_VALIDAS en orden, más la
+    columna de tiempo opcional al final. Lanza ValueError con el mensaje de error si no es así.
+    """
+    header = [col.strip() for col in header]
+    if header and header[-1] == COLUMNA_TIEMPO:
+        header = header[:-1]
     if not (5 <= len(header) <= 7):
-        print(f"Error: El archivo debe tener entre 5 y 7 columnas, tiene {len(header)}.")
-        # print(f"Cabecera encontrada: {header}")
-        sys.exit(1)
-        
+        raise ValueError(f"Error: El archivo debe tener entre 5 y 7 columnas, tiene {len(header)}.")
+
     for i, col in enumerate(header):
         if col.strip() != COLUMNAS_VALIDAS[i]:
-            print(f"Error: Tipo de columnas incorrectas.")
-            sys.exit(1)
-        
-    # Leer el archivo de datos
-    datos = np.genfromtxt(file_path, delimiter=',', skip_header=1)
-
-    # Si solo hay una fila, genfromtxt devuelve un vector 1D;
-    # Convertir en una matriz 2D de 1xN para que datos[:,2] funcione.
-    if datos.ndim == 1:
-        datos = datos.reshape(1, -1)
-    
-    #Si hay columna de objetivo_alcanzado, guardar los datos
-    has_obj = (datos.shape[1] == 7)
-    if has_obj:
-        obj_flags = datos[:, 6].astype(int)
+            raise ValueError(f"Error: Tipo de columnas incorrectas.")
 
-    # Inicializar las listas para almacenar las coordenadas y los colores
-    x_coords = [0]
-    y_coords = [0]
-    z_coords = [0]
-    colors = ['red']  # Inicializar con un color para el punto de inicio
+def cargar_trayectoria(file_path, mensajes=True):
+    """
+    Lee un archivo de ruta, comprueba sus columnas y reconstruye la trayectoria.
+    Los archivos de más de UMBRAL_POR_BLOQUES bytes se leen por bloques y se devuelve una muestra de sus filas.
+    Args:
+        file_path: Ruta del archivo (.txt o .rutb).
+        mensajes: Si es True, se informa por consola cuando el archivo se lee por bloques o no tiene columna t.
+    Returns:
+        datos: Matriz NxM con las filas (todas o la muestra), sin la columna de tiempo.
+        indices: Índice de cada punto de la trayectoria (N+1 elementos, empezando por el punto de inicio 0).
+        x_coords, y_coords, z_coords: Coordenadas de la trayectoria (N+1 elementos).
+        min_quality, max_quality: Rango de opt_qua en todo el archivo.
+        tiempo: Tiempo (s) de cada fila de datos: la columna t o, en los archivos antiguos, el de una frecuencia
+            supuesta (remuestreo.frecuencia_supuesta).
+    """
+    # Leer la cabecera (archivo de texto o binario .rutb)
+    cabecera = leer_cabecera_ruta(file_path)
+    comprobar_cabecera(cabecera)
+    medido = COLUMNA_TIEMPO in [col.strip() for col in cabecera]
 
-    # Normalizar la calidad para que esté entre 0 y 1
-    max_quality = max(datos[:, 2])
-    min_quality = min(datos[:, 2])
-    norm_quality = (datos[:, 2] - min_quality) / (max_quality - min_quality)
+    if os.path.getsize(file_path) >= UMBRAL_POR_BLOQUES:
+        # Archivo grande: reconstruir por bloques en memoria constante y quedarse con una muestra de las filas.
+        # De la columna t solo se guardan los valores (8 bytes por fila) para el eje de tiempo de la muestra
+        tiempos = []
 
-    # Ángulo de rotación inicial (asumiendo que es 0)
-    previous_yaw_raw = None
-    acum_yaw = 0  # Acumulador para el yaw global
-    
-    # Recorrer las filas del archivo de datos
-    for i in range(len(datos)):
-        opt_m_x = -datos[i, 0]
-        opt_m_y = datos[i, 1]
-        qua = norm_quality[i]  # Usar la calidad normalizada
-        yaw = datos[i, 3]
-        alt = datos[i, 4]
-        
-        # Convertir yaw a radianes
-        current_yaw_raw = math.radians(yaw)
-        
-        if previous_yaw_raw is None:
-        # Para la primera iteración, el ángulo acumulado es el mismo que el raw
-            acum_yaw = current_yaw_raw
-        else:
-            # Calcular la diferencia entre el yaw actual y el anterior
-            diff = current_yaw_raw - previous_yaw_raw
-            
-            # Ajustar la diferencia para que esté en el rango [-pi, pi]
-            if diff > math.pi:
-                diff -= 2 * math.pi
-            elif diff < -math.pi:
-                diff += 2 * math.pi
-            
-            # Acumular la diferencia al yaw global
-            acum_yaw += diff
-
-        # Actualizamos el yaw raw previo para la siguiente iteración
-        previous_yaw_raw = current_yaw_raw
-        
-        # Calcular las componentes x e y teniendo en cuenta la rotación del dron
-        delta_x = opt_m_x * math.cos(acum_yaw) - opt_m_y * math.sin(acum_yaw)
-        delta_y = opt_m_x * math.sin(acum_yaw) + opt_m_y * math.cos(acum_yaw)
-
-        # Calcular las nuevas coordenadas sumando los deltas calculados a las coordenadas anteriores
-        x_coords.append(x_coords[-1] + delta_x)
-        y_coords.append(y_coords[-1] + delta_y)
-        z_coords.append(alt)
-
-        # Elegir color: verde si el objetivo se alcanzó, si no usar coolwarm
-        if has_obj and obj_flags[i] == 1:
-            colors.append('green')
+        def bloques_sin_tiempo():
+            for bloque in cargar_ruta_por_bloques(file_path):
+                _, bloque, t = separar_tiempo(cabecera, bloque)
+                if t is not None:
+                    tiempos.append(t)
+                yield bloque
+
+        resumen, indices, datos, x_coords, y_coords, z_coords = recorrer_por_bloques(bloques_sin_tiempo(),
+                                                                                     MAX_PUNTOS_POR_BLOQUES)
+        if medido:
+            tiempo = np.concatenate(tiempos)[indices - 1]
         else:
-            colors.append(cm.coolwarm(1.0 - norm_quality[i]))
+            tiempo = (indices - 1) / frecuencia_supuesta(cabecera)
+        x_coords = np.concatenate(([0.0], x_coords))
+        y_coords = np.concatenate(([0.0], y_coords))
+        z_coords = np.concatenate(([0.0], z_coords))
+        indices = np.concatenate(([0], indices))
+        max_quality = resumen.max_quality
+        min_quality = resumen.min_quality
+        if mensajes:
+            print(f"{resumen.filas} filas leídas por bloques, se dibujan {len(datos)}.")
+    else:
+        _, datos, tiempo, _ = tiempos_ruta(*cargar_ruta(file_path))
+        # Reconstruir la trayectoria aplicando la rotación según el yaw acumulado
+        x_coords, y_coords, z_coords = reconstruct_trajectory(datos)
+        indices = np.arange(len(x_coords))
+        max_quality = np.nanmax(datos[:, 2])
+        min_quality = np.nanmin(datos[:, 2])
 
+    if mensajes and not medido:
+        print(f"El archivo no tiene columna t; se supone una muestra cada {1.0 / frecuencia_supuesta(cabecera):g} s.")
 
-    # Crear la figura y el eje 3D
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection='3d')
+    return datos, indices, x_coords, y_coords, z_coords, min_quality, max_quality, tiempo
+
+def preparar_ejes_trayectoria(ax):
+    """Etiquetas y título del eje 3D de la trayectoria."""
+    ax.set_xlabel('opt_m_x (m)')
+    ax.set_ylabel('opt_m_y (m)')
+    ax.set_zlabel('alt (m)')
+    ax.set_title('Trayectoria del dron en 3D')
+
+def dibujar_trayectoria(ax, datos, indices, x_coords, y_coords, z_coords, min_quality, max_quality,
+                        modo_flechas=MODO_LOTE, lod=True, max_puntos=MAX_PUNTOS_LOD):
+    """
+    Dibuja en un eje 3D los puntos de la trayectoria, las etiquetas de inicio y final y las flechas de dirección,
+    y ajusta los límites para que todos los ejes tengan el mismo rango.
+    Returns:
+        artistas: Lista de objetos con remove() para poder quitar la trayectoria y reutilizar el eje.
+    """
+    #Si hay columna de objetivo_alcanzado, guardar los datos
+    obj_flags = datos[:, 6] if datos.shape[1] == 7 else None
+
+    # Elegir color: rojo para el punto de inicio, verde si el objetivo se alcanzó, si no usar coolwarm
+    colors = np.vstack((mcolors.to_rgba('red'), colores_puntos(datos[:, 2], obj_flags, min_quality, max_quality)))
 
     # Plotear las coordenadas con colores
-    ax.scatter(x_coords, y_coords, z_coords, c=colors, marker='o')
+    if lod:
+        # Se conservan siempre el inicio, el final, los objetivos alcanzados y las calidades atípicas
+        puntos = PuntosLOD(ax, (x_coords, y_coords, z_coords), colors, forzados_trayectoria(datos), max_puntos,
+                           marker='o')
+        puntos.dibujar()
+        artistas = [puntos]
+        visibles = puntos.indices
+    else:
+        artistas = [ax.scatter(x_coords, y_coords, z_coords, c=colors, marker='o')]
+        visibles = slice(None)
 
-    # Etiquetar los puntos con su índice
-    for i in range(len(x_coords)):
-        if i == 0 or i == len(x_coords)-1:
-            ax.text(x_coords[i], y_coords[i], z_coords[i], str(i), fontsize=12, ha='center', va='bottom')
+    # Etiquetar el punto de inicio y el final con su índice
+    for i in (0, len(x_coords) - 1):
+        artistas.append(ax.text(x_coords[i], y_coords[i], z_coords[i], str(indices[i]), fontsize=12,
+                                ha='center', va='bottom'))
 
-    # Añadir flechas para mostrar la dirección del recorrido
-    for i in range(len(x_coords) - 1):
-        ax.quiver(x_coords[i], y_coords[i], z_coords[i], 
-                  x_coords[i + 1] - x_coords[i], y_coords[i + 1] - y_coords[i], z_coords[i + 1] - z_coords[i], 
-                  arrow_length_ratio=0.1)
+    # Añadir flechas para mostrar la dirección del recorrido (sobre los puntos dibujados)
+    artistas.extend(dibujar_flechas(ax, x_coords[visibles], y_coords[visibles], z_coords[visibles],
+                                    modo=modo_flechas))
 
     # Calcular el rango máximo entre x, y y z
-    x_range = max(x_coords) - min(x_coords)
-    y_range = max(y_coords) - min(y_coords)
-    z_range = max(z_coords) - min(z_coords)
-    max_range = max(x_range, y_range, z_range)
+    max_range = np.nanmax(np.ptp(np.vstack((x_coords, y_coords, z_coords)), axis=1))
 
     # Redondear hacia arriba al siguiente entero
     max_range_ceiled = math.ceil(max_range)
@@ -147,23 +179,70 @@ def main(file_name):
     ax.set_ylim([-max_range_ceiled, max_range_ceiled])
     ax.set_zlim([-max_range_ceiled, max_range_ceiled])
 
-    # Etiquetas y título
-    ax.set_xlabel('opt_m_x (m)')
-    ax.set_ylabel('opt_m_y (m)')
-    ax.set_zlabel('alt (m)')
-    plt.title('Trayectoria del dron en 3D')
+    return artistas
+
+def preparar_ejes_bateria(ax2):
+    """Etiquetas y título del eje de la gráfica de voltaje frente al tiempo."""
+    ax2.set_xlabel('Tiempo (s)')
+    ax2.set_ylabel('Voltaje (mV)')
+    ax2.set_title('Voltaje vs Tiempo')
+
+def dibujar_bateria(ax2, datos, tiempo, lod=True, max_puntos=MAX_PUNTOS_LOD):
+    """
+    Dibuja el voltaje de la batería (columna battery_V) frente al tiempo.
+    Args:
+        tiempo: Tiempo (s) de cada fila de datos (ver cargar_trayectoria).
+    Returns:
+        artistas: Lista de artistas creados, para poder quitarlos y reutilizar el eje.
+    """
+    battery = datos[:, 5]
+    if lod:
+        seleccion = indices_lod([battery], max_puntos)
+        battery, tiempo = battery[seleccion], tiempo[seleccion]
+    artistas = ax2.plot(tiempo, battery, marker='o', color='green')
+
+    # Ajustar los límites a los datos actuales (el eje puede haberse usado antes para otra ruta)
+    ax2.relim()
+    ax2.autoscale_view()
+    return artistas
+
+def main(file_name, modo_flechas=MODO_LOTE, lod=True, max_puntos=MAX_PUNTOS_LOD):
+    """
+    Función principal que grafica la trayectoria del dron en 3D a partir de un archivo de datos.
+    Args:
+        file_name: Nombre del archivo que contiene los datos de la trayectoria del dron.
+        modo_flechas: Modo de dibujo de las flechas de dirección (ver dibujo.MODOS_FLECHAS).
+        lod: Si es True y hay más de max_puntos muestras, se dibuja una versión diezmada que conserva la forma
+            de la trayectoria (ver lod.py) y se vuelve a diezmar al hacer zoom.
+        max_puntos: Número máximo aproximado de puntos dibujados en modo LOD.
+    """
+    
+    # Obtener la ruta del directorio actual del script 
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Ruta completa al archivo 
+    file_path = os.path.join(current_dir, "..\\Rutas", file_name) 
+
+    # Leer el archivo, comprobar columnas y reconstruir la trayectoria
+    try:
+        datos, indices, x_coords, y_coords, z_coords, min_quality, max_quality, tiempo = cargar_trayectoria(file_path)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+
+    # Crear la figura y el eje 3D
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    preparar_ejes_trayectoria(ax)
+    dibujar_trayectoria(ax, datos, indices, x_coords, y_coords, z_coords, min_quality, max_quality,
+                        modo_flechas, lod, max_puntos)
 
     # Si existe columna de batería
     # Nueva gráfica: Voltaje vs Tiempo
     if datos.shape[1] > 5: 
         fig2, ax2 = plt.subplots()
-         
-        battery = datos[:, 5]
-        tiempo = np.arange(len(battery))
-        ax2.plot(tiempo, battery, marker='o', color='green')
-        ax2.set_xlabel('Tiempo (s)')
-        ax2.set_ylabel('Voltaje (mV)')
-        ax2.set_title('Voltaje vs Tiempo')
+        preparar_ejes_bateria(ax2)
+        dibujar_bateria(ax2, datos, tiempo, lod, max_puntos)
     else:
         print("No se encontró columna de batería en los datos.")
 
@@ -0,0 +1,265 @@
+"""
+Lector común de los archivos de ruta.
+Detecta qué variante de columnas tiene el archivo a partir de la cabecera, convierte la columna
+objetivo_alcanzado (True/False) a booleano y devuelve un array estructurado de NumPy con un campo por columna.
+
+Variantes conocidas (ESQUEMAS):
+    flujo        opt_m_x, opt_m_y, opt_qua                                (3 columnas)
+    altura       opt_m_x, opt_m_y, opt_qua, yaw, alt                      (5 columnas)
+    sonar        opt_m_x, opt_m_y, opt_qua, yaw, sonarrange               (5 columnas, comparar_sensores altura.py)
+    bateria      opt_m_x, opt_m_y, opt_qua, yaw, alt, battery_V           (6 columnas, ruta.py)
+    completo     opt_m_x, opt_m_y, opt_qua, yaw, alt, battery_V, objetivo_alcanzado  (7 columnas, move_drone)
+    distancia    opt_m_x, opt_m_y, opt_qua, yaw, alt, dist, battery       (7 columnas, vuelos de junio de 2025)
+    altura_mala  opt_m_x, opt_m_y, opt_qua, yaw, alt, altura mala         (6 columnas, vuelos de junio de 2025)
+Los scripts de registro añaden al final la columna t (COLUMNA_TIEMPO), el tiempo monótono (s) de cada muestra desde
+el inicio del registro; con ella la variante se llama igual con el sufijo '_t' (por ejemplo 'bateria_t'). Los
+módulos que acceden a las columnas por posición la quitan con separar_tiempo(); los archivos antiguos sin tiempo se
+tratan con una frecuencia supuesta (remuestreo.py).
+Cualquier otra cabecera se lee igualmente con la variante 'desconocido'.
+
+El texto se convierte con np.loadtxt, que procesa las líneas en C, en lugar de np.genfromtxt, que lo hace en Python
+(unas 2-2.5 veces más rápido). Si alguna línea no tiene el número de campos esperado o algún valor no es un número,
+se vuelve a leer línea a línea y los valores no válidos quedan como NaN, igual que con genfromtxt.
+La conversión de texto a float es la mayor parte del tiempo que queda. Para las lecturas repetidas de los mismos
+archivos se puede activar (USAR_CACHE, o la variable de entorno RUTAS_CACHE con la carpeta) una copia binaria
+(.rutb) de cada archivo leído en la caché del usuario (CARPETA_CACHE), fuera de Rutas: mientras el archivo no
+cambie, las lecturas siguientes solo leen esa copia, más de 5 veces más rápido que genfromtxt. La primera lectura
+de cada archivo sigue pasando por el texto. La copia se escribe en un archivo temporal y se renombra al terminar,
+y una copia cuyo tamaño no corresponde a un número entero de filas se descarta y se vuelve a crear.
+"""
+import os
+import hashlib
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from formato_binario import (es_binario, leer_binario, leer_cabecera, leer_cabecera_ruta, guardar_binario,
+                             EXTENSION_BINARIA, COLUMNAS_BOOLEANAS, _valor_texto)
+
+# Variantes de columnas conocidas, en el orden en que se escriben
+ESQUEMAS = {
+    "flujo": ("opt_m_x", "opt_m_y", "opt_qua"),
+    "altura": ("opt_m_x", "opt_m_y", "opt_qua", "yaw", "alt"),
+    "sonar": ("opt_m_x", "opt_m_y", "opt_qua", "yaw", "sonarrange"),
+    "bateria": ("opt_m_x", "opt_m_y", "opt_qua", "yaw", "alt", "battery_V"),
+    "completo": ("opt_m_x", "opt_m_y", "opt_qua", "yaw", "alt", "battery_V", "objetivo_alcanzado"),
+    "distancia": ("opt_m_x", "opt_m_y", "opt_qua", "yaw", "alt", "dist", "battery"),
+    "altura_mala": ("opt_m_x", "opt_m_y", "opt_qua", "yaw", "alt", "altura mala"),
+}
+ESQUEMA_DESCONOCIDO = "desconocido"
+
+# Columna con el tiempo (s) de cada muestra desde el inicio del registro, y sufijo de las variantes que la tienen
+COLUMNA_TIEMPO = "t"
+SUFIJO_TIEMPO = "_t"
+
+# Carpeta de caché del usuario (%LOCALAPPDATA% en Windows, $XDG_CACHE_HOME o ~/.cache en el resto) y si se usa
+# por defecto; la caché está desactivada salvo que la variable de entorno RUTAS_CACHE indique una carpeta
+_CACHE_USUARIO = (os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+                  or os.path.join(os.path.expanduser("~"), ".cache"))
+CARPETA_CACHE = os.environ.get("RUTAS_CACHE") or os.path.join(_CACHE_USUARIO, "tfg_rutas")
+USAR_CACHE = bool(os.environ.get("RUTAS_CACHE"))
+
+Esquema = namedtuple("Esquema", ["nombre", "columnas", "dtype"])
+
+
+def _nombre_campo(columna, i, usados):
+    """Nombre válido y único para el campo de una columna (los espacios se sustituyen por '_')."""
+    nombre = "_".join(columna.split()) or f"columna_{i}"
+    base, n = nombre, 1
+    while nombre in usados:
+        n += 1
+        nombre = f"{base}_{n}"
+    usados.add(nombre)
+    return nombre
+
+
+def detectar_esquema(cabecera):
+    """
+    Identifica la variante de columnas de una cabecera.
+    Args:
+        cabecera: Lista con los nombres de las columnas.
+    Returns:
+        Esquema con el nombre de la variante, los nombres de los campos y el dtype estructurado.
+    """
+    return _detectar_esquema(tuple(col.strip() for col in cabecera))
+
+
+@lru_cache(maxsize=None)
+def _detectar_esquema(columnas):
+    """detectar_esquema sobre una cabecera ya limpia; se guarda el resultado porque hay pocas cabeceras distintas."""
+    con_tiempo = len(columnas) > 1 and columnas[-1] == COLUMNA_TIEMPO
+    base = columnas[:-1] if con_tiempo else columnas
+    nombre = ESQUEMA_DESCONOCIDO
+    for variante, esperadas in ESQUEMAS.items():
+        if base == esperadas:
+            nombre = variante + SUFIJO_TIEMPO if con_tiempo else variante
+            break
+
+    usados = set()
+    campos = [_nombre_campo(col, i, usados) for i, col in enumerate(columnas)]
+    dtype = np.dtype([(campo, "?" if col in COLUMNAS_BOOLEANAS else "<f8") for campo, col in zip(campos, columnas)])
+    return Esquema(nombre, campos, dtype)
+
+
+def separar_tiempo(cabecera, datos):
+    """
+    Quita la columna de tiempo de la cabecera y de la matriz, de forma que el resto de columnas quedan en las
+    posiciones de siempre (objetivo_alcanzado en la 6).
+    Args:
+        cabecera: Lista con los nombres de las columnas.
+        datos: Matriz NxM con los datos.
+    Returns:
+        cabecera, datos: Sin la columna de tiempo.
+        t: Array con el tiempo de cada fila, o None si el archivo no tiene la columna.
+    """
+    cabecera = [col.strip() for col in cabecera]
+    if COLUMNA_TIEMPO not in cabecera:
+        return cabecera, datos, None
+    i = cabecera.index(COLUMNA_TIEMPO)
+    return cabecera[:i] + cabecera[i + 1:], np.delete(datos, i, axis=1), datos[:, i]
+
+
+def _parsear_lineas(lineas, n_columnas):
+    """Lectura línea a línea: los campos que faltan o no son números quedan como NaN."""
+    datos = np.full((len(lineas), n_columnas), np.nan)
+    for i, linea in enumerate(lineas):
+        valores = [_valor_texto(v) for v in linea.split(",")][:n_columnas]
+        datos[i, :len(valores)] = valores
+    return datos
+
+
+def parsear_texto(texto, n_columnas):
+    """
+    Convierte las líneas de datos de un archivo de ruta (sin la cabecera) en una matriz NxM de float.
+    True/False se convierten en 1.0/0.0 y las líneas en blanco se ignoran.
+    """
+    if "True" in texto or "False" in texto:
+        texto = texto.replace("True", "1").replace("False", "0")
+    texto = texto.strip()
+    if not texto:
+        return np.empty((0, n_columnas))
+
+    # Camino rápido: np.loadtxt convierte el texto en C (desde NumPy 1.23) y falla si alguna línea no tiene
+    # n_columnas campos o algún campo no es un número
+    try:
+        return np.loadtxt(texto.splitlines(), delimiter=",", comments=None, ndmin=2, dtype=float)
+    except ValueError:
+        pass
+
+    lineas = [linea for linea in texto.splitlines() if linea.strip()]
+    return _parsear_lineas(lineas, n_columnas)
+
+
+def a_estructurado(datos, esquema):
+    """Convierte una matriz NxM de float en un array estructurado con el dtype del esquema."""
+    resultado = np.empty(len(datos), dtype=esquema.dtype)
+    for i, campo in enumerate(esquema.columnas):
+        if esquema.dtype[campo] == np.bool_:
+            resultado[campo] = datos[:, i] == 1
+        else:
+            resultado[campo] = datos[:, i]
+    return resultado
+
+
+def a_matriz(datos):
+    """Convierte un array estructurado de leer_ruta en una matriz NxM de float (booleanos como 1.0/0.0)."""
+    matriz = np.empty((len(datos), len(datos.dtype.names)))
+    for i, campo in enumerate(datos.dtype.names):
+        matriz[:, i] = datos[campo]
+    return matriz
+
+
+def _ruta_cache(file_path):
+    """Copia binaria de un archivo en CARPETA_CACHE, con el nombre del archivo y un hash de su ruta absoluta."""
+    return _nombre_cache(os.path.abspath(file_path))
+
+
+@lru_cache(maxsize=None)
+def _nombre_cache(ruta):
+    clave = hashlib.sha1(ruta.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    return os.path.join(CARPETA_CACHE, f"{nombre}_{clave}{EXTENSION_BINARIA}")
+
+
+def _leer_copia(copia):
+    """
+    Lee entera una copia de la caché. Como la matriz se copia después en el array estructurado, leerla de una vez es
+    más rápido que mapearla con leer_binario, sobre todo en los archivos pequeños.
+    Lanza ValueError si la copia está incompleta (los datos no son un número entero de filas).
+    """
+    with open(copia, "rb") as f:
+        cabecera, _, tam_cabecera = leer_cabecera(f)
+        f.seek(tam_cabecera)
+        datos = np.fromfile(f, dtype="<f8")
+    if len(datos) % len(cabecera):
+        raise ValueError(f"Copia de la caché incompleta: {copia}")
+    return cabecera, datos.reshape(-1, len(cabecera))
+
+
+def _leer_texto(file_path):
+    """Lee un archivo de texto y devuelve su cabecera y la matriz NxM de float."""
+    with open(file_path, "r") as f:
+        cabecera = [col.strip() for col in f.readline().strip().split(",")]
+        texto = f.read()
+    return cabecera, parsear_texto(texto, len(cabecera))
+
+
+def leer_matriz(file_path, cache=None):
+    """
+    Lee un archivo de ruta de texto o binario como matriz de float.
+    Args:
+        file_path: Ruta del archivo (.txt o .rutb).
+        cache: Si es True, se usa (y se actualiza) la copia binaria de CARPETA_CACHE; por defecto USAR_CACHE
+            (desactivada salvo que se defina RUTAS_CACHE).
+    Returns:
+        cabecera: Lista con los nombres de las columnas.
+        datos: Matriz NxM (2D aunque solo haya una fila); los booleanos como 1.0/0.0.
+    """
+    if cache is None:
+        cache = USAR_CACHE
+
+    if es_binario(file_path):
+        datos, cabecera, _ = leer_binario(file_path)
+        return cabecera, datos
+
+    if not cache:
+        return _leer_texto(file_path)
+
+    # La copia binaria es válida si es más reciente que el archivo de texto y está completa
+    copia = _ruta_cache(file_path)
+    try:
+        if os.stat(copia).st_mtime_ns >= os.stat(file_path).st_mtime_ns:
+            return _leer_copia(copia)
+    except (OSError, ValueError):
+        pass
+
+    cabecera, datos = _leer_texto(file_path)
+    try:
+        # guardar_binario escribe en un archivo temporal y lo renombra, así que otro proceso que lea la misma ruta
+        # nunca ve una copia a medias
+        os.makedirs(os.path.dirname(copia), exist_ok=True)
+        guardar_binario(copia, cabecera, datos)
+    except OSError:
+        pass
+    return cabecera, datos
+
+
+def leer_ruta(file_path, cache=None):
+    """
+    Lee un archivo de ruta de texto o binario detectando su variante de columnas.
+    Args:
+        file_path: Ruta del archivo (.txt o .rutb).
+        cache: Si es True, se usa la copia binaria de CARPETA_CACHE; por defecto USAR_CACHE.
+    Returns:
+        esquema: Esquema detectado (nombre de la variante, campos y dtype).
+        datos: Array estructurado con un campo por columna (objetivo_alcanzado como bool).
+    """
+    cabecera, matriz = leer_matriz(file_path, cache)
+    esquema = detectar_esquema(cabecera)
+    return esquema, a_estructurado(matriz, esquema)
+
+
+def leer_esquema(file_path):
+    """Detecta la variante de columnas de un archivo leyendo solo su cabecera."""
+    return detectar_esquema(leer_cabecera_ruta(file_path))
@@ -0,0 +1,177 @@
+"""
+Nivel de detalle (LOD) para dibujar trayectorias con muchas muestras.
+La trayectoria se divide en tramos consecutivos y de cada tramo se conservan los puntos con el mínimo y el máximo
+de cada coordenada (min/max bucketing), de forma que se mantiene la forma del recorrido con un número acotado de
+puntos. Además se conservan siempre los puntos forzados: inicio, final, objetivo_alcanzado y calidades atípicas.
+PuntosLOD vuelve a diezmar los puntos visibles cada vez que cambian los límites de los ejes (zoom o desplazamiento),
+así que al acercarse aparece el detalle completo de la zona.
+"""
+import numpy as np
+
+# Número máximo aproximado de puntos que se dibujan
+MAX_PUNTOS_LOD = 5000
+
+# Umbral de la puntuación robusta (desviación respecto a la mediana en MADs) para considerar atípica una calidad
+UMBRAL_ATIPICOS = 3.5
+
+
+def atipicos_calidad(calidad, umbral=UMBRAL_ATIPICOS):
+    """
+    Marca las calidades atípicas con la puntuación z robusta (mediana y desviación absoluta mediana).
+    Args:
+        calidad: Array con opt_qua de cada punto.
+        umbral: Número de MADs (escalados a desviación típica) a partir del cual un punto es atípico.
+    Returns:
+        Array booleano con True en los puntos atípicos.
+    """
+    calidad = np.asarray(calidad, dtype=float)
+    if len(calidad) == 0:
+        return np.zeros(0, dtype=bool)
+    mediana = np.nanmedian(calidad)
+    mad = 1.4826 * np.nanmedian(np.abs(calidad - mediana))
+    if not mad > 0:
+        return np.zeros(len(calidad), dtype=bool)
+    return np.abs(calidad - mediana) > umbral * mad
+
+
+def indices_lod(coords, max_puntos=MAX_PUNTOS_LOD, forzados=None):
+    """
+    Elige los puntos que se dibujan con min/max bucketing.
+    Args:
+        coords: Lista de arrays de coordenadas (x, y[, z]) de la misma longitud.
+        max_puntos: Número máximo aproximado de puntos (sin contar los forzados).
+        forzados: Array booleano con los puntos que se conservan siempre, o None.
+    Returns:
+        Array ordenado con los índices de los puntos que se conservan.
+    """
+    n = len(coords[0])
+    if n <= max_puntos:
+        return np.arange(n)
+
+    conservar = np.zeros(n, dtype=bool)
+    conservar[0] = conservar[-1] = True
+    if forzados is not None:
+        conservar |= forzados
+
+    # Cada tramo aporta el mínimo y el máximo de cada coordenada
+    tramos = max(1, max_puntos // (2 * len(coords)))
+    tam = -(-n // tramos)
+    relleno = tramos * tam - n
+    base = np.arange(tramos) * tam
+
+    for c in coords:
+        c = np.asarray(c, dtype=float)
+        # Los NaN y el relleno del último tramo no se eligen nunca como extremo
+        bajo = np.concatenate((np.where(np.isnan(c), np.inf, c), np.full(relleno, np.inf))).reshape(tramos, tam)
+        alto = np.concatenate((np.where(np.isnan(c), -np.inf, c), np.full(relleno, -np.inf))).reshape(tramos, tam)
+        conservar[np.minimum(base + bajo.argmin(axis=1), n - 1)] = True
+        conservar[np.minimum(base + alto.argmax(axis=1), n - 1)] = True
+
+    return np.flatnonzero(conservar)
+
+
+class PuntosLOD:
+    """
+    Scatter de una trayectoria con nivel de detalle: dibuja como mucho max_puntos (más los forzados) y los vuelve a
+    elegir entre los puntos visibles cuando cambian los límites de los ejes.
+    """
+
+    def __init__(self, ax, coords, colores, forzados=None, max_puntos=MAX_PUNTOS_LOD, **kwargs_scatter):
+        """
+        Args:
+            ax: Eje 2D o 3D de matplotlib.
+            coords: Lista de arrays (x, y) o (x, y, z) con todos los puntos.
+            colores: Matriz Nx4 con el color RGBA de cada punto (calculada una vez para todos los puntos).
+            forzados: Array booleano con los puntos que se dibujan siempre, o None.
+            max_puntos: Número máximo aproximado de puntos dibujados.
+            kwargs_scatter: Argumentos adicionales para ax.scatter (marker, s...).
+        """
+        self.ax = ax
+        self.coords = [np.asarray(c, dtype=float) for c in coords]
+        self.colores = np.asarray(colores)
+        self.forzados = forzados
+        self.max_puntos = max_puntos
+        self.kwargs_scatter = kwargs_scatter
+        self.es_3d = len(self.coords) == 3
+        self.indices = indices_lod(self.coords, max_puntos, forzados)
+        self.scatter = None
+        self._limites = None
+        self._conexiones = []
+
+    def dibujar(self):
+        """Dibuja los puntos elegidos y activa el rediezmado al cambiar los límites. Devuelve el scatter."""
+        self._dibujar_scatter()
+        if len(self.coords[0]) > self.max_puntos:
+            ejes = ('xlim_changed', 'ylim_changed', 'zlim_changed') if self.es_3d else ('xlim_changed', 'ylim_changed')
+            self._conexiones = [self.ax.callbacks.connect(evento, self._al_cambiar_limites) for evento in ejes]
+        return self.scatter
+
+    def remove(self):
+        """Quita el scatter del eje y deja de seguir sus cambios de límites (para reutilizar el eje)."""
+        for conexion in self._conexiones:
+            self.ax.callbacks.disconnect(conexion)
+        self._conexiones = []
+        if self.scatter is not None:
+            self.scatter.remove()
+            self.scatter = None
+
+    def _dibujar_scatter(self):
+        seleccion = [c[self.indices] for c in self.coords]
+        colores = self.colores[self.indices]
+        if self.scatter is None:
+            self.scatter = self.ax.scatter(*seleccion, c=colores, **self.kwargs_scatter)
+        elif self.es_3d:
+            # En 3D se vuelve a crear el scatter (Path3DCollection no permite cambiar los puntos de forma pública)
+            # sin reajustar los límites, que son los que ha elegido el usuario
+            self.scatter.remove()
+            autoescala = self.ax.get_autoscale_on()
+            self.ax.set_autoscale_on(False)
+            self.scatter = self.ax.scatter(*seleccion, c=colores, **self.kwargs_scatter)
+            self.ax.set_autoscale_on(autoescala)
+        else:
+            self.scatter.set_offsets(np.column_stack(seleccion))
+            self.scatter.set_facecolors(colores)
+
+    def _visibles(self):
+        """Array booleano con los puntos dentro de los límites actuales de los ejes."""
+        limites = [self.ax.get_xlim(), self.ax.get_ylim()]
+        if self.es_3d:
+            limites.append(self.ax.get_zlim())
+        visibles = np.ones(len(self.coords[0]), dtype=bool)
+        for c, (bajo, alto) in zip(self.coords, limites):
+            visibles &= (c >= min(bajo, alto)) & (c <= max(bajo, alto))
+        return visibles, limites
+
+    def _al_cambiar_limites(self, ax):
+        visibles, limites = self._visibles()
+        # Un zoom cambia varios ejes a la vez: solo se recalcula una vez por cada conjunto de límites
+        if limites == self._limites:
+            return
+        self._limites = limites
+
+        candidatos = np.flatnonzero(visibles)
+        if len(candidatos) == 0:
+            return
+        forzados = None if self.forzados is None else self.forzados[candidatos]
+        elegidos = indices_lod([c[candidatos] for c in self.coords], self.max_puntos, forzados)
+        self.indices = candidatos[elegidos]
+        self._dibujar_scatter()
+        self.ax.figure.canvas.draw_idle()
+
+
+def forzados_trayectoria(datos, columna_objetivo=6):
+    """
+    Puntos de una trayectoria (con el punto de inicio en la posición 0) que se dibujan siempre:
+    inicio, final, objetivo_alcanzado y calidades atípicas.
+    Args:
+        datos: Matriz NxM con las filas de la ruta (sin el punto de inicio).
+        columna_objetivo: Índice de la columna objetivo_alcanzado.
+    Returns:
+        Array booleano de N+1 elementos.
+    """
+    forzados = np.zeros(len(datos) + 1, dtype=bool)
+    forzados[0] = forzados[-1] = True
+    forzados[1:] |= atipicos_calidad(datos[:, 2])
+    if datos.shape[1] > columna_objetivo:
+        forzados[1:] |= datos[:, columna_objetivo] == 1
+    return forzados
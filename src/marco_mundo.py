@@ -0,0 +1,130 @@
+"""
+Objetivos de ruta en ejes del mundo para move_drone.
+Las filas de una ruta son desplazamientos del flujo óptico en ejes del cuerpo. Con un cambio de yaw, repetir cada
+desplazamiento en ejes del cuerpo lleva al dron en otra dirección; en su lugar, las filas se convierten en puntos
+de paso en ejes del mundo con la misma reconstrucción que grafica.py (yaw desenrollado como np.unwrap, rotación
+de cada desplazamiento e inversión de signo en X), y en cada ciclo el error respecto al punto de paso se vuelve a
+pasar a ejes del cuerpo con el yaw actual.
+Para volar lo mismo que con objetivos en ejes del cuerpo:
+    - Una fila cuyo desplazamiento es menor que la tolerancia se da por alcanzada sin moverse; waypoints_mundo
+      puede omitir esas filas (argumento tolerance). Si no, se acumulan en los puntos de paso y el dron acaba
+      recorriendo muchos tramos que en ejes del cuerpo no vuela.
+    - Un segmento que agota su tiempo no arrastra su error a los siguientes, que parten de donde esté el dron;
+      PosicionMundo.reanclar desplaza los puntos de paso siguientes en lo que faltó. Si no, todos los puntos de paso
+      posteriores quedan igual de lejos y agotan también su tiempo (por ejemplo, si el dron no se puede mover).
+Solo usa la librería estándar para poder ejecutarse dentro de Mission Planner.
+"""
+import math
+
+MARCO_CUERPO = "cuerpo"
+MARCO_MUNDO = "mundo"
+MARCOS = (MARCO_CUERPO, MARCO_MUNDO)
+
+
+class YawDesenrollado:
+    """
+    Desenrolla el yaw lectura a lectura igual que np.unwrap sobre todo el registro
+    (como trayectoria.ReconstructorIncremental).
+    """
+
+    def __init__(self):
+        self.previo = None
+        self.correccion = 0.0
+
+    def actualizar(self, yaw_grados):
+        """Devuelve el yaw acumulado (radianes) de una lectura nueva."""
+        raw = math.radians(yaw_grados)
+        if self.previo is not None:
+            salto = raw - self.previo
+            salto_mod = (salto + math.pi) % (2 * math.pi) - math.pi
+            if salto_mod == -math.pi and salto > 0:
+                salto_mod = math.pi
+            if abs(salto) >= math.pi:
+                self.correccion += salto_mod - salto
+        self.previo = raw
+        return raw + self.correccion
+
+
+def cuerpo_a_mundo(dx, dy, yaw_rad):
+    """Desplazamiento en ejes del cuerpo a ejes del mundo (criterio de grafica.py: X invertida y rotada)."""
+    x = -dx
+    cos_yaw, sin_yaw = math.cos(yaw_rad), math.sin(yaw_rad)
+    return x * cos_yaw - dy * sin_yaw, x * sin_yaw + dy * cos_yaw
+
+
+def mundo_a_cuerpo(ex, ey, yaw_rad):
+    """Inversa de cuerpo_a_mundo: vector en ejes del mundo a ejes del cuerpo."""
+    cos_yaw, sin_yaw = math.cos(yaw_rad), math.sin(yaw_rad)
+    return -(ex * cos_yaw + ey * sin_yaw), -ex * sin_yaw + ey * cos_yaw
+
+
+def waypoints_mundo(route_data, tolerance=None):
+    """
+    Convierte las filas de una ruta en puntos de paso en ejes del mundo.
+    Args:
+        route_data: Filas de read_variations (opt_m_x, opt_m_y, opt_qua, yaw, ...).
+        tolerance: Tolerancia de posición de move_drone. Si se indica, las filas con un desplazamiento menor que ella
+            en X y en Y no mueven el punto de paso, igual que con objetivos en ejes del cuerpo.
+    Returns:
+        Lista de (x, y) con la posición acumulada tras cada fila; sin tolerance, la misma que
+        trayectoria.reconstruct_trajectory sin el punto de inicio.
+    """
+    yaw = YawDesenrollado()
+    x = y = 0.0
+    puntos = []
+    for fila in route_data:
+        yaw_rad = yaw.actualizar(fila[3])
+        if tolerance is None or abs(fila[0]) >= tolerance or abs(fila[1]) >= tolerance:
+            dx, dy = cuerpo_a_mundo(fila[0], fila[1], yaw_rad)
+            x += dx
+            y += dy
+        puntos.append((x, y))
+    return puntos
+
+
+class PosicionMundo:
+    """
+    Posición del dron en ejes del mundo a partir del flujo óptico acumulado y del yaw de cada lectura.
+    Se comparte entre todos los segmentos de una ruta para que los puntos de paso sean absolutos.
+    """
+
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.yaw = YawDesenrollado()
+        self.yaw_rad = 0.0
+        self._flujo_x = None
+        self._flujo_y = None
+        # Desplazamiento de los puntos de paso acumulado por reanclar()
+        self.desfase_x = 0.0
+        self.desfase_y = 0.0
+
+    def actualizar(self, snapshot, estimador=None):
+        """
+        Suma el desplazamiento del flujo desde la lectura anterior (opt_m_x y opt_m_y acumulados).
+        Con un estimador.EstimadorPosicion ya actualizado con la misma lectura, la posición es la suya (filtrada
+        según la calidad del flujo), que está en los mismos ejes del mundo.
+        """
+        self.yaw_rad = self.yaw.actualizar(snapshot.yaw)
+        if estimador is not None:
+            self.x, self.y = estimador.x, estimador.y
+        elif self._flujo_x is not None:
+            dx, dy = cuerpo_a_mundo(snapshot.opt_m_x - self._flujo_x, snapshot.opt_m_y - self._flujo_y, self.yaw_rad)
+            self.x += dx
+            self.y += dy
+        self._flujo_x = snapshot.opt_m_x
+        self._flujo_y = snapshot.opt_m_y
+        return self
+
+    def error_cuerpo(self, objetivo_x, objetivo_y):
+        """Error respecto a un punto de paso, en ejes del cuerpo con el yaw de la última lectura."""
+        return mundo_a_cuerpo(objetivo_x + self.desfase_x - self.x, objetivo_y + self.desfase_y - self.y,
+                              self.yaw_rad)
+
+    def reanclar(self, objetivo_x, objetivo_y):
+        """
+        Da por alcanzado un punto de paso que no se ha alcanzado: los siguientes se desplazan lo que faltaba para
+        llegar a él, de modo que se recorren desde la posición actual. La posición (x, y) no cambia.
+        """
+        self.desfase_x = self.x - objetivo_x
+        self.desfase_y = self.y - objetivo_y
@@ -5,13 +5,68 @@ Se almacena la ruta realizada para comprobar que la ruta se ha seguido correctam
 
 import time
 import os
+import sys
 from datetime import datetime
 
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from telemetria import TelemetrySink, TelemetryReader, tiempo_registro, CAMPOS_RUTA
+from planificador import FixedRateScheduler
+import perfilado
+from salida_rc import RCOutput
+from controlador import ControladorVuelo
+from marco_mundo import MARCO_CUERPO, MARCO_MUNDO, MARCOS, PosicionMundo, waypoints_mundo
+from estimador import EstimadorPosicion
+from compilador_rutas import cargar_plan, plan_vigente, ruta_plan
+
+# Parámetros de move_drone usados al recorrer una ruta completa
+PARAMETROS_RUTA = dict(tolerance=0.3, yaw_tolerance=100, alt_tolerance=0.2, max_duration=30000)
+
+# Frecuencia del bucle de control (Hz)
+FRECUENCIA_CONTROL = 10
+
+# Marco de los objetivos en main(): MARCO_CUERPO repite el desplazamiento de cada fila en ejes del cuerpo;
+# MARCO_MUNDO convierte la ruta en puntos de paso en ejes del mundo (ver marco_mundo.py)
+MARCO_OBJETIVOS = MARCO_CUERPO
+
+# Si es True, main() sigue la posición y la altura con estimador.EstimadorPosicion (flujo ponderado por su calidad,
+# ToF y barómetro) en lugar de las lecturas sin filtrar de opt_m_x, opt_m_y y sonarrange; solo en el bucle de
+# move_drone (no con RUNTIME_ASYNC)
+ESTIMAR_POSICION = False
+
+# Si es True y la ruta tiene un plan compilado al día (compilador_rutas.py), main() recorre el plan en lugar de
+# las filas de la ruta; los puntos del plan están en ejes del mundo. Desactivado por defecto: en el simulador el
+# plan acorta mucho el vuelo, pero cada segmento se alcanza menos veces y con más error (prueba_compilador.py)
+USAR_PLAN = False
+
+# Si es True, main() recorre la ruta con runtime_async.py (telemetría, control, salida RC y registro en tareas de
+# asyncio independientes); si es False, con el bucle de move_drone
+RUNTIME_ASYNC = False
+
+# Si es True, main() perfila el bucle de control y guarda el resumen junto al log de la ruta recreada, con la
+# extensión EXTENSION_PERFIL para que listar_rutas no lo tome por una ruta
+PERFILAR = False
+EXTENSION_PERFIL = ".perfil"
+
+# Cabecera del log de la ruta recreada; t es el tiempo (s) de cada muestra desde la primera lectura de la ruta
+CABECERA_LOG = "opt_m_x, opt_m_y, opt_qua, yaw, alt, battery_V, objetivo_alcanzado, t"
+
+
+def _parse_value(text):
+    """Convierte un valor del archivo de ruta a float; la columna objetivo_alcanzado se escribe como True/False."""
+    text = text.strip()
+    if text == "True":
+        return 1.0
+    if text == "False":
+        return 0.0
+    return float(text)
+
+
 def read_variations(file_path):
     """
     Lee cada línea completa del archivo y la almacena como una lista de valores.
     Se espera que el fichero tenga encabezado y columnas:
-    opt_m_x, opt_m_y, opt_qua, yaw, alt, battery_V
+    opt_m_x, opt_m_y, opt_qua, yaw, alt, battery_V[, objetivo_alcanzado][, t]
     """
     variations = []
     with open(file_path, 'r') as file:
@@ -20,28 +75,80 @@ def read_variations(file_path):
         next(file)  
         
         for line in file:
+            if not line.strip():
+                continue  # Saltar líneas vacías
         
-            values = list(map(float, line.strip().split(',')))
+            values = [_parse_value(v) for v in line.strip().split(',')]
             variations.append(values)
     
     return variations
 
 
+def calcular_errores(snap, target_x, target_y, target_yaw, target_alt, init_flow_x, init_flow_y,
+                     marco=MARCO_CUERPO, posicion=None, estimador=None):
+    """
+    Errores de un ciclo de control respecto al objetivo del segmento.
+    Args:
+        snap: TelemetrySnapshot del ciclo.
+        init_flow_x, init_flow_y: Flujo óptico acumulado al empezar el segmento (solo con MARCO_CUERPO; con
+            estimador, su posición en ejes del cuerpo al empezar el segmento).
+        posicion: PosicionMundo de la ruta (solo con MARCO_MUNDO); se actualiza con la lectura.
+        estimador: EstimadorPosicion que se actualiza con la lectura; si se indica, la posición y la altura son
+            las suyas en lugar de opt_m_x, opt_m_y y sonarrange.
+    Returns:
+        (error_x, error_y, error_yaw, error_alt): Errores de posición en ejes del cuerpo, de yaw normalizado a
+        [-180, 180] y de altura (positivo para subir).
+    """
+    if estimador is not None:
+        estimador.update(snap)
+
+    if marco == MARCO_MUNDO:
+        # Error respecto al punto de paso, pasado a ejes del cuerpo con el yaw actual
+        posicion.actualizar(snap, estimador)
+        error_x, error_y = posicion.error_cuerpo(target_x, target_y)
+    else:
+        # Calcular la variación acumulada (desplazamientos relativos)
+        if estimador is not None:
+            current_dx = estimador.cuerpo_x - init_flow_x
+            current_dy = estimador.cuerpo_y - init_flow_y
+        else:
+            current_dx = snap.opt_m_x - init_flow_x
+            current_dy = snap.opt_m_y - init_flow_y
+
+        error_x = target_x - current_dx
+        error_y = target_y - current_dy
+
+    #Control de Altitud
+    # Altitud actual (sensor ToF, o la estimada); positivo para subir y negativo para bajar
+    error_alt = target_alt - (estimador.z if estimador is not None else snap.sonarrange)
+
+    #Control de YAW
+    error_yaw = target_yaw - snap.yaw  # Se asume que cs.yaw entrega el valor actual en grados
+    # Normalizar error_yaw al intervalo [-180, 180]
+    if error_yaw > 180:
+        error_yaw -= 360
+    elif error_yaw < -180:
+        error_yaw += 360
+    return error_x, error_y, error_yaw, error_alt
+
+
 def move_drone(target_x, target_y, target_qua, target_yaw, target_alt,
-               tolerance=0.5, yaw_tolerance=2, alt_tolerance=0.1, max_duration=20000, log_file=None):
+               tolerance=0.5, yaw_tolerance=2, alt_tolerance=0.1, max_duration=20000, log_file=None,
+               scheduler=None, perf=None, rc=None, reader=None, marco=MARCO_CUERPO, posicion=None,
+               controlador=None, estimador=None):
     """
     Mueve el dron de forma controlada hasta alcanzar los valores objetivos.
     Al finalizar, se registran en el log los valores finales de los sensores junto
     con un booleano que indica si se alcanzó el punto objetivo (True) o no (False).
     
-    Durante el bucle de control se actualizan los comandos RC:
+    Durante el bucle de control se actualizan los comandos RC con un PID por eje (controlador.py):
         RC1 (roll) y RC2 (pitch) se usan para corregir posición en X e Y,
-        RC4 se usa para corregir el yaw.
+        RC3 se usa para corregir la altitud y RC4 para corregir el yaw.
     
     
     Args:
-        target_x: desplazamiento deseado en el eje X 
-        target_y: desplazamiento deseado en el eje Y 
+        target_x: desplazamiento deseado en el eje X (con marco=MARCO_MUNDO, coordenada X del punto de paso)
+        target_y: desplazamiento deseado en el eje Y (con marco=MARCO_MUNDO, coordenada Y del punto de paso)
         target_qua: calidad asociada
         target_yaw: orientación objetivo (en grados, de 0 a 360)
         target_alt: altitud objetivo
@@ -50,6 +157,22 @@ def move_drone(target_x, target_y, target_qua, target_yaw, target_alt,
         yaw_tolerance: error permitido en yaw (en grados)
         alt_tolerance: error permitido en altitud (en metros)
         max_duration: tiempo máximo (ms) para completar el movimiento del segmento
+        log_file: TelemetrySink donde se registran las muestras del segmento (opcional), con las columnas de
+                  CABECERA_LOG; t se mide desde la primera lectura de 'reader'
+        scheduler: FixedRateScheduler que marca el ritmo del bucle; si no se indica, se crea uno a FRECUENCIA_CONTROL.
+                   Pasar el mismo en todos los segmentos permite acumular sus estadísticas.
+        perf: perfilado.PerfiladorLazo donde se marcan las fases de cada iteración (opcional)
+        rc: RCOutput que agrupa los comandos RC de cada iteración en un solo mensaje; si no se indica, se crea uno.
+        reader: TelemetryReader que lee 'cs' una vez por iteración; si no se indica, se crea uno.
+        marco: MARCO_CUERPO (target_x/target_y son el desplazamiento del flujo desde el inicio del segmento) o
+               MARCO_MUNDO (son un punto de paso en ejes del mundo; el error se pasa a ejes del cuerpo en cada ciclo).
+        posicion: marco_mundo.PosicionMundo compartida por todos los segmentos de la ruta (solo con MARCO_MUNDO);
+                  si no se indica, el origen es la posición al empezar el segmento.
+        controlador: controlador.ControladorVuelo que calcula los comandos RC; se reinicia al empezar el segmento.
+                     Si no se indica, se crea uno con las ganancias de ganancias_pid.json.
+        estimador: estimador.EstimadorPosicion compartido por todos los segmentos de la ruta (opcional). Se actualiza
+                   con cada lectura y su posición y altura sustituyen a opt_m_x, opt_m_y y sonarrange en el control;
+                   con MARCO_MUNDO, también a la posición de 'posicion'.
       
     Returns:
         objetivo_alcanzado: booleano que indica si se alcanzó el objetivo (True) o no (False)
@@ -61,42 +184,67 @@ def move_drone(target_x, target_y, target_qua, target_yaw, target_alt,
     print(f"Moviendo a destino - Var X: {target_x}, Var Y: {target_y}, Yaw: {target_yaw}, Alt: {target_alt}")
     
 
+    if marco not in MARCOS:
+        raise ValueError(f"Marco de objetivos desconocido: {marco}")
+    if marco == MARCO_MUNDO and posicion is None:
+        posicion = PosicionMundo()
+
+    # Lectura de la telemetría: todos los campos se leen de 'cs' una sola vez por iteración
+    if reader is None:
+        reader = TelemetryReader(cs, reloj=time.monotonic)
+
     # Registrar valores iniciales de los sensores de flujo óptico
-    init_flow_x = cs.opt_m_x
-    init_flow_y = cs.opt_m_y
+    snap = reader.read()
+    init_flow_x = snap.opt_m_x
+    init_flow_y = snap.opt_m_y
+    if estimador is not None:
+        estimador.update(snap)
+        init_flow_x, init_flow_y = estimador.cuerpo_x, estimador.cuerpo_y
+    if marco == MARCO_MUNDO:
+        posicion.actualizar(snap, estimador)
 
-    start_time = time.time() * 1000  # Tiempo en milisegundos
+    # Bucle a frecuencia fija con plazos absolutos sobre un reloj monótono
+    if scheduler is None:
+        scheduler = FixedRateScheduler(FRECUENCIA_CONTROL, reloj=time.monotonic, dormir=time.sleep)
+    scheduler.start()
     objetivo_alcanzado = False
 
+    # Salida RC: un único mensaje de override por iteración
+    if rc is None:
+        rc = RCOutput(Script, reloj=time.monotonic)
+
+    # Controlador PID: el estado (integral, derivada) empieza de cero en cada segmento
+    if controlador is None:
+        controlador = ControladorVuelo()
+    controlador.reiniciar()
+    t_previo = None
+
+    if perf is not None:
+        perf.nuevo_segmento(f"X {target_x:.3f} Y {target_y:.3f} Yaw {target_yaw} Alt {target_alt}")
+
     # Bucle de control
     while True:
-        current_time = time.time() * 1000
-        if current_time - start_time > max_duration:
+        if perf is not None:
+            perf.inicio()
+
+        if scheduler.elapsed() * 1000 > max_duration:
             print("Tiempo máximo superado. Se aborta el segmento.")
+            # Los puntos de paso siguientes parten de donde está el dron, como en MARCO_CUERPO
+            if marco == MARCO_MUNDO:
+                posicion.reanclar(target_x, target_y)
             break
 
-        # Calcular la variación acumulada (desplazamientos relativos)
-        current_dx = cs.opt_m_x - init_flow_x
-        current_dy = cs.opt_m_y - init_flow_y
-
-        error_x = target_x - current_dx
-        error_y = target_y - current_dy
+        # Leer la telemetría de esta iteración; el control, el log y la comprobación de éxito usan esta lectura
+        snap = reader.read()
+        if perf is not None:
+            perf.marca(perfilado.LECTURA)
 
-        #Control de Altitud
-        current_alt = cs.sonarrange  # Obtener la altitud actual
-        error_alt = abs(target_alt - current_alt)  # Comparar con la deseada
-    
-        #Control de YAW 
-        current_yaw = cs.yaw  # Se asume que cs.yaw entrega el valor actual en grados
-        error_yaw = target_yaw - current_yaw
-        # Normalizar error_yaw al intervalo [-180, 180]
-        if error_yaw > 180:
-            error_yaw -= 360
-        elif error_yaw < -180:
-            error_yaw += 360
+        error_x, error_y, error_yaw, error_alt = calcular_errores(snap, target_x, target_y, target_yaw, target_alt,
+                                                                  init_flow_x, init_flow_y, marco, posicion,
+                                                                  estimador)
 
         # Debug: imprimir progreso
-        # print(f"Flow - X: {current_dx}, Y: {current_dy} | Error X: {error_x}, Error Y: {error_y} | Yaw Actual: {current_yaw}, Error Yaw: {error_yaw} | Altitud Actual: {current_alt}, Error Altitud: {error_alt}")
+        # print(f"Error X: {error_x}, Error Y: {error_y} | Yaw Actual: {snap.yaw}, Error Yaw: {error_yaw} | Altitud Actual: {snap.sonarrange}, Error Altitud: {error_alt}")
 
         # Verificar si se han alcanzado las tolerancias en posición y yaw
         if abs(error_x) < tolerance and abs(error_y) < tolerance and abs(error_yaw) < yaw_tolerance and abs(error_alt) < alt_tolerance:
@@ -104,65 +252,49 @@ def move_drone(target_x, target_y, target_qua, target_yaw, target_alt,
             print("Posición y yaw objetivo alcanzados.")
         
             # Registrar los datos finales para este segmento
-            final_opt_m_x = cs.opt_m_x
-            final_opt_m_y = cs.opt_m_y
-            final_opt_qua = cs.opt_qua  
-            final_yaw = cs.yaw
-            final_alt = cs.sonnarrange 
-            final_battery = cs.battery_voltage 
-
             if log_file is not None:
-            # Se escribe en el archivo de ruta.
-                log_file.write(f"{final_opt_m_x}, {final_opt_m_y}, {final_opt_qua}, {final_yaw}, {final_alt}, {final_battery}, {objetivo_alcanzado}\n")
+            # Se guarda la muestra para escribirla en el archivo de ruta.
+                log_file.push((snap.opt_m_x, snap.opt_m_y, snap.opt_qua, snap.yaw, snap.sonarrange,
+                               snap.battery_voltage, objetivo_alcanzado, tiempo_registro(snap.t - reader.t_inicio)))
             
             break
 
-        # Control proporcional para la altitud:
-        Kp_alt = 50  # Constante proporcional para la altitud (ajustable según necesidad)
-        delta_alt = int(Kp_alt * error_alt)
-        cmd_rc3 = 1500 + delta_alt
-        
-        # Limitar el comando RC3 a un rango seguro 
-        cmd_rc3 = max(1300, min(1550, cmd_rc3))
-        Script.SendRC(3, cmd_rc3, True)  # Enviar comando a RC3 para controlar la altitud
-        
-        # Control proporcional para el yaw:
-        Kp_yaw = 5  # Constante proporcional para el yaw
-        delta_yaw = int(Kp_yaw * error_yaw)
-        cmd_rc4 = 1500 + delta_yaw
-        # Limitar el comando de yaw a un rango 
-        cmd_rc4 = max(1450, min(1550, cmd_rc4))
-        Script.SendRC(4, cmd_rc4, True)
-        
-        
-        # Control proporcional para la posición:
-        Kp_xy = 50  # Constante proporcional para X e Y
+        if perf is not None:
+            perf.marca(perfilado.CALCULO)
+
+        # Control PID de los cuatro ejes (ganancias y límites en controlador.py / ganancias_pid.json)
+        dt = snap.t - t_previo if t_previo is not None else scheduler.periodo
+        t_previo = snap.t
+        cmd_rc1, cmd_rc2, cmd_rc3, cmd_rc4 = controlador.actualizar(error_x, error_y, error_yaw, error_alt, dt)
+        rc.set(3, cmd_rc3)  # RC3 – Throttle (altitud)
+        rc.set(4, cmd_rc4)  # RC4 – Yaw
         # Nota: se asigna error_y a RC1 (roll) y error_x a RC2 (pitch) según la convención
-        delta_rc1 = int(Kp_xy * error_y)
-        delta_rc2 = int(Kp_xy * error_x)
-        cmd_rc1 = 1500 + delta_rc1
-        cmd_rc2 = 1500 + delta_rc2
-
-        Script.SendRC(1, cmd_rc1, True)  # RC1 – Roll (inclinación lateral)
-        Script.SendRC(2, cmd_rc2, True)  # RC2 – Pitch (inclinación frontal)
-
-        # Registrar los datos finales para este segmento
-        final_opt_m_x = cs.opt_m_x
-        final_opt_m_y = cs.opt_m_y
-        final_opt_qua = cs.opt_qua 
-        final_yaw = cs.yaw
-        final_alt = cs.sonarrange
-        final_battery = cs.battery_voltage 
+        rc.set(1, cmd_rc1)  # RC1 – Roll (inclinación lateral)
+        rc.set(2, cmd_rc2)  # RC2 – Pitch (inclinación frontal)
 
+        # Enviar los canales que han cambiado en un único mensaje
+        rc.flush()
+        if perf is not None:
+            perf.marca(perfilado.RC)
+
+        # Registrar los datos de esta iteración (misma lectura que el control)
         if log_file is not None:
-        # Se escribe en el log: se guardan los valores medidos y el booleano de éxito.
-            log_file.write(f"{final_opt_m_x}, {final_opt_m_y}, {target_qua}, {final_yaw}, {final_alt}, {final_battery}, {objetivo_alcanzado}\n")
-        Script.Sleep(100)  
+        # Se guarda en el log: los valores medidos y el booleano de éxito.
+            log_file.push((snap.opt_m_x, snap.opt_m_y, target_qua, snap.yaw, snap.sonarrange, snap.battery_voltage,
+                           objetivo_alcanzado, tiempo_registro(snap.t - reader.t_inicio)))
+        if perf is not None:
+            perf.marca(perfilado.LOG)
+
+        # Esperar al plazo de la siguiente iteración
+        scheduler.wait()
+        if perf is not None:
+            perf.marca(perfilado.ESPERA)
         
     # Fin del bucle: detener movimiento
-    Script.SendRC(1, 1500, True)
-    Script.SendRC(2, 1500, True)
-    Script.SendRC(4, 1500, True)
+    rc.set(1, 1500)
+    rc.set(2, 1500)
+    rc.set(4, 1500)
+    rc.flush()
 
     return objetivo_alcanzado
 
@@ -183,8 +315,21 @@ def main():
     current_dir = os.path.dirname(os.path.abspath(__file__))
     ruta_entrada = os.path.join(current_dir, "..\\Rutas", "prueba subida y movimiento eje y.txt")
 
-    # Leer los datos de la ruta guardada
-    route_data = read_variations(ruta_entrada)
+    # Objetivos de cada segmento (x, y, qua, yaw, alt): el plan compilado si está al día o las filas de la ruta.
+    # Con MARCO_MUNDO cada fila se convierte en un punto de paso (las menores que la tolerancia no lo mueven) y la
+    # posición se sigue durante toda la ruta
+    marco = MARCO_OBJETIVOS
+    if USAR_PLAN and plan_vigente(ruta_entrada, PARAMETROS_RUTA):
+        objetivos = cargar_plan(ruta_plan(ruta_entrada))
+        marco = MARCO_MUNDO
+        print(f"Plan compilado: {len(objetivos)} puntos de paso.")
+    else:
+        route_data = read_variations(ruta_entrada)
+        objetivos = [tuple(point[:5]) for point in route_data]
+        if marco == MARCO_MUNDO:
+            puntos = waypoints_mundo(route_data, PARAMETROS_RUTA["tolerance"])
+            objetivos = [(x, y) + point[2:] for (x, y), point in zip(puntos, objetivos)]
+    posicion = PosicionMundo() if marco == MARCO_MUNDO else None
 
     # Crear un nuevo archivo para guardar la nueva ruta con el flag de objetivo alcanzado
     nueva_ruta_dir = os.path.join(current_dir, "..\\Rutas\\Rutas_Recreadas")
@@ -197,8 +342,14 @@ def main():
     
     nueva_ruta_file = os.path.join(nueva_ruta_dir, file_name)
     log = open(nueva_ruta_file, "w")
+    # Anotar de qué ruta es recreación este archivo (comparar_rutas.py empareja así la original y la recreada)
+    with open(os.path.join(nueva_ruta_dir, "origenes.csv"), "a") as origenes:
+        origenes.write(f"{file_name},{os.path.basename(ruta_entrada)}\n")
     # Escribir encabezado en el nuevo fichero
-    log.write("opt_m_x, opt_m_y, opt_qua, yaw, alt, battery_V, objetivo_alcanzado\n")
+    log.write(CABECERA_LOG + "\n")
+    # Las muestras se escriben desde un hilo aparte para no retrasar el bucle de control (con RUNTIME_ASYNC, desde la
+    # tarea de registro del runtime)
+    sink = TelemetrySink(log) if not RUNTIME_ASYNC else None
 
     # Armar el dron (por ejemplo, enviando comandos a RC3 y RC4 para el armado)
     Script.SendRC(3, int(Script.GetParam("RC3_MIN")), False)  # Throttle al mínimo
@@ -206,12 +357,34 @@ def main():
     Script.Sleep(2000)
     print("Motores encendidos.")
 
-    # Recorrer cada punto de la ruta leída y ejecutarlo
-    for point in route_data:
-        target_x, target_y, target_qua, target_yaw, target_alt, battery = point
-        # Llamar a move_drone pasando además el log para que se guarden los datos
-        move_drone(target_x, target_y, target_qua, target_yaw, target_alt, 
-                   tolerance=0.3, yaw_tolerance=100, alt_tolerance=0.2, max_duration=30000, log_file=log)
+    if RUNTIME_ASYNC:
+        import runtime_async
+        _, estadisticas = runtime_async.ejecutar_ruta(objetivos, cs, Script, log_file=log, parametros=PARAMETROS_RUTA,
+                                                      marco=marco)
+        print(estadisticas.resumen())
+    else:
+        # Planificador común a todos los segmentos para acumular las estadísticas del bucle de control
+        scheduler = FixedRateScheduler(FRECUENCIA_CONTROL, reloj=time.monotonic, dormir=time.sleep)
+        perf = perfilado.PerfiladorLazo(periodo=scheduler.periodo) if PERFILAR else None
+        rc = RCOutput(Script, reloj=time.monotonic)
+        controlador = ControladorVuelo()
+        # El estimador usa también el barómetro (alt), que no se registra en el log
+        estimador = EstimadorPosicion() if ESTIMAR_POSICION else None
+        campos = CAMPOS_RUTA + ("alt",) if ESTIMAR_POSICION else CAMPOS_RUTA
+        reader = TelemetryReader(cs, campos=campos, reloj=time.monotonic)
+
+        # Recorrer cada punto de la ruta leída y ejecutarlo
+        for target_x, target_y, target_qua, target_yaw, target_alt in objetivos:
+            # Llamar a move_drone pasando además el log para que se guarden los datos
+            move_drone(target_x, target_y, target_qua, target_yaw, target_alt, log_file=sink, scheduler=scheduler,
+                       perf=perf, rc=rc, reader=reader, marco=marco, posicion=posicion, controlador=controlador,
+                       estimador=estimador, **PARAMETROS_RUTA)
+        print(scheduler.resumen())
+        print(f"Salida RC: {rc.mensajes} mensajes ({rc.mensajes_por_segundo():.1f}/s), {rc.omitidos} canales sin cambios omitidos")
+
+        # Guardar el perfil del bucle junto al log de la ruta recreada
+        if perf is not None:
+            perf.guardar_resumen(os.path.splitext(nueva_ruta_file)[0] + EXTENSION_PERFIL)
 
     # Una vez completada la ejecución de la ruta, estabilizar y desarmar
     Script.SendRC(3, int(Script.GetParam("RC3_MIN")), True)  # Throttle al mínimo
@@ -235,6 +408,11 @@ def main():
     Script.SendRC(3, int(Script.GetParam("RC3_MIN")), False)
     Script.Sleep(5000)
 
+    if sink is not None:
+        sink.close()
     log.close()
 
-main()
\ No newline at end of file
+# Mission Planner ejecuta el script con 'cs' y 'Script' ya definidos; al importarlo desde otro módulo
+# (por ejemplo, con el simulador) no existen y no se lanza la ruta.
+if "Script" in globals():
+    main()
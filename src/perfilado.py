@@ -0,0 +1,106 @@
+"""
+Instrumentación opcional del bucle de control de move_drone.
+Guarda una marca de tiempo al final de cada fase de cada iteración en un array preasignado y, al terminar,
+resume por segmento los percentiles p50/p95/p99 de cada fase, la frecuencia real del bucle y los overruns.
+Solo usa la librería estándar para poder ejecutarse dentro de Mission Planner.
+
+Cuando no se usa, move_drone recibe perf=None y solo comprueba 'perf is not None' en cada fase.
+"""
+import math
+import time
+from array import array
+
+# Fases de cada iteración del bucle de control, en orden
+FASES = ("lectura", "calculo", "rc", "log", "espera")
+LECTURA, CALCULO, RC, LOG, ESPERA = range(1, len(FASES) + 1)
+
+_MARCAS = len(FASES) + 1  # Inicio de la iteración más el final de cada fase
+
+
+def _percentil(valores_ordenados, p):
+    """Percentil p (0-100) por el método del rango más cercano sobre una lista ordenada."""
+    if not valores_ordenados:
+        return float("nan")
+    k = max(0, min(len(valores_ordenados) - 1, int(math.ceil(p / 100.0 * len(valores_ordenados))) - 1))
+    return valores_ordenados[k]
+
+
+class PerfiladorLazo:
+    """Registro de las marcas de tiempo de cada fase del bucle de control."""
+
+    def __init__(self, capacidad=100000, periodo=0.1, reloj=None):
+        """
+        Args:
+            capacidad: Número máximo de iteraciones que se registran; a partir de ahí se ignoran.
+            periodo: Periodo nominal del bucle (s), para contar los overruns.
+            reloj: Función que devuelve un tiempo monótono en segundos; por defecto time.perf_counter.
+        """
+        self.capacidad = capacidad
+        self.periodo = periodo
+        self.reloj = reloj or time.perf_counter
+        self.marcas = array('d', [-1.0]) * (capacidad * _MARCAS)
+        self.n = 0                 # Iteraciones registradas
+        self.ignoradas = 0         # Iteraciones no registradas por falta de capacidad
+        self.segmentos = []        # (nombre, índice de la primera iteración)
+        self._base = -1            # Posición en 'marcas' de la iteración actual (-1 si no se registra)
+
+    def nuevo_segmento(self, nombre):
+        """Indica que las siguientes iteraciones pertenecen a un nuevo segmento de la ruta."""
+        self.segmentos.append((nombre, self.n))
+
+    def inicio(self):
+        """Marca el inicio de una iteración."""
+        if self.n < self.capacidad:
+            self._base = self.n * _MARCAS
+            self.n += 1
+            self.marcas[self._base] = self.reloj()
+        else:
+            self._base = -1
+            self.ignoradas += 1
+
+    def marca(self, fase):
+        """Marca el final de una fase (LECTURA, CALCULO, RC, LOG o ESPERA) de la iteración actual."""
+        if self._base >= 0:
+            self.marcas[self._base + fase] = self.reloj()
+
+    def _resumen_segmento(self, nombre, desde, hasta):
+        """Calcula las estadísticas de las iteraciones completas en [desde, hasta)."""
+        duraciones = [[] for _ in FASES]
+        inicios = []
+        overruns = 0
+        for i in range(desde, hasta):
+            t = self.marcas[i * _MARCAS:(i + 1) * _MARCAS]
+            inicios.append(t[0])
+            # Las iteraciones que terminan con un break no tienen todas las marcas
+            if any(t[k] < t[k - 1] for k in range(1, _MARCAS)):
+                continue
+            for k in range(len(FASES)):
+                duraciones[k].append((t[k + 1] - t[k]) * 1000.0)
+            if t[LOG] - t[0] > self.periodo:
+                overruns += 1
+
+        lineas = [f"Segmento {nombre}: {hasta - desde} iteraciones"]
+        if len(inicios) > 1 and inicios[-1] > inicios[0]:
+            lineas[0] += f", {(len(inicios) - 1) / (inicios[-1] - inicios[0]):.2f} Hz"
+        lineas[0] += f", {overruns} overruns"
+        for fase, valores in zip(FASES, duraciones):
+            valores.sort()
+            lineas.append(f"  {fase:<8} p50 {_percentil(valores, 50):8.3f} ms  p95 {_percentil(valores, 95):8.3f} ms"
+                          f"  p99 {_percentil(valores, 99):8.3f} ms")
+        return lineas
+
+    def resumen(self):
+        """Devuelve el texto con el resumen de cada segmento."""
+        segmentos = self.segmentos or [("completo", 0)]
+        lineas = [f"Perfil del bucle de control (periodo nominal {self.periodo * 1000:.0f} ms, "
+                  f"{self.n} iteraciones registradas, {self.ignoradas} ignoradas)"]
+        for j, (nombre, desde) in enumerate(segmentos):
+            hasta = segmentos[j + 1][1] if j + 1 < len(segmentos) else self.n
+            if hasta > desde:
+                lineas.extend(self._resumen_segmento(nombre, desde, hasta))
+        return "\n".join(lineas) + "\n"
+
+    def guardar_resumen(self, file_path):
+        """Escribe el resumen en un archivo de texto."""
+        with open(file_path, "w") as f:
+            f.write(self.resumen())
@@ -0,0 +1,125 @@
+"""
+Planificador de bucles a frecuencia fija.
+Usa un reloj monótono y plazos absolutos (inicio + k * periodo), de forma que el tiempo de trabajo de cada iteración
+no se suma al periodo y el bucle no deriva. Cuenta los plazos incumplidos y guarda histogramas de latencia.
+Solo usa la librería estándar para poder ejecutarse dentro de Mission Planner.
+"""
+import time
+
+# Límites superiores (ms) de los intervalos de los histogramas de latencia; el último intervalo es abierto
+LIMITES_HISTOGRAMA_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histograma:
+    """Histograma de tiempos en milisegundos con intervalos fijos."""
+
+    def __init__(self, limites_ms=LIMITES_HISTOGRAMA_MS):
+        self.limites_ms = tuple(limites_ms)
+        self.cuentas = [0] * (len(self.limites_ms) + 1)
+        self.n = 0
+        self.maximo_ms = 0.0
+
+    def add(self, ms):
+        """Añade una medida en milisegundos."""
+        i = 0
+        for limite in self.limites_ms:
+            if ms <= limite:
+                break
+            i += 1
+        self.cuentas[i] += 1
+        self.n += 1
+        if ms > self.maximo_ms:
+            self.maximo_ms = ms
+
+    def __str__(self):
+        partes = []
+        anterior = 0
+        for limite, cuenta in zip(self.limites_ms + (None,), self.cuentas):
+            if cuenta:
+                etiqueta = f"{anterior}-{limite}" if limite is not None else f">{anterior}"
+                partes.append(f"{etiqueta} ms: {cuenta}")
+            anterior = limite
+        return ", ".join(partes) + f" (máx {self.maximo_ms:.1f} ms)"
+
+
+class FixedRateScheduler:
+    """
+    Marca el ritmo de un bucle a una frecuencia fija.
+
+    Uso:
+        planificador.start()
+        while ...:
+            ... trabajo de la iteración ...
+            planificador.wait()
+    """
+
+    def __init__(self, frecuencia=10.0, reloj=None, dormir=None):
+        """
+        Args:
+            frecuencia: Frecuencia del bucle en Hz (por ejemplo 10, 20 o 50).
+            reloj: Función que devuelve un tiempo monótono en segundos; por defecto time.monotonic.
+            dormir: Función que espera un número de segundos; por defecto time.sleep.
+        """
+        if frecuencia <= 0:
+            raise ValueError("La frecuencia debe ser mayor que 0.")
+        self.frecuencia = frecuencia
+        self.periodo = 1.0 / frecuencia
+        self.reloj = reloj or getattr(time, "monotonic", time.time)
+        self.dormir = dormir or time.sleep
+
+        self.iteraciones = 0
+        self.overruns = 0              # Iteraciones que terminaron después de su plazo
+        self.plazos_perdidos = 0       # Plazos saltados a causa de los overruns
+        self.hist_trabajo = Histograma()  # Tiempo de trabajo de cada iteración
+        self.hist_retraso = Histograma()  # Retraso del despertar respecto al plazo
+
+        self._inicio = None
+        self._siguiente = None
+        self._inicio_iteracion = None
+
+    def start(self):
+        """Fija el origen de tiempos; la primera iteración empieza ahora."""
+        ahora = self.reloj()
+        self._inicio = ahora
+        self._inicio_iteracion = ahora
+        self._siguiente = ahora + self.periodo
+
+    def elapsed(self):
+        """Segundos transcurridos desde start()."""
+        return self.reloj() - self._inicio
+
+    def wait(self):
+        """
+        Espera hasta el plazo de la siguiente iteración.
+        Si la iteración actual ya ha superado su plazo, cuenta un overrun y continúa en el siguiente plazo
+        futuro sin intentar recuperar los perdidos.
+        Returns:
+            True si la iteración terminó a tiempo, False si hubo overrun.
+        """
+        ahora = self.reloj()
+        self.iteraciones += 1
+        self.hist_trabajo.add((ahora - self._inicio_iteracion) * 1000.0)
+
+        a_tiempo = ahora <= self._siguiente
+        if a_tiempo:
+            self.dormir(self._siguiente - ahora)
+        else:
+            self.overruns += 1
+            perdidos = int((ahora - self._siguiente) / self.periodo) + 1
+            self.plazos_perdidos += perdidos - 1
+            # La siguiente iteración empieza ya y su plazo es el primero posterior a 'ahora'
+            self._siguiente += (perdidos - 1) * self.periodo
+
+        despertar = self.reloj()
+        if a_tiempo:
+            self.hist_retraso.add(max(0.0, despertar - self._siguiente) * 1000.0)
+        self._inicio_iteracion = despertar
+        self._siguiente += self.periodo
+        return a_tiempo
+
+    def resumen(self):
+        """Devuelve un texto con las estadísticas del bucle."""
+        return (f"Bucle a {self.frecuencia:g} Hz: {self.iteraciones} iteraciones, {self.overruns} overruns, "
+                f"{self.plazos_perdidos} plazos perdidos\n"
+                f"  Trabajo por iteración: {self.hist_trabajo}\n"
+                f"  Retraso al despertar: {self.hist_retraso}")
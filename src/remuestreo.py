@@ -0,0 +1,219 @@
+"""
+Remuestreo en el tiempo de los archivos de ruta, para alinear, comparar y diezmar registros tomados a distintas
+frecuencias (ruta.py a 2 Hz o, en capturas de alta frecuencia, a 50-100 Hz, move_drone a FRECUENCIA_CONTROL,
+comparar_sensores altura.py a 1 Hz).
+El tiempo de cada fila es la columna t (lector_rutas.COLUMNA_TIEMPO). Los archivos antiguos, que no la tienen, se
+tratan como muestreados a una frecuencia supuesta según su variante de columnas (FRECUENCIAS_SUPUESTAS).
+
+Cada columna se remuestrea según su naturaleza, con todas las filas a la vez (sin bucles en Python) y leyendo
+solo las dos filas que rodean a cada instante nuevo:
+    - opt_m_x, opt_m_y: son el desplazamiento de cada muestra, así que se interpola su suma acumulada y se vuelve a
+      diferenciar; el desplazamiento total se conserva al diezmar.
+    - yaw: se interpola por el giro más corto entre cada par de filas y el resultado se lleva a [0, 360).
+    - objetivo_alcanzado: cada fila con el objetivo alcanzado marca la primera muestra nueva en o después de ella.
+    - El resto (calidad, altura, batería): interpolación lineal.
+Fuera del intervalo registrado no se extrapola: se mantiene el valor del extremo más cercano.
+
+Uso: python remuestreo.py <archivo> <frecuencia> [salida]
+    Escribe el archivo remuestreado a la frecuencia indicada (Hz), con la columna t; por defecto junto al original
+    con el sufijo _<frecuencia>Hz.
+"""
+import os
+import sys
+
+import numpy as np
+
+from lector_rutas import leer_matriz, separar_tiempo, detectar_esquema, COLUMNA_TIEMPO
+
+# Frecuencia (Hz) con la que se registraron los archivos sin columna t, según su variante de columnas:
+# ruta.py muestreaba a 2 Hz, move_drone a FRECUENCIA_CONTROL (10 Hz) y comparar_sensores altura.py a 1 Hz
+FRECUENCIAS_SUPUESTAS = {
+    "flujo": 1.0,
+    "altura": 1.0,
+    "sonar": 1.0,
+    "bateria": 2.0,
+    "completo": 10.0,
+    "distancia": 2.0,
+    "altura_mala": 2.0,
+}
+FRECUENCIA_POR_DEFECTO = 1.0
+
+COLUMNAS_INCREMENTO = ("opt_m_x", "opt_m_y")
+COLUMNAS_ANGULARES = ("yaw",)
+COLUMNAS_DISCRETAS = ("objetivo_alcanzado",)
+
+
+def frecuencia_supuesta(cabecera):
+    """Frecuencia (Hz) supuesta para un archivo sin columna t, según su variante de columnas."""
+    return FRECUENCIAS_SUPUESTAS.get(detectar_esquema(cabecera).nombre, FRECUENCIA_POR_DEFECTO)
+
+
+def tiempos_ruta(cabecera, datos, frecuencia=None):
+    """
+    Separa la columna t de una ruta o, si no la tiene, calcula los tiempos con una frecuencia supuesta.
+    Args:
+        cabecera: Lista con los nombres de las columnas.
+        datos: Matriz NxM con los datos.
+        frecuencia: Frecuencia (Hz) de los archivos sin tiempo; por defecto la de frecuencia_supuesta().
+    Returns:
+        cabecera, datos: Sin la columna t.
+        t: Array con el tiempo (s) de cada fila.
+        medido: True si el tiempo viene del archivo, False si es supuesto.
+    """
+    cabecera, datos, t = separar_tiempo(cabecera, datos)
+    if t is not None:
+        return cabecera, datos, t, True
+    frecuencia = frecuencia or frecuencia_supuesta(cabecera)
+    return cabecera, datos, np.arange(len(datos)) / frecuencia, False
+
+
+def cargar_con_tiempo(file_path, frecuencia=None):
+    """Lee un archivo de ruta de texto o binario; devuelve lo mismo que tiempos_ruta()."""
+    return tiempos_ruta(*leer_matriz(file_path), frecuencia=frecuencia)
+
+
+def rejilla(t_inicio, t_final, frecuencia):
+    """Instantes a la frecuencia indicada desde t_inicio hasta t_final (incluido si cae en la rejilla)."""
+    n = int(np.floor((t_final - t_inicio) * frecuencia + 1e-9)) + 1
+    return t_inicio + np.arange(max(n, 0)) / frecuencia
+
+
+def _pesos(t, t_nuevo):
+    """
+    Índice de la fila anterior y peso de la siguiente para interpolar en cada instante nuevo.
+    Fuera de [t[0], t[-1]] el peso se limita a 0 o 1 (se mantiene el extremo).
+    """
+    if len(t) < 2:
+        return np.zeros(len(t_nuevo), dtype=np.intp), np.zeros(len(t_nuevo))
+    i = np.clip(np.searchsorted(t, t_nuevo, side="right") - 1, 0, len(t) - 2)
+    intervalo = t[i + 1] - t[i]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        peso = np.where(intervalo > 0, (t_nuevo - t[i]) / intervalo, 0.0)
+    return i, np.clip(peso, 0.0, 1.0)
+
+
+def interpolar(t, valores, t_nuevo):
+    """
+    Interpolación lineal de todas las columnas a la vez.
+    Args:
+        t: Tiempos crecientes de las filas (N).
+        valores: Array de N elementos o matriz NxM.
+        t_nuevo: Instantes en los que se evalúa (K).
+    Returns:
+        Array de K elementos o matriz KxM.
+    """
+    valores = np.asarray(valores, dtype=float)
+    i, peso = _pesos(np.asarray(t, dtype=float), np.asarray(t_nuevo, dtype=float))
+    if valores.ndim > 1:
+        peso = peso[:, None]
+    anterior, siguiente = valores[i], valores[np.minimum(i + 1, len(valores) - 1)]
+    return anterior + (siguiente - anterior) * peso
+
+
+def remuestrear(cabecera, datos, t, t_nuevo):
+    """
+    Remuestrea las filas de una ruta (sin la columna t) en los instantes t_nuevo.
+    Args:
+        cabecera: Nombres de las columnas de datos.
+        datos: Matriz NxM.
+        t: Tiempo (s) de cada fila, creciente.
+        t_nuevo: Instantes (s) de las filas nuevas, crecientes.
+    Returns:
+        Matriz KxM con las filas nuevas.
+    """
+    cabecera = [col.strip() for col in cabecera]
+    t = np.asarray(t, dtype=float)
+    t_nuevo = np.asarray(t_nuevo, dtype=float)
+    if not len(datos) or not len(t_nuevo):
+        return np.full((len(t_nuevo), datos.shape[1]), np.nan)
+
+    incremento = [i for i, col in enumerate(cabecera) if col in COLUMNAS_INCREMENTO]
+    angulares = [i for i, col in enumerate(cabecera) if col in COLUMNAS_ANGULARES]
+    discretas = [i for i, col in enumerate(cabecera) if col in COLUMNAS_DISCRETAS]
+
+    # Solo se leen las dos filas que rodean a cada instante nuevo: interpolación lineal de todas las columnas
+    i, peso = _pesos(t, t_nuevo)
+    j = np.minimum(i + 1, len(datos) - 1)
+    peso = peso[:, None]
+    anterior, siguiente = datos[i], datos[j]
+    resultado = anterior + (siguiente - anterior) * peso
+
+    if angulares:
+        # Interpolar por el giro más corto equivale a desenrollar y no depende de las filas anteriores
+        giro = (siguiente[:, angulares] - anterior[:, angulares] + 180.0) % 360.0 - 180.0
+        resultado[:, angulares] = (anterior[:, angulares] + giro * peso) % 360.0
+    if incremento:
+        # Desplazamiento acumulado hasta cada fila (los NaN no suman), interpolado y vuelto a diferenciar
+        acumulado = np.cumsum(np.nan_to_num(datos[:, incremento]), axis=0)
+        en_t_nuevo = acumulado[i] + (acumulado[j] - acumulado[i]) * peso
+        resultado[:, incremento] = np.diff(en_t_nuevo, axis=0, prepend=np.zeros((1, len(incremento))))
+    if discretas:
+        # Cada fila marcada se asigna a la primera muestra nueva en o después de su instante
+        destino = np.minimum(np.searchsorted(t_nuevo, t, side="left"), len(t_nuevo) - 1)
+        for k in discretas:
+            columna = np.zeros(len(t_nuevo))
+            columna[destino[datos[:, k] == 1]] = 1.0
+            resultado[:, k] = columna
+    return resultado
+
+
+def diezmar(cabecera, datos, t, frecuencia):
+    """
+    Remuestrea una ruta a una frecuencia fija desde su primera fila. La rejilla llega hasta la última fila o la
+    primera muestra posterior, para que el desplazamiento total se conserve.
+    Returns:
+        t_nuevo, datos_nuevos: Instantes de la rejilla y filas remuestreadas.
+    """
+    t_nuevo = rejilla(t[0], t[-1], frecuencia) if len(t) else np.empty(0)
+    if len(t_nuevo) and t_nuevo[-1] < t[-1] - 1e-9:
+        t_nuevo = np.append(t_nuevo, t_nuevo[-1] + 1.0 / frecuencia)
+    return t_nuevo, remuestrear(cabecera, datos, t, t_nuevo)
+
+
+def alinear(rutas, frecuencia):
+    """
+    Lleva varias rutas a una rejilla de tiempo común para compararlas fila a fila.
+    El tiempo de cada ruta se cuenta desde su primera fila y la rejilla cubre el intervalo que tienen todas.
+    Args:
+        rutas: Lista de tuplas (cabecera, datos, t), por ejemplo de cargar_con_tiempo() sin el último valor.
+        frecuencia: Frecuencia (Hz) de la rejilla común.
+    Returns:
+        t_comun: Instantes de la rejilla (s desde el inicio).
+        datos: Lista con las filas remuestreadas de cada ruta.
+    """
+    duracion = min(t[-1] - t[0] if len(t) else 0.0 for _, _, t in rutas)
+    t_comun = rejilla(0.0, duracion, frecuencia)
+    alineadas = []
+    for cabecera, datos, t in rutas:
+        origen = t[0] if len(t) else 0.0
+        alineadas.append(remuestrear(cabecera, datos, t - origen, t_comun))
+    return t_comun, alineadas
+
+
+def guardar_ruta(file_path, cabecera, datos, t):
+    """Escribe una ruta de texto con la columna t al final (objetivo_alcanzado como True/False)."""
+    cabecera = [col.strip() for col in cabecera]
+    booleanas = [i for i, col in enumerate(cabecera) if col in COLUMNAS_DISCRETAS]
+    with open(file_path, "w") as f:
+        f.write(", ".join(cabecera + [COLUMNA_TIEMPO]) + "\n")
+        lineas = []
+        for fila, instante in zip(datos.tolist(), np.round(t, 4).tolist()):
+            for i in booleanas:
+                fila[i] = fila[i] == 1
+            lineas.append(", ".join([str(v) for v in fila + [instante]]))
+        f.write("\n".join(lineas) + ("\n" if lineas else ""))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("Uso: python remuestreo.py <archivo> <frecuencia> [salida]")
+        sys.exit(1)
+    entrada, frecuencia = sys.argv[1], float(sys.argv[2])
+    salida = sys.argv[3] if len(sys.argv) == 4 else f"{os.path.splitext(entrada)[0]}_{frecuencia:g}Hz.txt"
+
+    cabecera, datos, t, medido = cargar_con_tiempo(entrada)
+    if not medido:
+        print(f"El archivo no tiene columna t; se supone una frecuencia de {frecuencia_supuesta(cabecera):g} Hz.")
+    t_nuevo, nuevos = diezmar(cabecera, datos, t, frecuencia)
+    guardar_ruta(salida, cabecera, nuevos, t_nuevo)
+    print(f"{len(datos)} filas -> {len(nuevos)} filas a {frecuencia:g} Hz en {salida}")
@@ -0,0 +1,230 @@
+"""
+Genera sin ventanas (backend Agg) las gráficas de todas las rutas de un directorio: la trayectoria 3D y el voltaje
+de la batería frente al tiempo, en PNG (y opcionalmente SVG), más una página index.html con todas ellas.
+Las rutas se reparten entre varios procesos; cada proceso crea sus figuras una sola vez y las reutiliza para todas
+sus rutas, quitando solo los artistas de la ruta anterior. Un archivo de caché con el hash del contenido de cada
+ruta permite saltarse las que no han cambiado desde la última ejecución.
+
+Uso: python render_rutas.py [directorio] [salida] [procesos] [--svg]
+    Por defecto se recorre ../Rutas (incluido Rutas_Recreadas) y se escribe en ../Graficas.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import html
+from urllib.parse import quote
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from grafica import (cargar_trayectoria, preparar_ejes_trayectoria, dibujar_trayectoria, preparar_ejes_bateria,
+                     dibujar_bateria)
+from formato_binario import EXTENSION_BINARIA
+from replay_rutas import listar_rutas, RUTAS_DIR
+
+SALIDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Graficas")
+
+# Se incluye en el hash de cada ruta: al cambiar el dibujo, cambiarla obliga a regenerar todas las gráficas
+VERSION_RENDER = 1
+
+ARCHIVO_CACHE = "cache.json"
+ARCHIVO_INDICE = "index.html"
+DPI = 100
+
+# Figuras de cada proceso; se crean la primera vez que el proceso dibuja una ruta
+_plantilla = None
+
+
+class PlantillaFiguras:
+    """Figuras de la trayectoria y de la batería que se reutilizan para todas las rutas de un proceso."""
+
+    def __init__(self):
+        self.fig = plt.figure(figsize=(8, 6))
+        self.ax = self.fig.add_subplot(111, projection='3d')
+        preparar_ejes_trayectoria(self.ax)
+
+        self.fig_bateria, self.ax_bateria = plt.subplots(figsize=(8, 4))
+        preparar_ejes_bateria(self.ax_bateria)
+
+        self._artistas = []
+
+    def _limpiar(self):
+        """Quita los artistas de la ruta anterior."""
+        for artista in self._artistas:
+            artista.remove()
+        self._artistas = []
+
+    def renderizar(self, file_path, base, formatos):
+        """
+        Dibuja una ruta y guarda sus gráficas.
+        Args:
+            file_path: Archivo de ruta.
+            base: Ruta de salida sin extensión; se añaden los sufijos _trayectoria y _bateria.
+            formatos: Extensiones de imagen ("png", "svg").
+        Returns:
+            filas: Número de filas dibujadas.
+            imagenes: Diccionario {"trayectoria": [archivos], "bateria": [archivos]}.
+        """
+        self._limpiar()
+        datos, indices, x, y, z, min_quality, max_quality, tiempo = cargar_trayectoria(file_path, mensajes=False)
+        imagenes = {}
+
+        self._artistas.extend(dibujar_trayectoria(self.ax, datos, indices, x, y, z, min_quality, max_quality))
+        imagenes["trayectoria"] = self._guardar(self.fig, base + "_trayectoria", formatos)
+
+        if datos.shape[1] > 5:
+            self._artistas.extend(dibujar_bateria(self.ax_bateria, datos, tiempo))
+            imagenes["bateria"] = self._guardar(self.fig_bateria, base + "_bateria", formatos)
+
+        return len(datos), imagenes
+
+    @staticmethod
+    def _guardar(fig, base, formatos):
+        archivos = []
+        for formato in formatos:
+            archivo = f"{base}.{formato}"
+            # Compresión PNG rápida: la codificación con el nivel por defecto es una parte notable del tiempo total
+            opciones = {"pil_kwargs": {"compress_level": 1}} if formato == "png" else {}
+            fig.savefig(archivo, dpi=DPI, **opciones)
+            archivos.append(os.path.basename(archivo))
+        return archivos
+
+
+def hash_ruta(file_path, formatos):
+    """Hash del contenido de la ruta, de la versión del dibujo y de los formatos pedidos."""
+    h = hashlib.sha1(f"{VERSION_RENDER}|{','.join(formatos)}|".encode())
+    with open(file_path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def nombre_salida(nombre):
+    """Nombre base de las imágenes de una ruta a partir de su ruta relativa (sin subdirectorios ni extensión)."""
+    return os.path.splitext(nombre)[0].replace(os.sep, "__").replace("/", "__")
+
+
+def _renderizar(tarea):
+    """Función de cada proceso: dibuja una ruta con las figuras del proceso y devuelve su resultado."""
+    global _plantilla
+    file_path, nombre, base, formatos, clave = tarea
+    resultado = {"ruta": nombre, "hash": clave}
+    inicio = time.perf_counter()
+    try:
+        if _plantilla is None:
+            _plantilla = PlantillaFiguras()
+        resultado["filas"], resultado["imagenes"] = _plantilla.renderizar(file_path, base, formatos)
+    except Exception as error:
+        resultado["error"] = str(error) or type(error).__name__
+    resultado["tiempo"] = time.perf_counter() - inicio
+    return resultado
+
+
+def cargar_cache(salida):
+    try:
+        with open(os.path.join(salida, ARCHIVO_CACHE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _vigente(resultado, clave, salida):
+    """Indica si el resultado guardado corresponde al mismo contenido y sus imágenes siguen existiendo."""
+    if resultado is None or resultado.get("hash") != clave:
+        return False
+    archivos = [a for lista in resultado.get("imagenes", {}).values() for a in lista]
+    return all(os.path.exists(os.path.join(salida, a)) for a in archivos)
+
+
+def renderizar_corpus(rutas, directorio=RUTAS_DIR, salida=SALIDA_DIR, procesos=None, formatos=("png",)):
+    """
+    Genera las gráficas de una lista de rutas, saltándose las que no han cambiado.
+    Args:
+        rutas: Lista de archivos de ruta.
+        directorio: Directorio raíz de las rutas (para los nombres relativos).
+        salida: Directorio de salida de las imágenes, la caché y el índice.
+        procesos: Número de procesos; por defecto tantos como núcleos.
+        formatos: Extensiones de imagen ("png", "svg").
+    Returns:
+        resultados: Lista de diccionarios (ruta, filas, imagenes o error) en el orden de 'rutas'.
+        generadas: Número de rutas dibujadas en esta ejecución (el resto venían de la caché).
+    """
+    os.makedirs(salida, exist_ok=True)
+    cache = cargar_cache(salida)
+
+    resultados = {}
+    tareas = []
+    for file_path in rutas:
+        nombre = os.path.relpath(file_path, directorio)
+        clave = hash_ruta(file_path, formatos)
+        if _vigente(cache.get(nombre), clave, salida):
+            resultados[nombre] = cache[nombre]
+        else:
+            tareas.append((file_path, nombre, os.path.join(salida, nombre_salida(nombre)), tuple(formatos), clave))
+
+    if tareas:
+        with ProcessPoolExecutor(max_workers=procesos) as executor:
+            for resultado in executor.map(_renderizar, tareas):
+                resultados[resultado["ruta"]] = resultado
+
+    ordenados = [resultados[os.path.relpath(r, directorio)] for r in rutas]
+    with open(os.path.join(salida, ARCHIVO_CACHE), "w") as f:
+        json.dump({r["ruta"]: r for r in ordenados}, f, indent=1)
+    escribir_indice(ordenados, salida)
+    return ordenados, len(tareas)
+
+
+def escribir_indice(resultados, salida):
+    """Escribe index.html con una fila por ruta y las miniaturas de sus gráficas."""
+    filas = []
+    for r in resultados:
+        celdas = [f"<td>{html.escape(r['ruta'])}</td>", f"<td>{r.get('filas', '')}</td>"]
+        if "error" in r:
+            celdas.append(f'<td colspan="2" class="error">{html.escape(r["error"])}</td>')
+        else:
+            for tipo in ("trayectoria", "bateria"):
+                archivos = r["imagenes"].get(tipo, [])
+                if not archivos:
+                    celdas.append("<td>-</td>")
+                    continue
+                imagen = next((a for a in archivos if a.endswith(".png")), archivos[0])
+                enlaces = " ".join(f'<a href="{quote(a)}">{os.path.splitext(a)[1][1:]}</a>' for a in archivos)
+                celdas.append(f'<td><a href="{quote(imagen)}"><img src="{quote(imagen)}" loading="lazy"></a>'
+                              f'<br>{enlaces}</td>')
+        filas.append("<tr>" + "".join(celdas) + "</tr>")
+
+    pagina = (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Rutas</title>\n"
+        "<style>body{font-family:sans-serif} td{vertical-align:top;padding:4px;border-bottom:1px solid #ccc}"
+        " img{width:320px} .error{color:#b00}</style></head><body>\n"
+        f"<h1>Rutas ({len(resultados)})</h1>\n"
+        "<table><tr><th>Ruta</th><th>Filas</th><th>Trayectoria</th><th>Batería</th></tr>\n"
+        + "\n".join(filas) + "\n</table></body></html>\n")
+    with open(os.path.join(salida, ARCHIVO_INDICE), "w", encoding="utf-8") as f:
+        f.write(pagina)
+
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if a != "--svg"]
+    if len(argumentos) > 3:
+        print("Uso: python render_rutas.py [directorio] [salida] [procesos] [--svg]")
+        sys.exit(1)
+
+    directorio = argumentos[0] if len(argumentos) > 0 else RUTAS_DIR
+    salida = argumentos[1] if len(argumentos) > 1 else SALIDA_DIR
+    procesos = int(argumentos[2]) if len(argumentos) > 2 else None
+    formatos = ("png", "svg") if "--svg" in sys.argv else ("png",)
+
+    inicio = time.perf_counter()
+    rutas = listar_rutas(directorio, (".txt", EXTENSION_BINARIA))
+    resultados, generadas = renderizar_corpus(rutas, directorio, salida, procesos, formatos)
+    errores = [r for r in resultados if "error" in r]
+    for r in errores:
+        print(f"{r['ruta']}: {r['error']}")
+    print(f"{len(resultados)} rutas, {generadas} dibujadas, {len(resultados) - generadas} sin cambios, "
+          f"{len(errores)} con errores. Índice: {os.path.join(salida, ARCHIVO_INDICE)}")
+    print(f"Tiempo real: {time.perf_counter() - inicio:.1f} s")
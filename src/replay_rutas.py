@@ -0,0 +1,186 @@
+"""
+Reproduce en el simulador todas las rutas de un directorio usando read_variations y move_drone de ordenes.py.
+Cada ruta se ejecuta en un proceso distinto y se resumen en una tabla la tasa de éxito (objetivo_alcanzado),
+el tiempo por segmento y el error de posición final.
+
+Uso: python replay_rutas.py [directorio] [procesos] [--mundo]
+    Por defecto se recorre ../Rutas con tantos procesos como núcleos. Con --mundo los objetivos son puntos de paso
+    en ejes del mundo (ver marco_mundo.py).
+"""
+import os
+import sys
+import io
+import math
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+import ordenes
+from marco_mundo import MARCO_CUERPO, MARCO_MUNDO, PosicionMundo, waypoints_mundo
+from compilador_rutas import EXTENSION_PLAN, cargar_plan, compilar_ruta
+from simulador import Simulador
+
+RUTAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Rutas")
+
+# Columnas de la tabla resumen
+COLUMNAS_RESUMEN = ["ruta", "segmentos", "exito", "t_medio_seg", "t_max_seg", "t_total", "error_xy", "error_alt"]
+
+# Altura (m) a partir de la cual se considera que un segmento empieza con el dron en el aire
+ALTURA_EN_VUELO = 0.05
+
+
+def listar_rutas(directorio=RUTAS_DIR, extensiones=(".txt",)):
+    """Devuelve la lista ordenada de archivos con las extensiones dadas de un directorio y sus subdirectorios."""
+    rutas = []
+    for raiz, _, archivos in os.walk(directorio):
+        for nombre in archivos:
+            if nombre.lower().endswith(extensiones):
+                rutas.append(os.path.join(raiz, nombre))
+    return sorted(rutas)
+
+
+def armar(sim):
+    """Arma el dron simulado igual que ordenes.main."""
+    sim.Script.SendRC(3, int(sim.Script.GetParam("RC3_MIN")), False)
+    sim.Script.SendRC(4, 2000, True)
+    sim.Script.Sleep(2000)
+    sim.Script.SendRC(4, 1500, True)
+
+
+def replay_ruta(file_path, parametros=None, semilla=0, ruido=None, move=None, marco=MARCO_CUERPO, compilar=False):
+    """
+    Ejecuta una ruta completa en un simulador nuevo.
+    Args:
+        file_path: Archivo de ruta (al menos las columnas opt_m_x, opt_m_y, opt_qua, yaw, alt) o plan compilado
+            (compilador_rutas.py), que se recorre siempre con MARCO_MUNDO.
+        parametros: Argumentos de move_drone; por defecto ordenes.PARAMETROS_RUTA.
+        semilla: Semilla del simulador.
+        ruido: Ruido de los sensores del simulador (ver simulador.RUIDO_POR_DEFECTO).
+        move: Función con la firma de move_drone a evaluar; por defecto ordenes.move_drone.
+        marco: MARCO_CUERPO o MARCO_MUNDO (objetivos como puntos de paso en ejes del mundo).
+        compilar: Si es True, las filas se compilan antes del vuelo con las tolerancias de 'parametros'
+            (compilador_rutas.compilar_ruta) y se recorre el plan resultante.
+    Returns:
+        resultado: Diccionario con las columnas de COLUMNAS_RESUMEN, más la duración de cada segmento
+            ('tiempos_seg') y si empezó en el aire ('en_vuelo_seg'), o con la clave 'error' si la ruta no es válida.
+    """
+    parametros = dict(ordenes.PARAMETROS_RUTA, **(parametros or {}))
+    move = move or ordenes.move_drone
+    nombre = os.path.relpath(file_path, RUTAS_DIR)
+
+    es_plan = file_path.endswith(EXTENSION_PLAN)
+    try:
+        puntos = cargar_plan(file_path) if es_plan else ordenes.read_variations(file_path)
+    except (ValueError, StopIteration) as e:
+        return {"ruta": nombre, "error": f"formato no válido ({e})"}
+    puntos = [p[:5] for p in puntos if len(p) >= 5 and not any(math.isnan(v) for v in p[:5])]
+    if not puntos:
+        return {"ruta": nombre, "error": "sin columnas yaw/alt"}
+    if compilar and not es_plan:
+        tolerancias = {k: parametros[k] for k in ("tolerance", "yaw_tolerance", "alt_tolerance")}
+        puntos = [p[:5] for p in compilar_ruta(puntos, **tolerancias)]
+        es_plan = True
+
+    # Con MARCO_MUNDO cada fila es un punto de paso (las menores que la tolerancia no lo mueven) y la posición se
+    # sigue durante toda la ruta; los puntos de un plan ya están en ejes del mundo
+    objetivos = [(p[0], p[1]) for p in puntos]
+    extra = {}
+    if es_plan:
+        marco = MARCO_MUNDO
+    if marco == MARCO_MUNDO:
+        if not es_plan:
+            objetivos = waypoints_mundo(puntos, parametros["tolerance"])
+        extra = {"marco": marco, "posicion": PosicionMundo()}
+
+    sim = Simulador(semilla=semilla, ruido=ruido)
+    sim.instalar(ordenes)
+    armar(sim)
+
+    tiempos = []
+    en_vuelo = []
+    exitos = 0
+    objetivo_x = objetivo_y = 0.0
+    # move_drone imprime el progreso de cada segmento; se descarta para no mezclar la salida de los procesos
+    with contextlib.redirect_stdout(io.StringIO()):
+        for (target_x, target_y), (_, _, target_qua, target_yaw, target_alt) in zip(objetivos, puntos):
+            inicio = sim.tiempo
+            en_vuelo.append(sim.vehiculo.z > ALTURA_EN_VUELO)
+            if move(target_x, target_y, target_qua, target_yaw, target_alt, **parametros, **extra):
+                exitos += 1
+            tiempos.append(sim.tiempo - inicio)
+            objetivo_x += target_x
+            objetivo_y += target_y
+
+    # Error final: flujo acumulado frente a la suma de los desplazamientos objetivo (con MARCO_MUNDO, posición
+    # seguida frente al último punto de paso), y altura frente a la última
+    vehiculo = sim.vehiculo
+    if marco == MARCO_MUNDO:
+        error_xy = math.hypot(extra["posicion"].x - target_x, extra["posicion"].y - target_y)
+    else:
+        error_xy = math.hypot(vehiculo.flow_x - objetivo_x, vehiculo.flow_y - objetivo_y)
+    return {
+        "ruta": nombre,
+        "segmentos": len(puntos),
+        "exito": exitos / len(puntos),
+        "t_medio_seg": sum(tiempos) / len(tiempos),
+        "t_max_seg": max(tiempos),
+        "t_total": sum(tiempos),
+        "error_xy": error_xy,
+        "error_alt": abs(vehiculo.z - puntos[-1][4]),
+        "tiempos_seg": tiempos,
+        "en_vuelo_seg": en_vuelo,
+    }
+
+
+def replay_corpus(rutas, parametros=None, procesos=None, semilla=0, ruido=None, marco=MARCO_CUERPO):
+    """
+    Ejecuta replay_ruta sobre varias rutas en paralelo.
+    Args:
+        rutas: Lista de archivos de ruta.
+        parametros: Argumentos de move_drone comunes a todas las rutas.
+        procesos: Número de procesos; por defecto tantos como núcleos.
+        semilla: Semilla del simulador.
+        ruido: Ruido de los sensores del simulador.
+        marco: MARCO_CUERPO o MARCO_MUNDO.
+    Returns:
+        resultados: Lista de diccionarios devueltos por replay_ruta, en el mismo orden que 'rutas'.
+    """
+    n = len(rutas)
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(replay_ruta, rutas, [parametros] * n, [semilla] * n, [ruido] * n, [None] * n,
+                             [marco] * n))
+
+
+def imprimir_resumen(resultados):
+    """Imprime la tabla resumen de una ejecución del corpus."""
+    print(f"{'ruta':<58} {'seg':>4} {'éxito':>6} {'t_med(s)':>9} {'t_max(s)':>9} {'t_tot(s)':>9} {'err_xy':>7} {'err_alt':>7}")
+    for r in resultados:
+        if "error" in r:
+            print(f"{r['ruta'][:58]:<58} omitida: {r['error']}")
+            continue
+        print(f"{r['ruta'][:58]:<58} {r['segmentos']:>4} {r['exito']:>6.0%} {r['t_medio_seg']:>9.2f} "
+              f"{r['t_max_seg']:>9.2f} {r['t_total']:>9.1f} {r['error_xy']:>7.3f} {r['error_alt']:>7.3f}")
+
+    validos = [r for r in resultados if "error" not in r]
+    if validos:
+        segmentos = sum(r["segmentos"] for r in validos)
+        exito = sum(r["exito"] * r["segmentos"] for r in validos) / segmentos
+        t_total = sum(r["t_total"] for r in validos)
+        print(f"Total: {len(validos)} rutas, {segmentos} segmentos, éxito {exito:.0%}, "
+              f"{t_total:.0f} s de vuelo simulado")
+
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if a != "--mundo"]
+    if len(argumentos) > 2:
+        print("Uso: python replay_rutas.py [directorio] [procesos] [--mundo]")
+        sys.exit(1)
+
+    directorio = argumentos[0] if len(argumentos) > 0 else RUTAS_DIR
+    procesos = int(argumentos[1]) if len(argumentos) > 1 else None
+    marco = MARCO_MUNDO if "--mundo" in sys.argv else MARCO_CUERPO
+
+    import time
+    inicio = time.perf_counter()
+    resultados = replay_corpus(listar_rutas(directorio), procesos=procesos, marco=marco)
+    imprimir_resumen(resultados)
+    print(f"Tiempo real: {time.perf_counter() - inicio:.1f} s")
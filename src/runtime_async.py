@@ -0,0 +1,345 @@
+"""
+Ejecución de una ruta con asyncio: la telemetría, el control, la salida RC y el registro son tareas independientes.
+    - Telemetría: lee 'cs' a su propia frecuencia y publica la última lectura en un UltimoValor.
+    - Control: a FRECUENCIA_CONTROL toma la última lectura, calcula los errores del segmento (ordenes.calcular_errores)
+      y publica los comandos RC en otro UltimoValor; nunca espera a las demás tareas.
+    - Salida RC: envía el último comando publicado con RCOutput (un mensaje por comando nuevo).
+    - Registro: vacía por lotes una cola acotada con las muestras y los mensajes de consola y los escribe en un hilo
+      del ejecutor, de modo que un archivo lento o un print largo no retrasan el ciclo de control. Si la cola está
+      llena, la muestra se descarta y se contabiliza.
+Las tareas usan el tiempo del bucle de asyncio (loop.time()). Con BucleVirtual ese tiempo es el reloj del simulador,
+así que la misma ejecución se puede probar contra el 'cs' y el 'Script' simulados (ejecutar_en_simulador) más
+rápido que en tiempo real.
+Solo usa la librería estándar; requiere un intérprete con asyncio (con IronPython se usa el bucle de ordenes.py).
+"""
+import asyncio
+import selectors
+
+from telemetria import TelemetryReader, formato_texto, tiempo_registro
+from salida_rc import RCOutput
+from controlador import ControladorVuelo
+from marco_mundo import MARCO_MUNDO, PosicionMundo
+import ordenes
+
+# Frecuencia (Hz) de lectura de la telemetría; el control usa ordenes.FRECUENCIA_CONTROL
+FRECUENCIA_TELEMETRIA = 50
+
+# Capacidad de la cola del registro (muestras y mensajes) y máximo de elementos escritos de una vez
+CAPACIDAD_REGISTRO = 1024
+LOTE_REGISTRO = 256
+
+# Tiempo real máximo (s) que BucleVirtual espera a un hilo cuando no hay ningún temporizador pendiente
+ESPERA_MAXIMA_HILOS = 10.0
+
+# Comando RC al terminar un segmento: se detienen X, Y y el yaw y se mantiene el throttle (None no cambia el canal)
+RC_DETENER = (1500, 1500, None, 1500)
+
+
+class UltimoValor:
+    """Ranura con el último valor publicado; los lectores pueden esperar a que haya uno más nuevo que el suyo."""
+
+    def __init__(self):
+        self.valor = None
+        self.version = 0
+        self._evento = asyncio.Event()
+
+    def publicar(self, valor):
+        """Sustituye el valor (sin bloquear) y despierta a quien lo esté esperando."""
+        self.valor = valor
+        self.version += 1
+        self._evento.set()
+
+    async def esperar(self, version):
+        """Espera a que la versión sea distinta de 'version'; devuelve (valor, versión)."""
+        while self.version == version:
+            self._evento.clear()
+            await self._evento.wait()
+        return self.valor, self.version
+
+
+class RegistroAsync:
+    """Registro con una cola acotada que una tarea vacía por lotes, escribiendo en un hilo del ejecutor."""
+
+    def __init__(self, salida=None, capacidad=CAPACIDAD_REGISTRO, formato=formato_texto, imprimir=print):
+        """
+        Args:
+            salida: Archivo de texto abierto donde se escriben las muestras, o None para no guardarlas.
+            capacidad: Elementos pendientes como máximo; los que no caben se descartan.
+            formato: Función que convierte una muestra en una línea de texto.
+            imprimir: Función con la que se muestran los mensajes de consola.
+        """
+        self.salida = salida
+        self.formato = formato
+        self.imprimir = imprimir
+        self.cola = asyncio.Queue(capacidad)
+        self.descartados = 0
+        self.escritas = 0
+
+    def push(self, muestra):
+        """Encola una muestra sin bloquear; devuelve False si se ha descartado por cola llena."""
+        return self._encolar((False, muestra))
+
+    def mensaje(self, texto):
+        """Encola un mensaje de consola sin bloquear."""
+        return self._encolar((True, texto))
+
+    def _encolar(self, elemento):
+        try:
+            self.cola.put_nowait(elemento)
+            return True
+        except asyncio.QueueFull:
+            self.descartados += 1
+            return False
+
+    def _escribir(self, lote):
+        """Escribe un lote (se ejecuta en un hilo del ejecutor)."""
+        lineas = []
+        for es_mensaje, contenido in lote:
+            if es_mensaje:
+                self.imprimir(contenido)
+            else:
+                lineas.append(self.formato(contenido))
+        if self.salida is not None and lineas:
+            self.salida.write("".join(lineas))
+            self.salida.flush()
+        self.escritas += len(lineas)
+
+    async def ejecutar(self):
+        """Tarea del registro: termina al recibir None, después de escribir todo lo anterior."""
+        loop = asyncio.get_running_loop()
+        terminar = False
+        while not terminar:
+            lote = [await self.cola.get()]
+            while len(lote) < LOTE_REGISTRO and not self.cola.empty():
+                lote.append(self.cola.get_nowait())
+            if lote[-1] is None:
+                lote.pop()
+                terminar = True
+            if lote:
+                await loop.run_in_executor(None, self._escribir, lote)
+
+    async def cerrar(self):
+        """Pide a la tarea que termine cuando haya vaciado la cola."""
+        await self.cola.put(None)
+
+
+class EstadisticasRuntime:
+    """Contadores de las tareas y retraso de los ciclos de control respecto a su plazo."""
+
+    def __init__(self, periodo_control):
+        self.periodo_control = periodo_control
+        self.lecturas = 0
+        self.lecturas_atrasadas = 0  # Lecturas de telemetría que empezaron después del plazo siguiente
+        self.ciclos = 0
+        self.retraso_total = 0.0
+        self.retraso_max = 0.0
+        self.ciclos_atrasados = 0    # Ciclos de control con más de medio periodo de retraso
+        self.comandos_rc = 0
+        self.descartados = 0
+
+    def ciclo(self, retraso):
+        self.ciclos += 1
+        self.retraso_total += retraso
+        self.retraso_max = max(self.retraso_max, retraso)
+        if retraso > self.periodo_control / 2:
+            self.ciclos_atrasados += 1
+
+    def resumen(self):
+        medio = self.retraso_total / self.ciclos if self.ciclos else 0.0
+        return (f"Runtime asyncio: {self.ciclos} ciclos de control (retraso medio {medio * 1000:.2f} ms, "
+                f"máx {self.retraso_max * 1000:.2f} ms, {self.ciclos_atrasados} con más de medio periodo), "
+                f"{self.lecturas} lecturas ({self.lecturas_atrasadas} atrasadas), {self.comandos_rc} comandos RC, "
+                f"{self.descartados} elementos del registro descartados")
+
+
+async def _dormir_hasta(loop, plazo):
+    """Duerme hasta el plazo (tiempo del bucle) y devuelve el retraso con el que se despierta."""
+    await asyncio.sleep(max(0.0, plazo - loop.time()))
+    return max(0.0, loop.time() - plazo)
+
+
+async def tarea_telemetria(reader, ranura, frecuencia, estadisticas):
+    """Lee 'cs' a 'frecuencia' Hz y publica cada lectura; si se atrasa, salta los plazos perdidos."""
+    loop = asyncio.get_running_loop()
+    periodo = 1.0 / frecuencia
+    plazo = loop.time()
+    while True:
+        ranura.publicar(reader.read())
+        estadisticas.lecturas += 1
+        plazo += periodo
+        if loop.time() > plazo:
+            estadisticas.lecturas_atrasadas += 1
+            plazo = loop.time()
+        await _dormir_hasta(loop, plazo)
+
+
+async def tarea_rc(ranura, rc, estadisticas):
+    """Envía cada comando nuevo (rc1, rc2, rc3, rc4) publicado en la ranura."""
+    version = 0
+    while True:
+        comandos, version = await ranura.esperar(version)
+        for canal, pwm in enumerate(comandos, 1):
+            if pwm is not None:
+                rc.set(canal, pwm)
+        rc.flush()
+        estadisticas.comandos_rc += 1
+
+
+async def tarea_control(objetivos, telemetria, ranura_rc, registro, controlador, parametros, marco, frecuencia,
+                        estadisticas):
+    """
+    Recorre los objetivos con la misma lógica que ordenes.move_drone (errores, tolerancias, max_duration y
+    registro de muestras), leyendo siempre la última lectura publicada.
+    Returns:
+        Lista con el booleano objetivo_alcanzado de cada segmento.
+    """
+    loop = asyncio.get_running_loop()
+    periodo = 1.0 / frecuencia
+    tolerance, yaw_tolerance = parametros["tolerance"], parametros["yaw_tolerance"]
+    alt_tolerance, max_duration = parametros["alt_tolerance"], parametros["max_duration"]
+    posicion = PosicionMundo() if marco == MARCO_MUNDO else None
+    await telemetria.esperar(0)
+    # Origen de la columna t del registro: la primera lectura publicada
+    t_inicio = telemetria.valor.t
+
+    resultados = []
+    for target_x, target_y, target_qua, target_yaw, target_alt in objetivos:
+        registro.mensaje(f"Moviendo a destino - Var X: {target_x}, Var Y: {target_y}, Yaw: {target_yaw}, "
+                         f"Alt: {target_alt}")
+        snap = telemetria.valor
+        init_flow_x, init_flow_y = snap.opt_m_x, snap.opt_m_y
+        if posicion is not None:
+            posicion.actualizar(snap)
+        controlador.reiniciar()
+        t_previo = None
+        objetivo_alcanzado = False
+        inicio = plazo = loop.time()
+
+        while True:
+            if (loop.time() - inicio) * 1000 > max_duration:
+                registro.mensaje("Tiempo máximo superado. Se aborta el segmento.")
+                # Los puntos de paso siguientes parten de donde está el dron, como en MARCO_CUERPO
+                if posicion is not None:
+                    posicion.reanclar(target_x, target_y)
+                break
+
+            snap = telemetria.valor
+            error_x, error_y, error_yaw, error_alt = ordenes.calcular_errores(
+                snap, target_x, target_y, target_yaw, target_alt, init_flow_x, init_flow_y, marco, posicion)
+
+            if (abs(error_x) < tolerance and abs(error_y) < tolerance and abs(error_yaw) < yaw_tolerance
+                    and abs(error_alt) < alt_tolerance):
+                objetivo_alcanzado = True
+                registro.mensaje("Posición y yaw objetivo alcanzados.")
+                registro.push((snap.opt_m_x, snap.opt_m_y, snap.opt_qua, snap.yaw, snap.sonarrange,
+                               snap.battery_voltage, objetivo_alcanzado, tiempo_registro(snap.t - t_inicio)))
+                break
+
+            dt = snap.t - t_previo if t_previo is not None and snap.t > t_previo else periodo
+            t_previo = snap.t
+            ranura_rc.publicar(controlador.actualizar(error_x, error_y, error_yaw, error_alt, dt))
+            registro.push((snap.opt_m_x, snap.opt_m_y, target_qua, snap.yaw, snap.sonarrange, snap.battery_voltage,
+                           objetivo_alcanzado, tiempo_registro(snap.t - t_inicio)))
+
+            plazo += periodo
+            estadisticas.ciclo(await _dormir_hasta(loop, plazo))
+
+        ranura_rc.publicar(RC_DETENER)
+        resultados.append(objetivo_alcanzado)
+    return resultados
+
+
+async def recorrer_ruta(objetivos, cs, Script, log_file=None, parametros=None, marco=None, controlador=None,
+                        frecuencia_telemetria=FRECUENCIA_TELEMETRIA, frecuencia_control=ordenes.FRECUENCIA_CONTROL,
+                        imprimir=print):
+    """
+    Recorre una lista de objetivos (x, y, qua, yaw, alt) con las cuatro tareas.
+    Args:
+        cs, Script: Objetos de Mission Planner (o del simulador).
+        log_file: Archivo de texto abierto donde se registran las muestras (con cabecera ya escrita), o None.
+        parametros: Argumentos de move_drone (tolerancias y max_duration); por defecto ordenes.PARAMETROS_RUTA.
+        marco: MARCO_MUNDO (objetivos como puntos de paso) o MARCO_CUERPO; por defecto ordenes.MARCO_OBJETIVOS, el
+            mismo con el que ordenes.main recorre las filas de una ruta con move_drone.
+        controlador: ControladorVuelo; si no se indica, se crea uno con las ganancias de ganancias_pid.json.
+        imprimir: Función con la que el registro muestra los mensajes.
+    Returns:
+        (resultados, estadisticas): objetivo_alcanzado de cada segmento y EstadisticasRuntime.
+    """
+    loop = asyncio.get_running_loop()
+    parametros = dict(ordenes.PARAMETROS_RUTA, **(parametros or {}))
+    marco = marco or ordenes.MARCO_OBJETIVOS
+    controlador = controlador or ControladorVuelo()
+    estadisticas = EstadisticasRuntime(1.0 / frecuencia_control)
+
+    telemetria = UltimoValor()
+    ranura_rc = UltimoValor()
+    registro = RegistroAsync(log_file, imprimir=imprimir)
+    reader = TelemetryReader(cs, reloj=loop.time)
+    rc = RCOutput(Script, reloj=loop.time)
+
+    auxiliares = [asyncio.ensure_future(tarea_telemetria(reader, telemetria, frecuencia_telemetria, estadisticas)),
+                  asyncio.ensure_future(tarea_rc(ranura_rc, rc, estadisticas))]
+    tarea_registro = asyncio.ensure_future(registro.ejecutar())
+    try:
+        resultados = await tarea_control(objetivos, telemetria, ranura_rc, registro, controlador, parametros, marco,
+                                         frecuencia_control, estadisticas)
+        # Dar a la salida RC la ocasión de enviar el comando de parada
+        await asyncio.sleep(0)
+    finally:
+        for tarea in auxiliares:
+            tarea.cancel()
+        await asyncio.gather(*auxiliares, return_exceptions=True)
+        await registro.cerrar()
+        await tarea_registro
+    estadisticas.descartados = registro.descartados
+    return resultados, estadisticas
+
+
+def ejecutar_ruta(objetivos, cs, Script, **opciones):
+    """Ejecuta recorrer_ruta en un bucle de asyncio nuevo (opciones: las de recorrer_ruta)."""
+    return asyncio.run(recorrer_ruta(objetivos, cs, Script, **opciones))
+
+
+class _SelectorVirtual(selectors.SelectSelector):
+    """Selector que, en lugar de esperar hasta el siguiente temporizador, avanza el reloj simulado."""
+
+    def __init__(self, avanzar):
+        super().__init__()
+        self._avanzar = avanzar
+
+    def select(self, timeout=None):
+        eventos = super().select(0)
+        if eventos or timeout == 0:
+            return eventos
+        if timeout is None:
+            # Sin temporizadores solo puede despertar al bucle un hilo (por ejemplo, el del registro)
+            eventos = super().select(ESPERA_MAXIMA_HILOS)
+            if not eventos:
+                raise RuntimeError("Bucle virtual bloqueado: ninguna tarea espera un temporizador ni un hilo")
+            return eventos
+        self._avanzar(timeout)
+        return super().select(0)
+
+
+class BucleVirtual(asyncio.SelectorEventLoop):
+    """Bucle de asyncio cuyo tiempo es el de un simulador.RelojSimulado (avanza solo cuando el bucle espera)."""
+
+    def __init__(self, reloj):
+        self._reloj = reloj
+        # Avanzar al menos medio paso del modelo para que un plazo a menos de dt no deje el reloj parado
+        super().__init__(_SelectorVirtual(lambda segundos: reloj.sleep(max(segundos, reloj.dt * 0.5))))
+
+    def time(self):
+        return self._reloj.monotonic()
+
+
+def ejecutar_en_simulador(sim, objetivos, **opciones):
+    """
+    Ejecuta recorrer_ruta contra el 'cs' y el 'Script' de un simulador.Simulador con el tiempo simulado.
+    El dron debe estar ya armado (por ejemplo, con replay_rutas.armar).
+    """
+    loop = BucleVirtual(sim.reloj)
+    try:
+        return loop.run_until_complete(recorrer_ruta(objetivos, sim.cs, sim.Script, **opciones))
+    finally:
+        loop.close()
@@ -1,72 +1,184 @@
 """
 Script para recoger datos del dron y guardarlos en un archivo de texto.
+Cada muestra lleva en la última columna (t) el tiempo monótono (s) desde el inicio del registro. El registro termina
+según MODO_PARADA: al desarmar el dron, tras N_MUESTRAS muestras o tras DURACION segundos.
+Las muestras se escriben por lotes desde un hilo aparte y por consola solo se imprime una línea de estado cada
+INTERVALO_ESTADO segundos, de forma que se puede muestrear a 50-100 Hz sin que la escritura retrase el bucle.
 """
 import time
 import os
+import sys
 from datetime import datetime
 
+# Permitir importar los módulos comunes de src/
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from telemetria import TelemetrySink, TelemetryReader, SalidaUDP, tiempo_registro
+from planificador import FixedRateScheduler
+
+# Frecuencia de muestreo (Hz). Por defecto la del registro original, 2 Hz: ordenes.main convierte cada fila en un
+# segmento de move_drone, así que un registro a 50 Hz daría 25 veces más segmentos. Se puede subir hasta 100 Hz
+# para capturas de alta frecuencia (análisis, visor_vivo.py) que no se vayan a reproducir fila a fila
+FRECUENCIA_MUESTREO = 2
+
+# Condición de parada del registro: "desarme", "muestras" o "duracion"; por defecto 10 s como el registro
+# original (20 muestras a 2 Hz)
+MODO_PARADA = "duracion"
+# Número de muestras del modo "muestras" (10 s a FRECUENCIA_MUESTREO)
+N_MUESTRAS = 10 * FRECUENCIA_MUESTREO
+# Duración (s) del modo "duracion"
+DURACION = 10.0
+
+# Si es True, se espera a que el dron esté armado antes de empezar (necesario en el modo "desarme")
+ESPERAR_ARMADO = False
+
+# Tiempo máximo (s) que una muestra espera en el buffer antes de escribirse; bajo para que el visor en vivo
+# (visor_vivo.py) la muestre con poco retraso
+INTERVALO_ESCRITURA = 0.05
+
+# Capacidad del buffer de escritura (muestras): 20 s a 100 Hz antes de empezar a descartar
+CAPACIDAD_BUFFER = 2048
+
+# Periodo (s) de la línea de estado por consola
+INTERVALO_ESTADO = 1.0
+
+# Dirección (host, puerto) a la que se envían también las muestras para el visor en vivo, o None
+VISOR_UDP = None
+
+MODOS_PARADA = ("desarme", "muestras", "duracion")
+
+CABECERA = "opt_m_x, opt_m_y, opt_qua, yaw, alt, battery_V, t"
+
+
+class EstadoRegistro:
+    """Contadores del registro para la línea de estado y el resumen final."""
+
+    def __init__(self):
+        self.muestras = 0       # Muestras leídas y entregadas al buffer
+        self.duracion = 0.0     # Tiempo (s) entre la primera y la última muestra
+        self.escritas = 0       # Muestras escritas en la salida
+        self.descartadas = 0    # Muestras descartadas por buffer lleno
+        self.overruns = 0       # Ciclos que terminaron después de su plazo
+        self.plazos_perdidos = 0
+
+    @property
+    def frecuencia(self):
+        """Frecuencia media sostenida (Hz) desde la primera muestra."""
+        return (self.muestras - 1) / self.duracion if self.duracion > 0 else 0.0
+
+    def linea(self):
+        return (f"{self.muestras} muestras, {self.duracion:.1f} s, {self.frecuencia:.1f} Hz, "
+                f"{self.escritas} escritas, {self.descartadas} descartadas, {self.overruns} overruns")
+
+
+def registrar(cs, salida, frecuencia=FRECUENCIA_MUESTREO, modo=MODO_PARADA, n_muestras=N_MUESTRAS,
+              duracion=DURACION, reloj=None, dormir=None, imprimir=print, intervalo_estado=INTERVALO_ESTADO):
+    """
+    Registra muestras de 'cs' a frecuencia fija hasta que se cumple la condición de parada.
+    Args:
+        cs: Objeto 'cs' de Mission Planner (o del simulador).
+        salida: Archivo de texto abierto (o SalidaUDP) en el que se escriben las filas, sin la cabecera.
+        frecuencia: Frecuencia de muestreo (Hz).
+        modo: "desarme" (hasta que cs.armed sea False), "muestras" (n_muestras) o "duracion" (duracion segundos).
+        reloj, dormir: Reloj monótono y función de espera; por defecto time.monotonic y time.sleep.
+        imprimir: Función que muestra la línea de estado.
+        intervalo_estado: Periodo (s) de la línea de estado.
+    Returns:
+        EstadoRegistro con los contadores al terminar.
+    """
+    if modo not in MODOS_PARADA:
+        raise ValueError(f"Modo de parada desconocido: {modo}; debe ser uno de {MODOS_PARADA}.")
+    reloj = reloj or time.monotonic
+    dormir = dormir or time.sleep
+    estado = EstadoRegistro()
+
+    # Las muestras se escriben desde un hilo aparte para no retrasar el muestreo
+    sink = TelemetrySink(salida, capacidad=CAPACIDAD_BUFFER, intervalo_flush=INTERVALO_ESCRITURA)
+
+    # Lectura de la telemetría: todos los campos se leen de 'cs' una sola vez por muestra
+    reader = TelemetryReader(cs, reloj=reloj)
+
+    # Muestreo a frecuencia fija con plazos absolutos sobre un reloj monótono
+    scheduler = FixedRateScheduler(frecuencia, reloj=reloj, dormir=dormir)
+    scheduler.start()
+    siguiente_estado = intervalo_estado
+
+    try:
+        while True:
+            if modo == "desarme" and not cs.armed:
+                break
+
+            # Obtener las variables opt_m_x, opt_m_y, opt_qua, yaw, alt (sonarrange) y battery_voltage del estado
+            snap = reader.read()
+            t = snap.t - reader.t_inicio
+
+            # Guardar la muestra para escribirla en el archivo
+            sink.push((snap.opt_m_x, snap.opt_m_y, snap.opt_qua, snap.yaw, snap.sonarrange, snap.battery_voltage,
+                       tiempo_registro(t)))
+            estado.muestras += 1
+            estado.duracion = t
+
+            if t >= siguiente_estado:
+                estado.escritas, estado.descartadas = sink.written, sink.dropped
+                estado.overruns = scheduler.overruns
+                imprimir(estado.linea())
+                siguiente_estado += intervalo_estado
+
+            if modo == "muestras" and estado.muestras >= n_muestras:
+                break
+            # Medio periodo de margen para que el redondeo del reloj no añada una muestra de más
+            if modo == "duracion" and t + scheduler.periodo / 2 >= duracion:
+                break
+
+            # Esperar al plazo de la siguiente lectura
+            scheduler.wait()
+    finally:
+        # Escribir las muestras pendientes
+        sink.close()
+
+    estado.escritas, estado.descartadas = sink.written, sink.dropped
+    estado.overruns, estado.plazos_perdidos = scheduler.overruns, scheduler.plazos_perdidos
+    return estado
+
+
 def main(file_name):
     """
     Función principal que recoge datos del dron y los guarda en un archivo de texto.
     Args:
         file_name: Nombre del archivo donde se guardarán los datos.
     """
-    
-    # Obtener la ruta del directorio actual del script 
+
+    # Obtener la ruta del directorio actual del script
     current_dir = os.path.dirname(os.path.abspath(__file__))
 
     # Ruta completa al archivo
     file_path = os.path.join(current_dir, "..\\Rutas", file_name)
 
     # Comprobar que el dron está armado antes de empezar a recoger datos
-    # Descomentar las siguientes líneas si se quiere esperar a que el dron esté armado, 
-    # o si se va a realizar una ruta volando
-    #
-    # while True:
-    #        armed = cs.armed  
-    #        if armed == True:
-    #            break
-    #        print("El dron no esta armado")
-    #        Script.Sleep(1000)
-    
+    if ESPERAR_ARMADO or MODO_PARADA == "desarme":
+        while not cs.armed:
+            print("El dron no esta armado")
+            Script.Sleep(1000)
+
     with open(file_path, 'w') as file:
-        file.write('opt_m_x, opt_m_y, opt_qua, yaw, alt, battery_V\n')  # Encabezado del archivo
-        
-        print("opt_m_x, opt_m_y, opt_qua, yaw, alt, battery_V\n")
-            
-        # Desconmentar la siguiente línea si se quiere realizar una ruta completa con el dron volando
-        # while cs.armed:
-        
-        # Comentar las siguientes líneas si se quiere realizar una ruta completa con el dron volando
-        i = 20
-        while i > 0:
-            
-            # Obtener la variable 'opt_m_x' del estado
-            opt_m_x = cs.opt_m_x
-            # Obtener la variable 'opt_m_y' del estado
-            opt_m_y = cs.opt_m_y
-            # Obtener la variable 'opt_qua' del estado
-            opt_qua = cs.opt_qua
-            # Obtener la variable 'yaw' del estado
-            yaw = cs.yaw
-            # Obtener la variable 'alt' del estado
-            alt = cs.sonarrange
-            # Obtener la variable 'batery_voltage' del estado
-            battery = cs.battery_voltage
-
-            print(f'{opt_m_x}, {opt_m_y}, {opt_qua}, {yaw}, {alt}, {battery}')
-            
-            # Escribir los datos en el archivo
-            file.write(f'{opt_m_x}, {opt_m_y}, {opt_qua}, {yaw}, {alt}, {battery}\n')
-            
-            # Esperar un intervalo de tiempo antes de la siguiente lectura (p.ej., 1 segundo)
-            time.sleep(0.5)
-            i -= 1
-            
+        file.write(CABECERA + '\n')  # Encabezado del archivo
+
+        print(f"Registrando {CABECERA} a {FRECUENCIA_MUESTREO} Hz en {file_name}")
+
+        salida = SalidaUDP(VISOR_UDP, file) if VISOR_UDP else file
+        try:
+            estado = registrar(cs, salida)
+        finally:
+            if VISOR_UDP:
+                salida.close()
+
+    print(f"Registro terminado: {estado.linea()}")
+
 
 
 # Generar el nombre del archivo con la fecha actual
 current_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")  # Formato: Año-Mes-Día_Hora-Minuto-Segundo
 file_name = f"ruta_{current_date}.txt"
 
-main(file_name)
+# Mission Planner define 'cs' y 'Script' al ejecutar el script; al importarlo desde otro módulo no se registra nada
+if "Script" in globals():
+    main(file_name)
@@ -0,0 +1,92 @@
+"""
+Capa de salida RC que agrupa en un único mensaje de override todos los canales modificados en un ciclo de control.
+Script.SendRC(canal, valor, False) solo actualiza el valor del canal en Mission Planner; con True, además, se envía
+el mensaje de override con todos los canales. Por eso en cada ciclo solo el último canal se envía con True.
+Solo usa la librería estándar para poder ejecutarse dentro de Mission Planner.
+"""
+import time
+
+# Periodo (s) con el que se reenvían los canales aunque no cambien, para que el override no caduque
+KEEP_ALIVE_RC = 1.0
+
+
+class RCOutput:
+    """
+    Acumula los valores de los canales RC de un ciclo y los envía juntos con flush().
+    Los canales cuyo valor no ha cambiado desde el último envío no se reenvían, salvo cuando vence el keep-alive.
+    """
+
+    def __init__(self, script, keep_alive=KEEP_ALIVE_RC, reloj=None, agrupar=True):
+        """
+        Args:
+            script: Objeto Script de Mission Planner (o del simulador).
+            keep_alive: Periodo (s) de reenvío de todos los canales; None para no reenviar nunca.
+            reloj: Función que devuelve un tiempo monótono en segundos; por defecto time.monotonic.
+            agrupar: Si es False, cada set() se envía inmediatamente con su propio mensaje (comportamiento original).
+        """
+        self.script = script
+        self.keep_alive = keep_alive
+        self.reloj = reloj or getattr(time, "monotonic", time.time)
+        self.agrupar = agrupar
+
+        self.mensajes = 0       # Mensajes de override enviados
+        self.omitidos = 0       # Canales no enviados por no haber cambiado
+        self._pendientes = {}   # canal -> valor del ciclo actual
+        self._enviados = {}     # canal -> último valor enviado
+        self._inicio = self.reloj()
+        self._ultimo_envio = None
+
+    def set(self, canal, valor):
+        """Fija el valor de un canal para el ciclo actual."""
+        valor = int(valor)
+        if not self.agrupar:
+            self.script.SendRC(canal, valor, True)
+            self._enviados[canal] = valor
+            self.mensajes += 1
+            return
+        self._pendientes[canal] = valor
+
+    def flush(self):
+        """
+        Envía en un único mensaje los canales que han cambiado en este ciclo.
+        Returns:
+            True si se ha enviado un mensaje.
+        """
+        if not self.agrupar:
+            return False
+
+        ahora = self.reloj()
+        refrescar = (self.keep_alive is not None and self._ultimo_envio is not None
+                     and ahora - self._ultimo_envio >= self.keep_alive)
+
+        if refrescar:
+            # Reenviar todos los canales conocidos con su último valor
+            cambios = dict(self._enviados)
+            cambios.update(self._pendientes)
+        else:
+            cambios = {}
+            for canal, valor in self._pendientes.items():
+                if self._enviados.get(canal) != valor:
+                    cambios[canal] = valor
+                else:
+                    self.omitidos += 1
+        self._pendientes.clear()
+
+        if not cambios:
+            return False
+
+        canales = list(cambios.items())
+        for canal, valor in canales[:-1]:
+            self.script.SendRC(canal, valor, False)
+        canal, valor = canales[-1]
+        self.script.SendRC(canal, valor, True)
+
+        self._enviados.update(cambios)
+        self._ultimo_envio = ahora
+        self.mensajes += 1
+        return True
+
+    def mensajes_por_segundo(self):
+        """Mensajes de override enviados por segundo desde la creación del objeto."""
+        transcurrido = self.reloj() - self._inicio
+        return self.mensajes / transcurrido if transcurrido > 0 else 0.0
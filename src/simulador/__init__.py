@@ -0,0 +1,67 @@
+"""
+Simulador local que sustituye a Mission Planner y al dron para ejecutar los scripts de vuelo sin hardware.
+
+Uso desde código:
+    sim = Simulador(semilla=0)
+    sim.instalar(ordenes)           # Inyecta cs, Script y time en el módulo
+    ordenes.move_drone(...)
+
+Uso desde la línea de comandos (ejecuta un script de Mission Planner en el simulador):
+    python -m simulador <script.py>
+"""
+import sys
+
+from .vehiculo import VehiculoSimulado, PARAMETROS_POR_DEFECTO
+from .mission_planner import EstadoCS, ScriptSimulado, RelojSimulado, RUIDO_POR_DEFECTO
+
+
+class Simulador:
+    """Agrupa el vehículo simulado y los objetos cs, Script y time que usan los scripts de vuelo."""
+
+    def __init__(self, semilla=None, ruido=None, dt=0.01, modo="STABILIZE", **parametros):
+        """
+        Args:
+            semilla: Semilla del generador aleatorio del ruido.
+            ruido: Diccionario con la desviación típica de cada sensor (ver RUIDO_POR_DEFECTO).
+            dt: Paso de integración del modelo (s).
+            modo: Modo de vuelo inicial.
+            parametros: Parámetros del vehículo (ver PARAMETROS_POR_DEFECTO).
+        """
+        ruido = dict(RUIDO_POR_DEFECTO, **(ruido or {}))
+        self.vehiculo = VehiculoSimulado(semilla=semilla, ruido_flujo=ruido["flujo"], **parametros)
+        self.reloj = RelojSimulado(self.vehiculo, dt=dt)
+        self.cs = EstadoCS(self.vehiculo, ruido, modo=modo)
+        self.Script = ScriptSimulado(self.vehiculo, self.reloj, self.cs)
+
+    @property
+    def tiempo(self):
+        """Tiempo simulado transcurrido (s)."""
+        return self.vehiculo.tiempo
+
+    def instalar(self, modulo):
+        """Inyecta cs, Script y el reloj simulado (como 'time') en un módulo ya importado."""
+        modulo.cs = self.cs
+        modulo.Script = self.Script
+        modulo.time = self.reloj
+
+    def ejecutar_script(self, file_path):
+        """
+        Ejecuta un script de Mission Planner con cs y Script inyectados.
+        Durante la ejecución 'import time' devuelve el reloj simulado.
+        """
+        with open(file_path, encoding="utf-8") as f:
+            codigo = compile(f.read(), file_path, "exec")
+
+        globales = {"__name__": "__mission_planner__", "__file__": file_path,
+                    "cs": self.cs, "Script": self.Script}
+        time_real = sys.modules["time"]
+        sys.modules["time"] = self.reloj
+        try:
+            exec(codigo, globales)
+        finally:
+            sys.modules["time"] = time_real
+        return globales
+
+
+__all__ = ["Simulador", "VehiculoSimulado", "EstadoCS", "ScriptSimulado", "RelojSimulado",
+           "PARAMETROS_POR_DEFECTO", "RUIDO_POR_DEFECTO"]
@@ -0,0 +1,21 @@
+"""
+Ejecuta un script de Mission Planner en el simulador e informa del tiempo simulado y real.
+Uso: python -m simulador <script.py> [semilla]
+"""
+import sys
+import time
+
+from . import Simulador
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Uso: python -m simulador <script.py> [semilla]")
+        sys.exit(1)
+
+    sim = Simulador(semilla=int(sys.argv[2]) if len(sys.argv) == 3 else None)
+    inicio = time.perf_counter()
+    sim.ejecutar_script(sys.argv[1])
+    real = time.perf_counter() - inicio
+
+    print(f"Tiempo simulado: {sim.tiempo:.1f} s, tiempo real: {real:.2f} s "
+          f"(x{sim.tiempo / max(real, 1e-9):.0f} más rápido que el tiempo real)")
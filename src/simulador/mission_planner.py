@@ -0,0 +1,152 @@
+"""
+Sustitutos de los objetos 'cs' y 'Script' que Mission Planner inyecta en los scripts,
+y de un reloj cuyo tiempo avanza con la simulación en lugar de con el tiempo real.
+"""
+import time as _time_real
+
+from .vehiculo import PWM_MIN, PWM_MAX
+
+# Desviación típica del ruido de cada sensor
+RUIDO_POR_DEFECTO = {
+    "flujo": 0.0,    # Ruido del flujo óptico por metro recorrido
+    "yaw": 0.0,      # Grados
+    "sonar": 0.0,    # Metros
+    "baro": 0.0,     # Metros
+    "calidad": 0.0,  # Unidades de opt_qua
+}
+
+# Parámetros que devuelve GetParam si no se han cambiado
+PARAMETROS_MP_POR_DEFECTO = {
+    "RC1_MIN": PWM_MIN, "RC1_MAX": PWM_MAX,
+    "RC2_MIN": PWM_MIN, "RC2_MAX": PWM_MAX,
+    "RC3_MIN": PWM_MIN, "RC3_MAX": PWM_MAX,
+    "RC4_MIN": PWM_MIN, "RC4_MAX": PWM_MAX,
+    "ARMING_CHECK": 1,
+}
+
+# Alcance máximo del sensor ToF (m); por encima devuelve el máximo
+ALCANCE_SONAR = 4.0
+
+
+class RelojSimulado:
+    """
+    Reloj de la simulación con la misma interfaz que el módulo time.
+    sleep() avanza el modelo del vehículo en lugar de esperar, por lo que la simulación es más rápida que el tiempo real.
+    """
+
+    def __init__(self, vehiculo, dt=0.01, epoca=None):
+        """
+        Args:
+            vehiculo: VehiculoSimulado que se avanza con el tiempo.
+            dt: Paso de integración del modelo (s).
+            epoca: Valor de time() al inicio de la simulación; por defecto el tiempo real actual.
+        """
+        self.vehiculo = vehiculo
+        self.dt = dt
+        self.epoca = _time_real.time() if epoca is None else epoca
+        self._pendiente = 0.0
+
+    def sleep(self, segundos):
+        """Avanza la simulación 'segundos' segundos en pasos de dt."""
+        self._pendiente += max(0.0, segundos)
+        while self._pendiente >= self.dt * 0.5:
+            paso = min(self.dt, self._pendiente)
+            self.vehiculo.step(paso)
+            self._pendiente -= paso
+
+    def monotonic(self):
+        return self.vehiculo.tiempo
+
+    def perf_counter(self):
+        return self.vehiculo.tiempo
+
+    def time(self):
+        return self.epoca + self.vehiculo.tiempo
+
+    def __getattr__(self, nombre):
+        # El resto de funciones del módulo time (strftime, localtime...) se delegan en el real
+        return getattr(_time_real, nombre)
+
+
+class EstadoCS:
+    """Sustituto de 'cs' (estado actual del dron) con ruido configurable en los sensores."""
+
+    def __init__(self, vehiculo, ruido=None, modo="STABILIZE"):
+        """
+        Args:
+            vehiculo: VehiculoSimulado del que se leen los valores.
+            ruido: Diccionario con la desviación típica de cada sensor (ver RUIDO_POR_DEFECTO).
+            modo: Modo de vuelo inicial.
+        """
+        self._vehiculo = vehiculo
+        self._ruido = dict(RUIDO_POR_DEFECTO, **(ruido or {}))
+        self.mode = modo
+
+    def _gauss(self, sensor):
+        sigma = self._ruido[sensor]
+        return self._vehiculo.rng.gauss(0.0, sigma) if sigma else 0.0
+
+    @property
+    def opt_m_x(self):
+        return self._vehiculo.flow_x
+
+    @property
+    def opt_m_y(self):
+        return self._vehiculo.flow_y
+
+    @property
+    def opt_qua(self):
+        return max(0, min(255, int(round(100 + self._gauss("calidad")))))
+
+    @property
+    def yaw(self):
+        return (self._vehiculo.yaw + self._gauss("yaw")) % 360.0
+
+    @property
+    def sonarrange(self):
+        return max(0.0, min(ALCANCE_SONAR, self._vehiculo.z + self._gauss("sonar")))
+
+    @property
+    def alt(self):
+        return self._vehiculo.z + self._gauss("baro")
+
+    @property
+    def battery_voltage(self):
+        return self._vehiculo.bateria
+
+    @property
+    def armed(self):
+        return self._vehiculo.armed
+
+
+class ScriptSimulado:
+    """Sustituto de 'Script' con SendRC, Sleep, GetParam, ChangeParam y ChangeMode."""
+
+    def __init__(self, vehiculo, reloj, cs):
+        self._vehiculo = vehiculo
+        self._reloj = reloj
+        self._cs = cs
+        self.parametros = dict(PARAMETROS_MP_POR_DEFECTO)
+        self.mensajes_rc = 0  # Número de mensajes de override RC enviados (SendRC con sendnow=True)
+
+    def SendRC(self, canal, pwm, sendnow):
+        """Fija el valor de un canal RC; con sendnow=True se cuenta un mensaje de override."""
+        self._vehiculo.set_rc(canal, pwm)
+        if sendnow:
+            self.mensajes_rc += 1
+        return True
+
+    def Sleep(self, ms):
+        """Espera 'ms' milisegundos de tiempo simulado."""
+        self._reloj.sleep(ms / 1000.0)
+
+    def GetParam(self, nombre):
+        return self.parametros.get(nombre, 0)
+
+    def ChangeParam(self, nombre, valor):
+        self.parametros[nombre] = valor
+        return True
+
+    def ChangeMode(self, modo):
+        self._cs.mode = modo
+        return True
@@ -0,0 +1,139 @@
+"""
+Modelo simplificado de un cuadricóptero como masa puntual.
+Convierte los canales RC 1-4 en movimiento y acumula el flujo óptico en ejes del cuerpo,
+que es lo que move_drone compara con los objetivos de cada segmento.
+"""
+import math
+import random
+
+# Valores PWM de referencia de los canales RC
+PWM_MIN = 1000
+PWM_CENTRO = 1500
+PWM_MAX = 2000
+
+# Parámetros por defecto del modelo
+PARAMETROS_POR_DEFECTO = {
+    "v_max_xy": 1.0,          # Velocidad horizontal con el stick al máximo (m/s)
+    "tau_xy": 0.4,            # Constante de tiempo de la respuesta horizontal (s)
+    "v_max_z": 1.0,           # Velocidad vertical con el throttle al máximo o al mínimo (m/s)
+    "tau_z": 0.3,             # Constante de tiempo de la respuesta vertical (s)
+    "yaw_rate_max": 90.0,     # Velocidad de giro con el stick de yaw al máximo (grados/s)
+    "tiempo_armado": 1.0,     # Tiempo que hay que mantener la combinación de sticks para armar o desarmar (s)
+    "bateria_inicial": 16.8,  # Voltaje de la batería al inicio (V)
+    "consumo_reposo": 0.0005, # Caída de voltaje por segundo con los motores armados (V/s)
+    "consumo_throttle": 0.002,# Caída adicional de voltaje por segundo a throttle máximo (V/s)
+}
+
+
+class VehiculoSimulado:
+    """
+    Estado y dinámica del dron simulado.
+    Posición (x, y) en ejes del mundo y (flow_x, flow_y) en ejes del cuerpo; z es la altura sobre el suelo.
+    Convención de los canales (la misma que usa move_drone):
+        RC2 > 1500 aumenta flow_x, RC1 > 1500 aumenta flow_y,
+        RC3 > 1500 asciende y RC3 < 1500 desciende, RC4 > 1500 aumenta el yaw.
+    """
+
+    def __init__(self, semilla=None, ruido_flujo=0.0, **parametros):
+        """
+        Args:
+            semilla: Semilla del generador aleatorio del ruido.
+            ruido_flujo: Desviación típica del ruido del flujo óptico por metro recorrido.
+            parametros: Valores que sustituyen a los de PARAMETROS_POR_DEFECTO.
+        """
+        desconocidos = set(parametros) - set(PARAMETROS_POR_DEFECTO)
+        if desconocidos:
+            raise ValueError(f"Parámetros del vehículo desconocidos: {sorted(desconocidos)}")
+        self.parametros = dict(PARAMETROS_POR_DEFECTO, **parametros)
+        self.rng = random.Random(semilla)
+        self.ruido_flujo = ruido_flujo
+
+        self.tiempo = 0.0
+        self.x = 0.0
+        self.y = 0.0
+        self.z = 0.0
+        self.yaw = 0.0           # Grados en [0, 360)
+        self.v_cuerpo_x = 0.0    # Velocidad en ejes del cuerpo (m/s)
+        self.v_cuerpo_y = 0.0
+        self.v_z = 0.0
+        self.flow_x = 0.0        # Flujo óptico acumulado en ejes del cuerpo (m)
+        self.flow_y = 0.0
+        self.bateria = self.parametros["bateria_inicial"]
+        self.armed = False
+        self.rc = {1: PWM_CENTRO, 2: PWM_CENTRO, 3: PWM_MIN, 4: PWM_CENTRO}
+
+        self._tiempo_sticks_armado = 0.0
+        self._tiempo_sticks_desarmado = 0.0
+
+    def set_rc(self, canal, pwm):
+        """Fija el valor PWM de un canal RC, limitado a [PWM_MIN, PWM_MAX]."""
+        self.rc[canal] = max(PWM_MIN, min(PWM_MAX, int(pwm)))
+
+    def _stick(self, canal):
+        """Valor normalizado [-1, 1] de un canal RC respecto al centro."""
+        return (self.rc.get(canal, PWM_CENTRO) - PWM_CENTRO) / float(PWM_CENTRO - PWM_MIN)
+
+    def _actualizar_armado(self, dt):
+        """Arma con throttle al mínimo y yaw a la derecha; desarma con throttle al mínimo y yaw a la izquierda en el suelo."""
+        throttle_min = self.rc[3] <= PWM_MIN + 50
+        if throttle_min and self.rc[4] >= PWM_MAX - 100:
+            self._tiempo_sticks_armado += dt
+        else:
+            self._tiempo_sticks_armado = 0.0
+        if throttle_min and self.rc[4] <= PWM_MIN + 100 and self.z < 0.2:
+            self._tiempo_sticks_desarmado += dt
+        else:
+            self._tiempo_sticks_desarmado = 0.0
+
+        if self._tiempo_sticks_armado >= self.parametros["tiempo_armado"]:
+            self.armed = True
+        if self._tiempo_sticks_desarmado >= self.parametros["tiempo_armado"]:
+            self.armed = False
+
+    def step(self, dt):
+        """Avanza la simulación dt segundos."""
+        p = self.parametros
+        self.tiempo += dt
+        self._actualizar_armado(dt)
+
+        if self.armed:
+            objetivo_vx = p["v_max_xy"] * self._stick(2)
+            objetivo_vy = p["v_max_xy"] * self._stick(1)
+            objetivo_vz = p["v_max_z"] * self._stick(3)
+            yaw_rate = p["yaw_rate_max"] * self._stick(4)
+        else:
+            objetivo_vx = objetivo_vy = objetivo_vz = yaw_rate = 0.0
+
+        # Respuesta de primer orden de las velocidades
+        self.v_cuerpo_x += (objetivo_vx - self.v_cuerpo_x) * min(1.0, dt / p["tau_xy"])
+        self.v_cuerpo_y += (objetivo_vy - self.v_cuerpo_y) * min(1.0, dt / p["tau_xy"])
+        self.v_z += (objetivo_vz - self.v_z) * min(1.0, dt / p["tau_z"])
+
+        # En el suelo no se puede descender ni desplazarse
+        if self.z <= 0.0 and self.v_z <= 0.0:
+            self.z = 0.0
+            self.v_z = 0.0
+            self.v_cuerpo_x = self.v_cuerpo_y = 0.0
+            yaw_rate = 0.0
+
+        self.yaw = (self.yaw + yaw_rate * dt) % 360.0
+        self.z = max(0.0, self.z + self.v_z * dt)
+
+        # Flujo óptico en ejes del cuerpo (con ruido proporcional a la distancia) y posición en ejes del mundo
+        dx = self.v_cuerpo_x * dt
+        dy = self.v_cuerpo_y * dt
+        if self.ruido_flujo:
+            distancia = math.hypot(dx, dy)
+            dx += self.rng.gauss(0.0, self.ruido_flujo * distancia)
+            dy += self.rng.gauss(0.0, self.ruido_flujo * distancia)
+        self.flow_x += dx
+        self.flow_y += dy
+
+        yaw_rad = math.radians(self.yaw)
+        self.x += dx * math.cos(yaw_rad) - dy * math.sin(yaw_rad)
+        self.y += dx * math.sin(yaw_rad) + dy * math.cos(yaw_rad)
+
+        # Descarga de la batería
+        if self.armed:
+            throttle = (self.rc[3] - PWM_MIN) / float(PWM_MAX - PWM_MIN)
+            self.bateria -= (p["consumo_reposo"] + p["consumo_throttle"] * throttle) * dt
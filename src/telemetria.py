@@ -0,0 +1,210 @@
+"""
+Lectura y registro de la telemetría del dron.
+TelemetryReader lee de 'cs' una sola vez por ciclo todos los campos necesarios y los guarda en un TelemetrySnapshot,
+de forma que el control, el registro y la comprobación de éxito usan los mismos valores.
+TelemetrySink guarda las muestras en un buffer circular y un hilo aparte les da formato y las escribe por lotes,
+de forma que un archivo lento no retrasa el bucle.
+Solo usa la librería estándar para poder ejecutarse dentro de Mission Planner.
+"""
+import socket
+import threading
+import time
+
+# Campos de 'cs' que se pueden leer en un TelemetrySnapshot
+CAMPOS_SNAPSHOT = ("opt_m_x", "opt_m_y", "opt_qua", "yaw", "sonarrange", "alt", "battery_voltage")
+
+# Campos que se registran en los archivos de ruta (la altura es la del sensor ToF)
+CAMPOS_RUTA = ("opt_m_x", "opt_m_y", "opt_qua", "yaw", "sonarrange", "battery_voltage")
+
+
+class TelemetrySnapshot:
+    """Valores de 'cs' leídos en un mismo ciclo, con su número de secuencia y su marca de tiempo monótona."""
+
+    __slots__ = ("seq", "t") + CAMPOS_SNAPSHOT
+
+    def __init__(self, seq, t):
+        self.seq = seq
+        self.t = t
+
+
+class TelemetryReader:
+    """Lee de 'cs' los campos indicados exactamente una vez por llamada a read()."""
+
+    def __init__(self, cs, campos=CAMPOS_RUTA, reloj=None):
+        """
+        Args:
+            cs: Objeto 'cs' de Mission Planner (o del simulador).
+            campos: Campos de CAMPOS_SNAPSHOT que se leen en cada ciclo.
+            reloj: Función que devuelve un tiempo monótono en segundos; por defecto time.monotonic.
+        """
+        desconocidos = [c for c in campos if c not in CAMPOS_SNAPSHOT]
+        if desconocidos:
+            raise ValueError(f"Campos de telemetría desconocidos: {desconocidos}")
+        self.cs = cs
+        self.campos = tuple(campos)
+        self.reloj = reloj or getattr(time, "monotonic", time.time)
+        self.seq = 0
+        self.t_inicio = None   # Marca de tiempo de la primera lectura, origen de la columna t de los registros
+
+    def read(self):
+        """Devuelve un TelemetrySnapshot nuevo con los campos leídos de 'cs'."""
+        self.seq += 1
+        snapshot = TelemetrySnapshot(self.seq, self.reloj())
+        if self.t_inicio is None:
+            self.t_inicio = snapshot.t
+        cs = self.cs
+        for campo in self.campos:
+            setattr(snapshot, campo, getattr(cs, campo))
+        return snapshot
+
+
+def tiempo_registro(t):
+    """Valor de la columna t de los archivos de ruta: segundos desde la primera lectura, redondeados a 0.1 ms."""
+    return round(t, 4)
+
+
+def formato_texto(muestra):
+    """Da formato a una muestra como una línea de los archivos de ruta (valores separados por ", ")."""
+    return ", ".join([str(v) for v in muestra]) + "\n"
+
+
+class SalidaUDP:
+    """
+    Salida de texto para TelemetrySink que, además de escribir en un archivo, envía cada lote de líneas en un
+    datagrama UDP (por ejemplo, al visor en vivo). Si no hay nadie escuchando, el envío se ignora.
+    """
+
+    def __init__(self, direccion, archivo=None):
+        """
+        Args:
+            direccion: Tupla (host, puerto) de destino.
+            archivo: Archivo de texto abierto en el que también se escriben las líneas, o None.
+        """
+        self.direccion = direccion
+        self.archivo = archivo
+        self.enviados = 0
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def write(self, texto):
+        if self.archivo is not None:
+            self.archivo.write(texto)
+        try:
+            self._socket.sendto(texto.encode("utf-8"), self.direccion)
+            self.enviados += 1
+        except (OSError, socket.error):
+            pass
+
+    def flush(self):
+        if self.archivo is not None:
+            self.archivo.flush()
+
+    def close(self):
+        self._socket.close()
+
+
+class TelemetrySink:
+    """
+    Destino de telemetría con un buffer circular preasignado y un hilo que lo vacía por lotes.
+    Si el buffer se llena, las muestras nuevas se descartan y se contabilizan en 'dropped'.
+    """
+
+    def __init__(self, salida, capacidad=1024, intervalo_flush=0.5, eco=False, formato=formato_texto):
+        """
+        Args:
+            salida: Archivo de texto abierto (con write) o un formato_binario.EscritorBinario (con write_row).
+            capacidad: Número máximo de muestras pendientes de escribir.
+            intervalo_flush: Tiempo máximo (s) que una muestra permanece en el buffer.
+            eco: Si es True, las muestras también se imprimen por consola desde el hilo de escritura.
+            formato: Función que convierte una muestra en una línea de texto.
+        """
+        self.salida = salida
+        self.capacidad = capacidad
+        self.intervalo_flush = intervalo_flush
+        self.eco = eco
+        self.formato = formato
+
+        self.dropped = 0   # Muestras descartadas por buffer lleno
+        self.written = 0   # Muestras escritas en la salida
+
+        self._buffer = [None] * capacidad
+        self._inicio = 0
+        self._pendientes = 0
+        self._cerrado = False
+        self._cond = threading.Condition(threading.Lock())
+
+        self._hilo = threading.Thread(target=self._bucle_escritura, name="TelemetrySink")
+        self._hilo.daemon = True
+        self._hilo.start()
+
+    def push(self, muestra):
+        """
+        Guarda una muestra (tupla de valores) sin bloquear el bucle que la genera.
+        Returns:
+            True si se ha guardado, False si se ha descartado (buffer lleno o registro cerrado).
+        """
+        with self._cond:
+            if self._cerrado or self._pendientes == self.capacidad:
+                self.dropped += 1
+                return False
+            self._buffer[(self._inicio + self._pendientes) % self.capacidad] = muestra
+            self._pendientes += 1
+            # Despertar al hilo antes del intervalo si el buffer se está llenando
+            if self._pendientes * 2 >= self.capacidad:
+                self._cond.notify()
+        return True
+
+    def _extraer_lote(self):
+        """Saca del buffer todas las muestras pendientes (se llama con el cerrojo adquirido)."""
+        fin = self._inicio + self._pendientes
+        if fin <= self.capacidad:
+            lote = self._buffer[self._inicio:fin]
+        else:
+            lote = self._buffer[self._inicio:] + self._buffer[:fin - self.capacidad]
+        self._inicio = fin % self.capacidad
+        self._pendientes = 0
+        return lote
+
+    def _escribir(self, lote):
+        """Escribe un lote de muestras en la salida (fuera del cerrojo)."""
+        if hasattr(self.salida, "write_row"):
+            for muestra in lote:
+                self.salida.write_row(muestra)
+            texto = None
+        else:
+            texto = "".join([self.formato(muestra) for muestra in lote])
+            self.salida.write(texto)
+        self.salida.flush()
+
+        if self.eco:
+            print((texto if texto is not None else "".join([self.formato(m) for m in lote])).rstrip("\n"))
+        self.written += len(lote)
+
+    def _bucle_escritura(self):
+        """Bucle del hilo de escritura: vacía el buffer cada intervalo_flush o cuando se llena a la mitad."""
+        while True:
+            with self._cond:
+                if not self._cerrado and self._pendientes * 2 < self.capacidad:
+                    self._cond.wait(self.intervalo_flush)
+                lote = self._extraer_lote()
+                cerrado = self._cerrado
+            if lote:
+                self._escribir(lote)
+            if cerrado:
+                return
+
+    def close(self):
+        """Detiene el hilo de escritura tras vaciar el buffer e informa de las muestras descartadas."""
+        with self._cond:
+            if self._cerrado:
+                return
+            self._cerrado = True
+            self._cond.notify()
+        self._hilo.join()
+        if self.dropped:
+            print(f"Telemetría: {self.dropped} muestras descartadas por buffer lleno.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,240 @@
+"""
+Módulo para reconstruir la trayectoria del dron a partir de los datos de flujo óptico.
+Todas las operaciones se realizan sobre arrays completos de NumPy, sin recorrer las filas una a una.
+
+La reconstrucción se puede hacer de una vez (reconstruct_trajectory) o por bloques (ReconstructorIncremental),
+conservando entre bloques el yaw previo, la corrección acumulada del yaw y la última posición. Ambas rutas
+comparten el mismo código y dan resultados idénticos; la segunda permite procesar archivos de cualquier tamaño
+en memoria constante.
+"""
+import numpy as np
+
+
+class ReconstructorIncremental:
+    """
+    Reconstrucción de la trayectoria bloque a bloque.
+    Mantiene el estado necesario para continuar en el bloque siguiente: previous_yaw_raw, la corrección acumulada
+    del yaw (acum_yaw = yaw_raw + correccion_yaw) y la última posición (x, y).
+    """
+
+    def __init__(self, rotacion=True):
+        """
+        Args:
+            rotacion: Si es True, cada desplazamiento se rota según el yaw acumulado del dron.
+        """
+        self.rotacion = rotacion
+        self.previous_yaw_raw = None
+        self.correccion_yaw = 0.0
+        self.acum_yaw = None
+        self.x = 0.0
+        self.y = 0.0
+        self.filas = 0
+
+    def _yaw_acumulado(self, yaw_grados):
+        """
+        Yaw global en radianes: cada diferencia entre filas se ajusta al rango [-pi, pi] y se acumula.
+        Equivale a np.unwrap sobre todo el registro, continuando desde el bloque anterior.
+        """
+        raw = np.radians(yaw_grados)
+        previo = raw[0] if self.previous_yaw_raw is None else self.previous_yaw_raw
+        dd = np.diff(raw, prepend=previo)
+        ddmod = np.mod(dd + np.pi, 2 * np.pi) - np.pi
+        ddmod[(ddmod == -np.pi) & (dd > 0)] = np.pi
+        correccion = ddmod - dd
+        correccion[np.abs(dd) < np.pi] = 0.0
+
+        # Suma acumulada secuencial partiendo de la corrección del bloque anterior
+        correccion[0] += self.correccion_yaw
+        np.cumsum(correccion, out=correccion)
+
+        self.previous_yaw_raw = raw[-1]
+        self.correccion_yaw = correccion[-1]
+        acum_yaw = raw + correccion
+        self.acum_yaw = acum_yaw[-1]
+        return acum_yaw
+
+    def procesar(self, datos):
+        """
+        Reconstruye las posiciones de un bloque de filas.
+        Args:
+            datos: Matriz NxM con las columnas opt_m_x, opt_m_y, opt_qua[, yaw, alt, ...].
+        Returns:
+            x_coords, y_coords, z_coords: Arrays de N elementos con la posición tras cada fila.
+        """
+        datos = np.asarray(datos, dtype=float)
+
+        # Si solo hay una fila, convertir en una matriz 2D de 1xN
+        if datos.ndim == 1:
+            datos = datos.reshape(1, -1)
+
+        n = len(datos)
+        if n == 0:
+            return np.empty(0), np.empty(0), np.empty(0)
+
+        # La inversión de signo en X sigue el criterio de grafica.py
+        opt_m_x = -datos[:, 0]
+        opt_m_y = datos[:, 1]
+
+        if self.rotacion and datos.shape[1] > 3:
+            acum_yaw = self._yaw_acumulado(datos[:, 3])
+            cos_yaw = np.cos(acum_yaw)
+            sin_yaw = np.sin(acum_yaw)
+
+            # Calcular las componentes x e y teniendo en cuenta la rotación del dron
+            delta_x = opt_m_x * cos_yaw - opt_m_y * sin_yaw
+            delta_y = opt_m_x * sin_yaw + opt_m_y * cos_yaw
+        else:
+            delta_x = opt_m_x
+            delta_y = opt_m_y
+
+        # Sumar los desplazamientos partiendo de la última posición
+        x_coords = np.empty(n + 1)
+        y_coords = np.empty(n + 1)
+        x_coords[0] = self.x
+        y_coords[0] = self.y
+        x_coords[1:] = delta_x
+        y_coords[1:] = delta_y
+        np.cumsum(x_coords, out=x_coords)
+        np.cumsum(y_coords, out=y_coords)
+        self.x = x_coords[-1]
+        self.y = y_coords[-1]
+        self.filas += n
+
+        # La altura no se integra: se toma directamente de la columna alt
+        z_coords = datos[:, 4].copy() if datos.shape[1] > 4 else np.zeros(n)
+
+        return x_coords[1:], y_coords[1:], z_coords
+
+
+def reconstruct_trajectory(datos, rotacion=True):
+    """
+    Reconstruye la trayectoria del dron sumando los desplazamientos de cada fila del archivo de datos.
+    Args:
+        datos: Matriz NxM con las columnas opt_m_x, opt_m_y, opt_qua[, yaw, alt, ...].
+        rotacion: Si es True, cada desplazamiento se rota según el yaw acumulado del dron.
+    Returns:
+        x_coords, y_coords, z_coords: Arrays de N+1 elementos; el primero es el punto de inicio (0, 0, 0).
+    """
+    x, y, z = ReconstructorIncremental(rotacion).procesar(datos)
+    return np.concatenate(([0.0], x)), np.concatenate(([0.0], y)), np.concatenate(([0.0], z))
+
+
+def reconstruir_por_bloques(bloques, rotacion=True):
+    """
+    Reconstruye la trayectoria a partir de un iterable de bloques de filas.
+    Args:
+        bloques: Iterable de matrices NxM (por ejemplo, formato_binario.cargar_ruta_por_bloques).
+        rotacion: Si es True, cada desplazamiento se rota según el yaw acumulado del dron.
+    Yields:
+        inicio, bloque, x_coords, y_coords, z_coords: Índice de la primera fila del bloque (empezando en 1,
+        ya que el 0 es el punto de inicio), las filas del bloque y sus posiciones.
+    """
+    reconstructor = ReconstructorIncremental(rotacion)
+    for bloque in bloques:
+        inicio = reconstructor.filas + 1
+        x, y, z = reconstructor.procesar(bloque)
+        yield inicio, bloque, x, y, z
+
+
+class ResumenTrayectoria:
+    """Estadísticas de una trayectoria calculadas bloque a bloque en memoria constante."""
+
+    def __init__(self):
+        self.filas = 0
+        self.minimo = np.zeros(3)          # Mínimos de x, y, z (incluyendo el origen)
+        self.maximo = np.zeros(3)          # Máximos de x, y, z (incluyendo el origen)
+        self.min_quality = np.inf
+        self.max_quality = -np.inf
+        self.suma_quality = 0.0
+        self.distancia = 0.0               # Longitud del recorrido en el plano XY
+        self.final = np.zeros(3)           # Última posición
+        self.objetivos = 0                 # Filas con objetivo_alcanzado
+
+    def actualizar(self, bloque, x, y, z):
+        """Añade al resumen un bloque de filas y sus posiciones."""
+        if len(x) == 0:
+            return
+        puntos = np.column_stack((x, y, z))
+        self.minimo = np.minimum(self.minimo, puntos.min(axis=0))
+        self.maximo = np.maximum(self.maximo, puntos.max(axis=0))
+
+        quality = bloque[:, 2]
+        self.min_quality = min(self.min_quality, quality.min())
+        self.max_quality = max(self.max_quality, quality.max())
+        self.suma_quality += quality.sum()
+
+        anterior = self.final[:2]
+        xy = np.column_stack((x, y))
+        self.distancia += np.hypot(*np.diff(np.vstack((anterior, xy)), axis=0).T).sum()
+        self.final = puntos[-1].copy()
+
+        if bloque.shape[1] > 6:
+            self.objetivos += int(np.nansum(bloque[:, 6] == 1))
+        self.filas += len(bloque)
+
+    @property
+    def media_quality(self):
+        return self.suma_quality / self.filas if self.filas else float("nan")
+
+
+class DecimadorProgresivo:
+    """
+    Conserva como mucho max_puntos filas repartidas uniformemente a lo largo de un registro de longitud desconocida.
+    Se guarda una fila de cada 'paso'; cuando se llena, se descarta una de cada dos y el paso se duplica.
+    """
+
+    def __init__(self, max_puntos=5000):
+        self.max_puntos = max_puntos
+        self.paso = 1
+        self.indices = np.empty(0, dtype=np.int64)
+        self.filas = None
+        self.coords = np.empty((0, 3))
+
+    def agregar(self, inicio, bloque, x, y, z):
+        """Añade un bloque cuya primera fila tiene el índice 'inicio'."""
+        indices = np.arange(inicio, inicio + len(bloque))
+        seleccion = indices % self.paso == 0
+        self.indices = np.concatenate((self.indices, indices[seleccion]))
+        self.filas = bloque[seleccion].copy() if self.filas is None else np.vstack((self.filas, bloque[seleccion]))
+        self.coords = np.vstack((self.coords, np.column_stack((x, y, z))[seleccion]))
+
+        while len(self.indices) > self.max_puntos:
+            self.paso *= 2
+            seleccion = self.indices % self.paso == 0
+            self.indices = self.indices[seleccion]
+            self.filas = self.filas[seleccion]
+            self.coords = self.coords[seleccion]
+
+
+def recorrer_por_bloques(bloques, max_puntos=5000, rotacion=True, ultimo=True):
+    """
+    Recorre un registro por bloques y devuelve su resumen y una versión diezmada de la trayectoria.
+    Args:
+        bloques: Iterable de matrices NxM.
+        max_puntos: Número máximo de filas que se conservan para dibujar.
+        rotacion: Si es True, cada desplazamiento se rota según el yaw acumulado del dron.
+        ultimo: Si es True, la última fila del registro se conserva siempre.
+    Returns:
+        resumen: ResumenTrayectoria del registro completo.
+        indices, filas, x_coords, y_coords, z_coords: Filas conservadas, con su índice y su posición.
+    """
+    resumen = ResumenTrayectoria()
+    decimador = DecimadorProgresivo(max_puntos)
+    ultimo_punto = None
+    for inicio, bloque, x, y, z in reconstruir_por_bloques(bloques, rotacion):
+        if len(bloque) == 0:
+            continue
+        resumen.actualizar(bloque, x, y, z)
+        decimador.agregar(inicio, bloque, x, y, z)
+        ultimo_punto = (inicio + len(bloque) - 1, bloque[-1].copy(), x[-1], y[-1], z[-1])
+
+    indices, filas, coords = decimador.indices, decimador.filas, decimador.coords
+    if filas is None:
+        return resumen, indices, np.empty((0, 0)), np.empty(0), np.empty(0), np.empty(0)
+
+    if ultimo and ultimo_punto is not None and (len(indices) == 0 or indices[-1] != ultimo_punto[0]):
+        indices = np.append(indices, ultimo_punto[0])
+        filas = np.vstack((filas, ultimo_punto[1]))
+        coords = np.vstack((coords, ultimo_punto[2:]))
+
+    return resumen, indices, filas, coords[:, 0], coords[:, 1], coords[:, 2]
@@ -0,0 +1,348 @@
+"""
+Visor en vivo de la trayectoria del dron mientras ruta.py (o move_drone) está registrando.
+Lee las líneas nuevas de un archivo de ruta que está creciendo, o los datagramas que envía telemetria.SalidaUDP,
+reconstruye la trayectoria de forma incremental (trayectoria.ReconstructorIncremental) y actualiza la gráfica
+con blitting: en cada refresco solo se dibujan las muestras nuevas sobre la imagen guardada de la gráfica, sin volver
+a crear el scatter ni redibujar la figura. En pantalla se mantienen como mucho max_puntos muestras (las más recientes).
+Se dibuja la vista en planta (X-Y) y la altura frente al número de muestra, ya que los ejes 3D no admiten blitting.
+
+Uso: python visor_vivo.py <archivo de ruta | udp:puerto> [max_puntos]
+"""
+import os
+import sys
+import socket
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.patches import Rectangle
+from trayectoria import ReconstructorIncremental
+from grafica import COLUMNAS_VALIDAS, colores_puntos
+from lector_rutas import COLUMNA_TIEMPO
+
+# Número máximo de muestras que se dibujan
+MAX_PUNTOS_VISOR = 2000
+# Periodo de refresco de la gráfica (ms)
+PERIODO_REFRESCO_MS = 20
+# Margen relativo que se añade a los límites de los ejes al ampliarlos, para no redibujar la figura a menudo
+MARGEN_LIMITES = 0.5
+
+# Columnas que se suponen cuando la fuente no envía cabecera (las que escribe ruta.py)
+COLUMNAS_POR_DEFECTO = COLUMNAS_VALIDAS[:6] + [COLUMNA_TIEMPO]
+
+
+def _valor(texto):
+    """Convierte un campo de una línea de ruta en float (True/False como 1/0, NaN si no es válido)."""
+    texto = texto.strip()
+    if texto == "True":
+        return 1.0
+    if texto == "False":
+        return 0.0
+    try:
+        return float(texto)
+    except ValueError:
+        return float("nan")
+
+
+def _es_cabecera(linea):
+    """Indica si una línea es la cabecera (empieza por un nombre de columna y no por un número)."""
+    primero = linea.split(",", 1)[0].strip()
+    return bool(primero) and not np.isfinite(_valor(primero)) and primero not in ("nan", "NaN")
+
+
+class FuenteArchivo:
+    """Lee las líneas completas que se van añadiendo a un archivo de texto (como 'tail -f')."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._archivo = None
+        self._resto = ""
+
+    def leer(self):
+        """Devuelve la lista de líneas completas nuevas desde la última llamada."""
+        if self._archivo is None:
+            if not os.path.exists(self.file_path):
+                return []
+            self._archivo = open(self.file_path, "r")
+        texto = self._archivo.read()
+        if not texto:
+            return []
+        # La última línea puede estar a medio escribir: se guarda para la siguiente lectura
+        lineas = (self._resto + texto).split("\n")
+        self._resto = lineas.pop()
+        return [linea for linea in lineas if linea.strip()]
+
+    def close(self):
+        if self._archivo is not None:
+            self._archivo.close()
+
+
+class FuenteUDP:
+    """Recibe las líneas que envía telemetria.SalidaUDP en datagramas (un lote de líneas por datagrama)."""
+
+    def __init__(self, puerto, host="127.0.0.1"):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((host, puerto))
+        self._socket.setblocking(False)
+
+    def leer(self):
+        """Devuelve la lista de líneas recibidas desde la última llamada."""
+        lineas = []
+        while True:
+            try:
+                datos = self._socket.recv(65536)
+            except OSError:
+                return lineas
+            lineas.extend(linea for linea in datos.decode("utf-8").split("\n") if linea.strip())
+
+    def close(self):
+        self._socket.close()
+
+
+class VisorVivo:
+    """
+    Gráfica de la trayectoria que se actualiza con las muestras nuevas de una fuente (FuenteArchivo o FuenteUDP).
+
+    La gráfica tiene tres capas:
+        - Fondo: ejes y trayectoria ya dibujada. Se guarda como imagen (copy_from_bbox).
+        - Muestras nuevas: en cada refresco se dibujan solo los puntos nuevos sobre el fondo y el resultado
+          pasa a ser el fondo, de forma que el coste no depende del número de puntos en pantalla.
+        - Cabeza y contador: se dibujan encima en cada refresco sin guardarse en el fondo.
+    Cuando cambian los límites de unos ejes, o cuando se descartan las muestras más antiguas (al superar max_puntos),
+    se redibujan solo los ejes afectados sobre el fondo, después de borrar su zona de la figura (la mitad izquierda
+    o derecha, con las marcas y etiquetas); en ese momento también se recalculan los colores con la calidad global.
+    La figura completa solo se dibuja al crear el visor y cuando la pide la ventana (al cambiar de tamaño).
+    """
+
+    def __init__(self, fuente, max_puntos=MAX_PUNTOS_VISOR, rotacion=True):
+        """
+        Args:
+            fuente: Objeto con un método leer() que devuelve una lista de líneas nuevas.
+            max_puntos: Número máximo de muestras que se dibujan.
+            rotacion: Si es True, cada desplazamiento se rota según el yaw acumulado del dron.
+        """
+        self.fuente = fuente
+        self.max_puntos = max_puntos
+        self.reconstructor = ReconstructorIncremental(rotacion)
+        self.columnas = list(COLUMNAS_POR_DEFECTO)
+
+        # Últimas muestras: índice y x, y, z, calidad y objetivo_alcanzado
+        self.indices = np.empty(0, dtype=np.int64)
+        self.puntos = np.empty((0, 5))
+        self.min_quality = np.inf
+        self.max_quality = -np.inf
+        self.muestras = 0          # Muestras recibidas en total
+        self.redibujados = 0       # Veces que se han redibujado ejes completos
+
+        self.fig, (self.ax, self.ax_alt) = plt.subplots(1, 2, figsize=(11, 5),
+                                                        gridspec_kw={"width_ratios": [2, 1]})
+        self.ax.set_xlabel('opt_m_x (m)')
+        self.ax.set_ylabel('opt_m_y (m)')
+        self.ax.set_aspect('equal', adjustable='box')
+        self.ax.set_title('Trayectoria del dron en vivo')
+        self.ax.plot([0], [0], 'o', color='red')
+        self.ax_alt.set_xlabel('Muestra')
+        self.ax_alt.set_ylabel('alt (m)')
+        self.ax.set_xlim(-1, 1)
+        self.ax.set_ylim(-1, 1)
+        self.ax_alt.set_xlim(0, max_puntos)
+        self.ax_alt.set_ylim(0, 1)
+
+        # Trayectoria dibujada en el fondo: solo se actualiza al redibujar la figura completa
+        self.linea, = self.ax.plot([], [], '-', color='gray', linewidth=0.8)
+        self.scatter = self.ax.scatter([], [], s=12)
+        self.linea_alt, = self.ax_alt.plot([], [], '-', color='tab:blue')
+
+        # Muestras nuevas de cada refresco (desde la última muestra ya dibujada)
+        self.linea_nueva, = self.ax.plot([], [], '-', color='gray', linewidth=0.8, animated=True)
+        self.scatter_nuevo = self.ax.scatter([], [], s=12, animated=True)
+        self.linea_alt_nueva, = self.ax_alt.plot([], [], '-', color='tab:blue', animated=True)
+        self.nuevos = (self.linea_nueva, self.scatter_nuevo, self.linea_alt_nueva)
+
+        # Elementos que cambian en cada refresco y no se guardan en el fondo
+        self.cabeza, = self.ax.plot([], [], 'o', color='black', markersize=6, animated=True)
+        self.texto = self.ax.text(0.02, 0.98, "", transform=self.ax.transAxes, va='top', animated=True)
+        self.transitorios = (self.cabeza, self.texto)
+
+        # Zona de la figura de cada ejes (con sus marcas y etiquetas), que se borra antes de redibujarlos
+        self.zonas = {ax: self.fig.add_artist(Rectangle((0, 0), 0, 1, transform=self.fig.transFigure,
+                                                        facecolor=self.fig.get_facecolor(), edgecolor='none',
+                                                        animated=True))
+                      for ax in (self.ax, self.ax_alt)}
+
+        # Primer dibujo de la figura completa, antes de que lleguen muestras; draw_event guarda el fondo
+        self._fondo = None
+        self.fig.canvas.mpl_connect('draw_event', self._guardar_fondo)
+        self.fig.canvas.draw()
+
+    def _guardar_fondo(self, evento=None):
+        """Guarda la figura recién dibujada como fondo y dibuja encima la cabeza y el contador."""
+        self._fondo = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        # Las zonas se separan a mitad del hueco entre los dos ejes, ya colocados tras el dibujo
+        corte = (self.ax.get_position().x1 + self.ax_alt.get_position().x0) / 2
+        self.zonas[self.ax].set_width(corte)
+        self.zonas[self.ax_alt].set_x(corte)
+        self.zonas[self.ax_alt].set_width(1 - corte)
+        self._dibujar(self.transitorios)
+
+    @staticmethod
+    def _dibujar(artistas):
+        for artista in artistas:
+            artista.axes.draw_artist(artista)
+
+    def _parsear(self, lineas):
+        """Convierte las líneas en una matriz NxM; la cabecera, si llega, fija los nombres de las columnas."""
+        filas = []
+        for linea in lineas:
+            if _es_cabecera(linea):
+                self.columnas = [col.strip() for col in linea.split(",")]
+                continue
+            fila = [_valor(campo) for campo in linea.split(",")]
+            # Se necesitan al menos opt_m_x, opt_m_y y opt_qua
+            if len(fila) >= 3:
+                filas.append(fila)
+        if not filas:
+            return np.empty((0, len(self.columnas)))
+        ancho = min(len(fila) for fila in filas)
+        return np.array([fila[:ancho] for fila in filas])
+
+    def _agregar(self, datos):
+        """
+        Reconstruye las filas nuevas y las añade a las últimas muestras.
+        Returns:
+            True si se han descartado muestras antiguas para no superar max_puntos.
+        """
+        x, y, z = self.reconstructor.procesar(datos)
+        # objetivo_alcanzado se busca por nombre: en los archivos de ruta.py la columna 6 es el tiempo
+        if "objetivo_alcanzado" in self.columnas[:datos.shape[1]]:
+            objetivo = datos[:, self.columnas.index("objetivo_alcanzado")]
+        else:
+            objetivo = np.zeros(len(datos))
+        nuevos = np.column_stack((x, y, z, datos[:, 2], objetivo))
+        indices = np.arange(self.muestras + 1, self.muestras + 1 + len(datos))
+        self.muestras += len(datos)
+
+        self.puntos = np.vstack((self.puntos, nuevos))
+        self.indices = np.concatenate((self.indices, indices))
+        calidad = datos[:, 2]
+        self.min_quality = min(self.min_quality, np.nanmin(calidad))
+        self.max_quality = max(self.max_quality, np.nanmax(calidad))
+
+        # Al superar max_puntos se conserva la mitad más reciente, para no redibujar en cada refresco
+        if len(self.puntos) > self.max_puntos:
+            conservar = max(self.max_puntos // 2, len(nuevos))
+            self.puntos = self.puntos[-conservar:]
+            self.indices = self.indices[-conservar:]
+            return True
+        return False
+
+    def _ajustar_limites(self, nuevos):
+        """Amplía los límites de los ejes si las muestras nuevas se salen de ellos. Devuelve los ejes cambiados."""
+        x, y, z = nuevos[:, 0], nuevos[:, 1], nuevos[:, 2]
+        cambiados = set()
+
+        # Trayectoria: mismo rango en X e Y, centrado en el recorrido, con margen para seguir creciendo
+        xmin, xmax = self.ax.get_xlim()
+        ymin, ymax = self.ax.get_ylim()
+        if np.nanmin(x) < xmin or np.nanmax(x) > xmax or np.nanmin(y) < ymin or np.nanmax(y) > ymax:
+            todos = self.puntos
+            bajo = np.nanmin(todos[:, :2], axis=0)
+            alto = np.nanmax(todos[:, :2], axis=0)
+            centro = (bajo + alto) / 2
+            radio = (1 + MARGEN_LIMITES) * max((alto - bajo).max() / 2, 0.5)
+            self.ax.set_xlim(centro[0] - radio, centro[0] + radio)
+            self.ax.set_ylim(centro[1] - radio, centro[1] + radio)
+            cambiados.add(self.ax)
+
+        ymin, ymax = self.ax_alt.get_ylim()
+        if np.nanmin(z) < ymin or np.nanmax(z) > ymax:
+            bajo = min(np.nanmin(self.puntos[:, 2]), 0)
+            alto = np.nanmax(self.puntos[:, 2])
+            margen = MARGEN_LIMITES * max(alto - bajo, 1.0)
+            self.ax_alt.set_ylim(bajo - margen, alto + margen)
+            cambiados.add(self.ax_alt)
+
+        # El eje de la altura avanza por saltos de media ventana
+        ultimo = self.indices[-1]
+        if ultimo > self.ax_alt.get_xlim()[1]:
+            self.ax_alt.set_xlim(max(0, ultimo - self.max_puntos // 2), ultimo + self.max_puntos // 2)
+            cambiados.add(self.ax_alt)
+        return cambiados
+
+    def _actualizar_fondo(self):
+        """Pasa todas las muestras a los artistas del fondo, con los colores según la calidad global."""
+        self.linea.set_data(self.puntos[:, 0], self.puntos[:, 1])
+        self.scatter.set_offsets(self.puntos[:, :2])
+        self.scatter.set_facecolors(self._colores(self.puntos))
+        self.linea_alt.set_data(self.indices, self.puntos[:, 2])
+        self.redibujados += 1
+
+    def _colores(self, puntos):
+        return colores_puntos(puntos[:, 3], puntos[:, 4], self.min_quality, self.max_quality)
+
+    def refrescar(self):
+        """
+        Lee las muestras nuevas de la fuente y actualiza la gráfica.
+        Returns:
+            Número de muestras nuevas.
+        """
+        datos = self._parsear(self.fuente.leer())
+        if len(datos) == 0:
+            return 0
+        dibujados = len(self.puntos)
+        descartados = self._agregar(datos)
+
+        n = len(datos)
+        nuevos = self.puntos[-n:]
+        self.cabeza.set_data(nuevos[-1:, 0], nuevos[-1:, 1])
+        self.texto.set_text(f"{self.muestras} muestras")
+
+        # Al descartar muestras cambian las dos gráficas
+        ejes = self._ajustar_limites(nuevos) | ({self.ax, self.ax_alt} if descartados else set())
+        canvas = self.fig.canvas
+        canvas.restore_region(self._fondo)
+        if ejes:
+            # Redibujar solo los ejes que han cambiado, con todas las muestras, sobre su zona borrada
+            self._actualizar_fondo()
+            for ax in (self.ax, self.ax_alt):
+                if ax in ejes:
+                    self.fig.draw_artist(self.zonas[ax])
+                    self.fig.draw_artist(ax)
+        else:
+            # Dibujar solo las muestras nuevas, unidas a la última ya dibujada
+            tramo = self.puntos[-(n + 1):] if dibujados else nuevos
+            indices = self.indices[-len(tramo):]
+            self.linea_nueva.set_data(tramo[:, 0], tramo[:, 1])
+            self.scatter_nuevo.set_offsets(nuevos[:, :2])
+            self.scatter_nuevo.set_facecolors(self._colores(nuevos))
+            self.linea_alt_nueva.set_data(indices, tramo[:, 2])
+            self._dibujar(self.nuevos)
+        # El resultado pasa a ser el fondo; la cabeza y el contador se dibujan encima
+        self._fondo = canvas.copy_from_bbox(self.fig.bbox)
+        self._dibujar(self.transitorios)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+        return n
+
+    def ejecutar(self, periodo_ms=PERIODO_REFRESCO_MS):
+        """Muestra la ventana y la refresca periódicamente hasta que se cierra."""
+        temporizador = self.fig.canvas.new_timer(interval=periodo_ms)
+        temporizador.add_callback(self.refrescar)
+        temporizador.start()
+        plt.show()
+        self.fuente.close()
+
+
+def crear_fuente(origen):
+    """Crea la fuente a partir del argumento: 'udp:puerto' o el nombre de un archivo (de ../Rutas si no existe)."""
+    if origen.startswith("udp:"):
+        return FuenteUDP(int(origen[4:]))
+    if not os.path.isabs(origen) and not os.path.exists(origen):
+        origen = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Rutas", origen)
+    return FuenteArchivo(origen)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Uso: python visor_vivo.py <archivo de ruta | udp:puerto> [max_puntos]")
+        sys.exit(1)
+    max_puntos = int(sys.argv[2]) if len(sys.argv) > 2 else MAX_PUNTOS_VISOR
+    VisorVivo(crear_fuente(sys.argv[1]), max_puntos).ejecutar()